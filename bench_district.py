@@ -0,0 +1,172 @@
+"""
+Benchmark harness for the generator.
+
+Runs faker_district headless at fixed tier configs, each (tier, format) in a fresh subprocess so
+peak RSS is per run. Reports wall time, peak RSS, bytes written and per-stage time / rows / rows
+per second (see district_metrics). Results are saved as JSON, and --baseline compares them with
+an earlier results file and exits non-zero on a regression.
+
+    python bench_district.py                                   # readme + medium tiers, csv
+    python bench_district.py --tiers all --formats csv,parquet --output bench.json
+    python bench_district.py --baseline bench_baseline.json --tolerance 0.2
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from district_metrics import children_peak_rss_bytes, peak_rss_bytes
+
+BENCH_SEED = 1234
+BENCH_GEN_MODE = "vectorized"   # the tiers track the batched path, not the per-student default
+
+# tier -> DEFAULTS overrides (students = districts * schools * sections * students per section)
+TIERS = {
+    # The README defaults: 5 schools x 30 sections x 20 students, a school week of attendance
+    "readme": {"NUM_DISTRICTS": 1, "SCHOOLS_PER_DISTRICT": 5, "SECTIONS_PER_SCHOOL": 30, "STUDENTS_PER_SECTION": 20,
+               "DO_ATTENDANCE": True, "ATT_DAYS": 5, "DO_RESOURCES": True},
+    "medium": {"NUM_DISTRICTS": 1, "SCHOOLS_PER_DISTRICT": 20, "SECTIONS_PER_SCHOOL": 50, "STUDENTS_PER_SECTION": 25,
+               "DO_ATTENDANCE": True, "ATT_DAYS": 5, "DO_RESOURCES": True},
+    "large": {"NUM_DISTRICTS": 4, "SCHOOLS_PER_DISTRICT": 25, "SECTIONS_PER_SCHOOL": 50, "STUDENTS_PER_SECTION": 40},
+    "1m_students": {"NUM_DISTRICTS": 10, "SCHOOLS_PER_DISTRICT": 25, "SECTIONS_PER_SCHOOL": 100, "STUDENTS_PER_SECTION": 40},
+    # README roster with a full school year of Section attendance (~540k attendance rows)
+    "full_year_attendance": {"NUM_DISTRICTS": 1, "SCHOOLS_PER_DISTRICT": 5, "SECTIONS_PER_SCHOOL": 30, "STUDENTS_PER_SECTION": 20,
+                             "DO_ATTENDANCE": True, "ATT_MODE": "Section", "ATT_DAYS": 180},
+}
+DEFAULT_TIERS = ["readme", "medium"]
+
+# Stages faster than this are too noisy to flag as regressions
+MIN_COMPARED_SECONDS = 0.05
+
+
+def folder_bytes(folder):
+    total = 0
+    for root, dirs, files in os.walk(folder):
+        dirs[:] = [d for d in dirs if d != ".cache"]
+        total += sum(os.path.getsize(os.path.join(root, f)) for f in files)
+    return total
+
+
+def run_child(tier, fmt, workers, output_dir):
+    """One benchmark run in this process; returns its result dict."""
+    import faker_district
+    config = dict(TIERS[tier], OUTPUT_FORMAT=fmt, SEED=BENCH_SEED, GEN_MODE=BENCH_GEN_MODE)
+    faker_district.metrics.reset()
+    start = time.perf_counter()
+    folders = faker_district.generate(config, output_dir=output_dir, workers=workers)
+    wall = time.perf_counter() - start
+    return {
+        "config": config,
+        "workers": workers,
+        "wall_seconds": wall,
+        "peak_rss_bytes": peak_rss_bytes(),
+        "worker_peak_rss_bytes": children_peak_rss_bytes() if workers > 1 else None,
+        "output_bytes": sum(folder_bytes(f) for f in folders.values()),
+        "stages": faker_district.metrics.snapshot(),
+    }
+
+
+def run_tier(tier, fmt, workers):
+    """Runs one (tier, format) in a fresh interpreter and returns its result dict."""
+    output_dir = tempfile.mkdtemp(prefix=f"bench_{tier}_{fmt}_")
+    try:
+        cmd = [sys.executable, os.path.abspath(__file__), "--child", tier, fmt, str(workers), output_dir]
+        proc = subprocess.run(cmd, capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+        if proc.returncode != 0: raise RuntimeError(f"{tier}/{fmt} failed:\n{proc.stderr}")
+        return json.loads(proc.stdout.strip().splitlines()[-1])
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+
+def compare(results, baseline, tolerance):
+    """Regression messages: wall time up, or a stage's rows/sec down, by more than `tolerance`."""
+    problems = []
+    for tier, formats in results.items():
+        for fmt, run in formats.items():
+            base = baseline.get("results", {}).get(tier, {}).get(fmt)
+            if base is None: continue
+            if run["wall_seconds"] > base["wall_seconds"] * (1 + tolerance):
+                problems.append(f"{tier}/{fmt}: wall {base['wall_seconds']:.2f}s -> {run['wall_seconds']:.2f}s")
+            for name, stage in run["stages"].items():
+                old = base["stages"].get(name)
+                if not old or not old.get("rows_per_sec") or not stage.get("rows_per_sec"): continue
+                if max(old["seconds"], stage["seconds"]) < MIN_COMPARED_SECONDS: continue
+                if stage["rows_per_sec"] < old["rows_per_sec"] * (1 - tolerance):
+                    problems.append(f"{tier}/{fmt} {name}: {old['rows_per_sec']:,.0f} -> {stage['rows_per_sec']:,.0f} rows/s")
+    return problems
+
+
+def print_report(results):
+    from rich.console import Console
+    from rich.table import Table
+    console = Console()
+    for tier, formats in results.items():
+        for fmt, run in formats.items():
+            rss, workers = run["peak_rss_bytes"], run.get("worker_peak_rss_bytes")
+            table = Table(title=f"{tier} / {fmt}: {run['wall_seconds']:.2f}s wall, "
+                                f"{'n/a' if rss is None else f'{rss / 2 ** 20:,.0f} MiB'} peak RSS"
+                                f"{f' (workers {workers / 2 ** 20:,.0f} MiB)' if workers else ''}, "
+                                f"{run['output_bytes'] / 2 ** 20:,.1f} MiB written")
+            for col in ("Stage", "Seconds", "Rows", "Rows/sec"): table.add_column(col, justify="left" if col == "Stage" else "right")
+            for name, stage in sorted(run["stages"].items(), key=lambda kv: -kv[1]["seconds"]):
+                rate = stage["rows_per_sec"]
+                table.add_row(name, f"{stage['seconds']:.3f}", f"{stage['rows']:,}", "-" if rate is None else f"{rate:,.0f}")
+            console.print(table)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the district generator at fixed scale tiers.")
+    parser.add_argument("--tiers", default=",".join(DEFAULT_TIERS), help=f"Comma-separated tiers or 'all' ({', '.join(TIERS)})")
+    parser.add_argument("--formats", default="csv", help="Comma-separated OUTPUT_FORMATs to write (default: csv)")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes (default: 1)")
+    parser.add_argument("--output", default="bench_results.json", help="Where to write the JSON results")
+    parser.add_argument("--baseline", help="Earlier results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed slowdown before a regression is reported (default: 0.15)")
+    parser.add_argument("--child", nargs=4, metavar=("TIER", "FORMAT", "WORKERS", "OUTPUT_DIR"), help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.child:
+        tier, fmt, workers, output_dir = args.child
+        print(json.dumps(run_child(tier, fmt, int(workers), output_dir)))
+        return 0
+
+    tiers = list(TIERS) if args.tiers == "all" else args.tiers.split(",")
+    unknown = [t for t in tiers if t not in TIERS]
+    if unknown: raise SystemExit(f"Unknown tier(s): {', '.join(unknown)}")
+    formats = args.formats.split(",")
+
+    results = {}
+    for tier in tiers:
+        for fmt in formats:
+            print(f"Running {tier} / {fmt}...", file=sys.stderr)
+            results.setdefault(tier, {})[fmt] = run_tier(tier, fmt, args.workers)
+
+    import numpy
+    report = {
+        "meta": {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": platform.python_version(),
+                 "numpy": numpy.__version__, "platform": platform.platform(), "cpus": os.cpu_count()},
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as fh: json.dump(report, fh, indent=2)
+    print_report(results)
+    print(f"Results written to {args.output}", file=sys.stderr)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as fh: baseline = json.load(fh)
+        problems = compare(results, baseline, args.tolerance)
+        for line in problems: print(f"REGRESSION {line}", file=sys.stderr)
+        if problems: return 1
+        print("No regressions against the baseline.", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+"""
+Config-hash keyed cache of generated districts.
+
+Each district's output depends only on the settings, its index, the generator code, the Faker and
+NumPy versions it draws with and the current year (DOBs are relative to today), so those are
+hashed into a key. A cache entry is a
+folder under `<output>/.cache/<key>/` holding hard links to the district's files plus a
+`manifest.json` (file names, sizes, sha256). A later run with the same key links the files back
+into place instead of regenerating. Entries are evicted least-recently-used once the cache grows
+past its byte budget.
+"""
+import datetime
+import hashlib
+import json
+import os
+import shutil
+import time
+from importlib import metadata
+
+import numpy as np
+
+CACHE_FORMAT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+
+# Settings that cannot change a district's files
+KEY_IGNORED_SETTINGS = {
+    "NUM_DISTRICTS", "CACHE_ENABLED", "CACHE_MAX_BYTES", "DELTA_DAYS",
+    "CHURN_DROP", "CHURN_TRANSFER", "CHURN_ENROLL", "CHURN_TEACHER", "CHURN_FLAGS",
+}
+
+
+def file_sha256(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(block_size), b""): digest.update(block)
+    return digest.hexdigest()
+
+
+def code_fingerprint(paths):
+    """sha256 over the generator's source files, so editing the code invalidates the cache."""
+    digest = hashlib.sha256()
+    for path in sorted(paths):
+        with open(path, "rb") as fh: digest.update(fh.read())
+    return digest.hexdigest()
+
+
+def library_versions():
+    """Versions of the libraries the output is drawn with: Faker's providers and word lists, NumPy's generators."""
+    try: faker_version = metadata.version("faker")
+    except metadata.PackageNotFoundError: faker_version = None
+    return {"faker": faker_version, "numpy": np.__version__}
+
+
+def district_cache_key(settings, district_index, code_hash):
+    payload = {
+        "version": CACHE_FORMAT_VERSION,
+        "code": code_hash,
+        "libraries": library_versions(),
+        "year": datetime.date.today().year,
+        "district": district_index,
+        "settings": {k: v for k, v in sorted(settings.items()) if k not in KEY_IGNORED_SETTINGS},
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:32]
+
+
+def link_or_copy(src, dst):
+    """Hard link `src` to `dst` (replacing dst), falling back to a copy across filesystems."""
+    if os.path.lexists(dst): os.unlink(dst)
+    try: os.link(src, dst)
+    except OSError: shutil.copy2(src, dst)
+
+
+class DistrictCache:
+    def __init__(self, cache_dir, max_bytes):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    def _entry(self, key): return os.path.join(self.cache_dir, key)
+
+    def _manifest(self, key):
+        try:
+            with open(os.path.join(self._entry(key), MANIFEST_NAME), encoding="utf-8") as fh: return json.load(fh)
+        except (OSError, ValueError):
+            return None
+
+    def restore(self, key, folder):
+        """
+        Links a cached district into `folder`. Returns the manifest, or None on a miss. Every file
+        is checked against its manifest size and sha256 first, so a damaged entry is never served.
+        """
+        manifest = self._manifest(key)
+        if manifest is None: return None
+        entry = self._entry(key)
+        for item in manifest["files"]:
+            path = os.path.join(entry, item["name"])
+            if not os.path.isfile(path) or os.path.getsize(path) != item["size"] or file_sha256(path) != item["sha256"]:
+                shutil.rmtree(entry, ignore_errors=True)  # damaged entry: drop it and regenerate
+                return None
+        os.makedirs(folder, exist_ok=True)
+        for item in manifest["files"]:
+            link_or_copy(os.path.join(entry, item["name"]), os.path.join(folder, item["name"]))
+        manifest["last_used"] = time.time()
+        self._write_manifest(key, manifest)
+        return manifest
+
+    def store(self, key, folder, paths, dist_name):
+        """Records freshly written `paths` (inside `folder`) as the entry for `key`, then enforces the budget."""
+        entry = self._entry(key)
+        tmp = f"{entry}.{os.getpid()}.tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        files = []
+        for path in sorted(paths):
+            name = os.path.relpath(path, folder)
+            link_or_copy(path, os.path.join(tmp, name))
+            files.append({"name": name, "size": os.path.getsize(path), "sha256": file_sha256(path)})
+        now = time.time()
+        manifest = {"key": key, "district": dist_name, "files": files, "created": now, "last_used": now}
+        with open(os.path.join(tmp, MANIFEST_NAME), "w", encoding="utf-8") as fh: json.dump(manifest, fh, indent=2)
+        shutil.rmtree(entry, ignore_errors=True)
+        os.replace(tmp, entry)
+        self.evict()
+        return manifest
+
+    def _write_manifest(self, key, manifest):
+        path = os.path.join(self._entry(key), MANIFEST_NAME)
+        with open(f"{path}.tmp", "w", encoding="utf-8") as fh: json.dump(manifest, fh, indent=2)
+        os.replace(f"{path}.tmp", path)
+
+    def evict(self):
+        """Drops least-recently-used entries until the cache fits in max_bytes."""
+        if not os.path.isdir(self.cache_dir): return
+        entries = []
+        for key in os.listdir(self.cache_dir):
+            manifest = self._manifest(key)
+            if manifest is None: continue
+            entries.append((manifest.get("last_used", 0), key, sum(f["size"] for f in manifest["files"])))
+        total = sum(size for _, _, size in entries)
+        for _, key, size in sorted(entries):
+            if total <= self.max_bytes: break
+            shutil.rmtree(self._entry(key), ignore_errors=True)
+            total -= size
@@ -0,0 +1,59 @@
+"""
+Counter-based random draws, for random-access generation (GEN_MODE "counter").
+
+A CounterDraws stands in for a NumPy Generator over a fixed batch of entities. Each entity is
+named by its position within the district. The k-th draw made for an entity is a splitmix64
+hash of (stream key, position, k), where the stream key comes from (seed, district, kind). So a
+value never depends on which other entities share the batch or on anything drawn before the
+batch. Student #900,000 comes out the same whether it is generated alone, in a block of sections,
+or as part of its whole school.
+
+Only the Generator calls the roster code makes are supported (random, integers, choice). Every
+call returns one value per position and uses up one draw index.
+"""
+import numpy as np
+
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+_MIX_1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX_2 = np.uint64(0x94D049BB133111EB)
+
+
+def mix64(x):
+    """splitmix64 finalizer, elementwise over uint64 (the wrapping multiplies are intended)."""
+    with np.errstate(over="ignore"):
+        x = (x ^ (x >> np.uint64(30))) * _MIX_1
+        x = (x ^ (x >> np.uint64(27))) * _MIX_2
+        return x ^ (x >> np.uint64(31))
+
+
+class CounterDraws:
+    """Generator-like draws for the entities at `positions`, keyed by `seed_seq` (a SeedSequence)."""
+
+    def __init__(self, seed_seq, positions):
+        key = seed_seq.generate_state(1, dtype=np.uint64)[0]
+        with np.errstate(over="ignore"):
+            self._base = mix64(key + np.asarray(positions, dtype=np.uint64) * _GOLDEN)
+        self.draws = 0
+
+    def _bits(self, size):
+        if size is None or (size if np.ndim(size) == 0 else size[0]) != len(self._base):
+            raise ValueError(f"counter draws come one per position ({len(self._base)}), not size={size!r}")
+        self.draws += 1
+        with np.errstate(over="ignore"):
+            return mix64(self._base + np.uint64(self.draws) * _GOLDEN)
+
+    def random(self, size=None):
+        return (self._bits(size) >> np.uint64(11)).astype(np.float64) * (1.0 / (1 << 53))
+
+    def integers(self, low, high=None, size=None, dtype=np.int64):
+        if high is None: low, high = 0, low
+        low, high = np.asarray(low, dtype=np.int64), np.asarray(high, dtype=np.int64)
+        return (low + (self.random(size) * (high - low)).astype(np.int64)).astype(dtype)
+
+    def choice(self, a, size=None, p=None):
+        n = a if isinstance(a, (int, np.integer)) else len(a)
+        if p is None: idx = self.integers(0, n, size)
+        else:
+            cdf = np.cumsum(np.asarray(p, dtype=float))
+            idx = np.minimum(np.searchsorted(cdf / cdf[-1], self.random(size), side="right"), n - 1)
+        return idx if isinstance(a, (int, np.integer)) else np.asarray(a, dtype=object)[idx]
@@ -0,0 +1,189 @@
+"""
+Direct load into one local database file (SQLite, or DuckDB when installed).
+
+Every district goes into the same file: each table gets a leading `district` column, and
+re-generating a district replaces its rows. Rows take the same buffered path as the file
+writers (district_writers.TableWriter) and are inserted a buffer at a time: executemany for
+SQLite, a registered DataFrame for DuckDB. A whole district is one transaction. Columns are
+typed like the columnar formats (dates, booleans for Y/N flags, integers), and the key and
+foreign-key indexes are dropped before loading and built once at the end, which is much
+faster than maintaining them row by row.
+"""
+import sqlite3
+
+from district_writers import DATE_COLUMNS, FLAG_COLUMNS, INT_COLUMNS, DistrictWriter, TableWriter
+
+DATABASE_FILENAME = "districts"
+
+# Key columns per table; unique within a district
+TABLE_KEYS = {
+    "schools": ("School_id",), "teachers": ("Teacher_id",), "staff": ("Staff_id",),
+    "sections": ("Section_id",), "students": ("Student_id",), "enrollments": ("Section_id", "Student_id"),
+    "contacts": ("Contact_sis_id",), "resources": ("resource_id",), "attendance": ("sis_id",),
+}
+# Foreign-key (and ID lookup) columns that get their own index wherever they appear
+ID_COLUMNS = ("School_id", "Section_id", "Student_id", "Teacher_id", "school_id", "section_id", "student_id")
+
+# backend -> SQL type per column kind, and the query listing existing tables
+BACKENDS = {
+    "sqlite": {"types": {"date": "DATE", "flag": "BOOLEAN", "int": "INTEGER", "text": "TEXT"},
+               "tables": "SELECT name FROM sqlite_master WHERE type = 'table'"},
+    "duckdb": {"types": {"date": "DATE", "flag": "BOOLEAN", "int": "BIGINT", "text": "VARCHAR"},
+               "tables": "SELECT table_name FROM information_schema.tables WHERE table_schema = 'main'"},
+}
+
+
+def _quote(name): return '"' + name.replace('"', '""') + '"'
+
+
+def _column_kind(name):
+    if name in DATE_COLUMNS: return "date"
+    if name in FLAG_COLUMNS: return "flag"
+    if name in INT_COLUMNS: return "int"
+    return "text"
+
+
+def _converter(kind):
+    """Python value conversion per column kind (the database driver does the rest)."""
+    if kind == "date": return lambda v: v or None
+    if kind == "flag": return lambda v: None if v in (None, "") else v == "Y"
+    if kind == "int": return lambda v: None if v is None else int(v)
+    return lambda v: None if v is None else str(v)
+
+
+class DatabaseTarget:
+    """
+    One open database file shared by every district of a run.
+    `non_unique` names tables whose key repeats within a district (students in the
+    denormalized contacts layout), which get a plain key index instead of a unique one.
+    """
+
+    def __init__(self, path, backend, non_unique=()):
+        if backend not in BACKENDS: raise ValueError(f"Unknown database backend: {backend}")
+        self.path = path
+        self.backend = backend
+        self.non_unique = set(non_unique)
+        self._sql = BACKENDS[backend]
+        if backend == "duckdb":
+            import duckdb
+            self.conn = duckdb.connect(path)
+        else:
+            self.conn = sqlite3.connect(path, isolation_level=None)
+            self.conn.execute("PRAGMA journal_mode = WAL")
+            self.conn.execute("PRAGMA synchronous = NORMAL")
+        self.tables = {row[0]: self._columns(row[0]) for row in self.conn.execute(self._sql["tables"]).fetchall()}
+        for table, columns in self.tables.items(): self._drop_indexes(table, columns)
+
+    def _columns(self, table):
+        cursor = self.conn.execute(f"SELECT * FROM {_quote(table)} LIMIT 0")
+        return [d[0] for d in cursor.description]
+
+    def _index_specs(self, table, columns):
+        """(name, unique, columns) for every index `table` gets once loaded."""
+        specs = []
+        key = TABLE_KEYS.get(table)
+        if key and all(c in columns for c in key):
+            specs.append((f"{table}_key", table not in self.non_unique, ("district",) + key))
+        specs.extend((f"{table}_{c}", False, (c,)) for c in ID_COLUMNS if c in columns)
+        return specs
+
+    def _drop_indexes(self, table, columns):
+        for name, _, _ in self._index_specs(table, columns): self.conn.execute(f"DROP INDEX IF EXISTS {_quote(name)}")
+
+    def ensure_table(self, table, columns):
+        """Creates `table` (district + typed columns), or adds the columns an existing one lacks."""
+        types = self._sql["types"]
+        existing = self.tables.get(table)
+        if existing is None:
+            cols = [f"district {types['text']} NOT NULL"] + [f"{_quote(c)} {types[_column_kind(c)]}" for c in columns]
+            self.conn.execute(f"CREATE TABLE {_quote(table)} ({', '.join(cols)})")
+            self.tables[table] = ["district"] + list(columns)
+            return
+        for c in columns:
+            if c in existing: continue
+            self.conn.execute(f"ALTER TABLE {_quote(table)} ADD COLUMN {_quote(c)} {types[_column_kind(c)]}")
+            existing.append(c)
+
+    def insert(self, table, district, columns, rows):
+        converters = [_converter(_column_kind(c)) for c in columns]
+        records = [(district, *(conv(v) for conv, v in zip(converters, row))) for row in rows]
+        names = ", ".join(_quote(c) for c in ["district", *columns])
+        if self.backend == "duckdb":
+            import pandas as pd
+            casts = ", ".join(f"CAST({_quote(c)} AS DATE)" if _column_kind(c) == "date" else _quote(c) for c in ["district", *columns])
+            self.conn.register("_district_batch", pd.DataFrame.from_records(records, columns=["district", *columns]))
+            try: self.conn.execute(f"INSERT INTO {_quote(table)} ({names}) SELECT {casts} FROM _district_batch")
+            finally: self.conn.unregister("_district_batch")
+            return
+        placeholders = ", ".join("?" * (len(columns) + 1))
+        self.conn.executemany(f"INSERT INTO {_quote(table)} ({names}) VALUES ({placeholders})", records)
+
+    def district(self, name, buffer_rows, metrics=None):
+        """A DistrictWriter-compatible writer for one district; replaces that district's earlier rows."""
+        return DatabaseDistrictWriter(self, name, buffer_rows, metrics)
+
+    def finish(self):
+        """Builds the key and foreign-key indexes and closes the database."""
+        for table, columns in self.tables.items():
+            for name, unique, cols in self._index_specs(table, columns):
+                self.conn.execute(f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS {_quote(name)} "
+                                  f"ON {_quote(table)} ({', '.join(_quote(c) for c in cols)})")
+        self.conn.close()
+
+
+class _DatabaseTable:
+    """The file-writer side of a TableWriter (write_block/close), inserting into the database."""
+
+    def __init__(self, target, table, district):
+        self.extension = target.backend
+        self.target = target
+        self.table = table
+        self.district = district
+        self.path = target.path
+        self.rows_written = 0
+        self.bytes_written = 0
+        self._ready = False
+
+    def write_block(self, columns, rows):
+        if not self._ready:
+            self.target.ensure_table(self.table, columns)
+            self._ready = True
+        self.target.insert(self.table, self.district, columns, rows)
+        self.rows_written += len(rows)
+
+    def close(self): pass
+
+
+class DatabaseTableWriter(TableWriter):
+    def __init__(self, target, table, district, buffer_rows, metrics=None):
+        self._target, self._district = target, district
+        super().__init__(None, table, target.backend, buffer_rows, metrics)
+
+    def _open_files(self, output_dir, filename, fmt, file_options):
+        return [_DatabaseTable(self._target, filename, self._district)]
+
+    @property
+    def paths(self): return []
+
+
+class DatabaseDistrictWriter(DistrictWriter):
+    """Writes one district's tables into a DatabaseTarget inside a single transaction."""
+
+    def __init__(self, target, district, buffer_rows, metrics=None):
+        self.target = target
+        self.district = district
+        self.output_dir = target.path
+        self.buffer_rows = buffer_rows
+        self.metrics = metrics
+        self.tables = {}
+        target.conn.execute("BEGIN TRANSACTION")
+        for table in target.tables: target.conn.execute(f"DELETE FROM {_quote(table)} WHERE district = ?", [district])
+
+    def table(self, name):
+        if name not in self.tables:
+            self.tables[name] = DatabaseTableWriter(self.target, name, self.district, self.buffer_rows, self.metrics)
+        return self.tables[name]
+
+    def close(self):
+        super().close()
+        self.target.conn.execute("COMMIT")
@@ -0,0 +1,232 @@
+"""
+Day-over-day roster change feeds from a compact district snapshot.
+
+A generated district is reduced to the state its changes touch: student School_id / Grade /
+demographic flags, each section's School_id / Teacher_id / Grade, the teachers per school and
+the enrollments as (student, section) index pairs. That is saved as one compressed .npz (no
+pickling), next to the district's files.
+
+simulate_day() then draws one day of churn (drops, transfers, new enrollments, teacher
+reassignments, flag flips) and returns only the changed rows. How many changes happen is drawn
+from the churn rates, and each change is applied through dict indexes built once at load, so a
+day costs time in proportion to its changes, not to the size of the district.
+"""
+import os
+
+import numpy as np
+
+SNAPSHOT_NAME = "snapshot.npz"
+SNAPSHOT_VERSION = 1
+
+# Y/N columns that can flip from one day to the next
+FLIP_COLUMNS = ("IEP_status", "FRL_status", "ELL_status", "Section_504_status", "Gifted_status")
+
+# Churn rates: expected changes per day as a fraction of the population they act on
+CHURN_POPULATIONS = {
+    "drop": "enrollments",       # an enrollment is dropped
+    "transfer": "students",      # a student moves to another school (re-enrolled in as many sections there)
+    "enroll": "students",        # a student adds a section of their grade at their school
+    "teacher": "sections",       # a section gets another teacher of its school
+    "flags": "students",         # one of a student's FLIP_COLUMNS flips
+}
+
+
+def _column(data, name):
+    """One column from a table chunk, either a list of row dicts or a dict of columns."""
+    if isinstance(data, dict): return np.asarray(data[name]).astype(str)
+    return np.array([row[name] for row in data]).astype(str)
+
+
+class SnapshotBuilder:
+    """Collects the snapshot columns from a district's table chunks as they are generated."""
+    TABLE_COLUMNS = {
+        "students": ("Student_id", "School_id", "Grade") + FLIP_COLUMNS,
+        "sections": ("Section_id", "School_id", "Teacher_id", "Grade"),
+        "teachers": ("Teacher_id", "School_id"),
+        "enrollments": ("Student_id", "Section_id"),
+    }
+
+    def __init__(self):
+        self._parts = {table: {col: [] for col in cols} for table, cols in self.TABLE_COLUMNS.items()}
+
+    def add(self, table, data):
+        if table not in self._parts or data is None or len(data) == 0: return
+        for col, parts in self._parts[table].items(): parts.append(_column(data, col))
+
+    def _table(self, table):
+        return {col: np.concatenate(parts) if parts else np.empty(0, dtype=str) for col, parts in self._parts[table].items()}
+
+    def build(self, district_index):
+        students, sections = self._table("students"), self._table("sections")
+        teachers, enrollments = self._table("teachers"), self._table("enrollments")
+        # The denormalized contacts layout repeats student rows, one per contact
+        _, first = np.unique(students["Student_id"], return_index=True)
+        first.sort()
+        students = {col: values[first] for col, values in students.items()}
+        return DistrictSnapshot({
+            "student_id": students["Student_id"], "student_school": students["School_id"],
+            "student_grade": students["Grade"],
+            "student_flags": np.stack([students[c] == "Y" for c in FLIP_COLUMNS], axis=1) if len(first) else np.zeros((0, len(FLIP_COLUMNS)), dtype=bool),
+            "section_id": sections["Section_id"], "section_school": sections["School_id"],
+            "section_teacher": sections["Teacher_id"], "section_grade": sections["Grade"],
+            "teacher_id": teachers["Teacher_id"], "teacher_school": teachers["School_id"],
+            "enroll_student": _index_of(students["Student_id"], enrollments["Student_id"]),
+            "enroll_section": _index_of(sections["Section_id"], enrollments["Section_id"]),
+            "meta": np.array([SNAPSHOT_VERSION, district_index, 0], dtype=np.int64),
+        })
+
+
+def _index_of(keys, values):
+    """Positions of `values` in the unique array `keys`."""
+    order = np.argsort(keys)
+    return order[np.searchsorted(keys, values, sorter=order)].astype(np.int64)
+
+
+class DistrictSnapshot:
+    def __init__(self, arrays):
+        self.arrays = arrays
+        version, self.district_index, self.day = (int(x) for x in arrays["meta"])
+        if version != SNAPSHOT_VERSION: raise ValueError(f"snapshot version {version} is not supported (expected {SNAPSHOT_VERSION})")
+        self._indexed = False
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data: return cls({name: data[name] for name in data.files})
+
+    def save(self, path):
+        """Writes to a temp file then renames it, so a hard-linked (cached) copy is never modified in place."""
+        if self._indexed: self._pack()
+        tmp = f"{path}.tmp.npz"
+        np.savez_compressed(tmp, **dict(self.arrays, meta=np.array([SNAPSHOT_VERSION, self.district_index, self.day], dtype=np.int64)))
+        os.replace(tmp, path)
+
+    @property
+    def num_students(self): return len(self.arrays["student_id"])
+
+    def _index(self):
+        """Mutable per-day state: enrollments per student and sections per (school, grade)."""
+        if self._indexed: return
+        a = self.arrays
+        self.student_school = a["student_school"].astype(object)
+        self.student_flags = a["student_flags"].copy()
+        self.section_teacher = a["section_teacher"].astype(object)
+        self.schools = list(dict.fromkeys(a["section_school"]))
+        self.student_sections = [set() for _ in range(self.num_students)]
+        for stu, sec in zip(a["enroll_student"].tolist(), a["enroll_section"].tolist()): self.student_sections[stu].add(sec)
+        self.num_enrollments = len(a["enroll_student"])
+        self.sections_by_school_grade, self.sections_by_school, self.teachers_by_school = {}, {}, {}
+        for sec, (school, grade) in enumerate(zip(a["section_school"].tolist(), a["section_grade"].tolist())):
+            self.sections_by_school_grade.setdefault((school, grade), []).append(sec)
+            self.sections_by_school.setdefault(school, []).append(sec)
+        for teacher, school in zip(a["teacher_id"].tolist(), a["teacher_school"].tolist()):
+            self.teachers_by_school.setdefault(school, []).append(teacher)
+        self._indexed = True
+
+    def _pack(self):
+        """Folds the mutable state back into the saved arrays."""
+        pairs = [(stu, sec) for stu, secs in enumerate(self.student_sections) for sec in sorted(secs)]
+        enroll = np.array(pairs, dtype=np.int64).reshape(-1, 2)
+        self.arrays.update({
+            "student_school": self.student_school.astype(str), "student_flags": self.student_flags,
+            "section_teacher": self.section_teacher.astype(str),
+            "enroll_student": enroll[:, 0], "enroll_section": enroll[:, 1],
+        })
+
+    def _open_sections(self, stu, school):
+        """Sections `stu` could join at `school`: their grade if offered there, else any grade."""
+        grade = str(self.arrays["student_grade"][stu])
+        options = self.sections_by_school_grade.get((school, grade)) or self.sections_by_school.get(school, [])
+        return [sec for sec in options if sec not in self.student_sections[stu]]
+
+    def simulate_day(self, seed, rates):
+        """
+        Advances the snapshot one day and returns that day's changes as
+        {table: {"adds" | "updates" | "deletes": dict of columns}}. Deletes are meant to be applied
+        before adds. The draws depend only on (seed, district, day), so replaying is deterministic.
+        """
+        self._index()
+        self.day += 1
+        rng = np.random.default_rng(np.random.SeedSequence([seed, self.district_index, 2, self.day]))
+        a = self.arrays
+        sizes = {"students": self.num_students, "sections": len(a["section_id"]), "enrollments": self.num_enrollments}
+
+        def count(kind):
+            """How many `kind` changes happen today."""
+            return int(rng.binomial(sizes[CHURN_POPULATIONS[kind]], min(max(rates.get(kind, 0.0), 0.0), 1.0)))
+
+        def pick(kind):
+            """Distinct random members of the population `kind` acts on (O(changes))."""
+            n = sizes[CHURN_POPULATIONS[kind]]
+            return list(dict.fromkeys(rng.integers(0, n, size=count(kind)).tolist())) if n else []
+
+        enroll_adds, enroll_deletes, touched_students, touched_sections = [], [], {}, {}
+
+        # Drops: a random student, then one of their sections (students without any are skipped)
+        for _ in range(count("drop")):
+            stu = int(rng.integers(self.num_students))
+            if not self.student_sections[stu]: continue
+            secs = sorted(self.student_sections[stu])
+            sec = secs[int(rng.integers(len(secs)))]
+            self.student_sections[stu].discard(sec)
+            self.num_enrollments -= 1
+            enroll_deletes.append((stu, sec))
+
+        if len(self.schools) > 1:
+            for stu in pick("transfer"):
+                others = [school for school in self.schools if school != self.student_school[stu]]
+                new = others[int(rng.integers(len(others)))]
+                dropped = sorted(self.student_sections[stu])
+                enroll_deletes.extend((stu, sec) for sec in dropped)
+                self.student_sections[stu] = set()
+                self.student_school[stu] = new
+                options = self._open_sections(stu, new)
+                joined = rng.permutation(options)[:max(len(dropped), 1)].tolist() if options else []
+                self.student_sections[stu].update(joined)
+                self.num_enrollments += len(joined) - len(dropped)
+                enroll_adds.extend((stu, sec) for sec in joined)
+                touched_students[stu] = True
+
+        for stu in pick("enroll"):
+            options = self._open_sections(stu, self.student_school[stu])
+            if not options: continue
+            sec = options[int(rng.integers(len(options)))]
+            self.student_sections[stu].add(sec)
+            self.num_enrollments += 1
+            enroll_adds.append((stu, sec))
+
+        for sec in pick("teacher"):
+            school = a["section_school"][sec]
+            others = [t for t in self.teachers_by_school.get(school, []) if t != self.section_teacher[sec]]
+            if not others: continue
+            self.section_teacher[sec] = others[int(rng.integers(len(others)))]
+            touched_sections[sec] = True
+
+        for stu in pick("flags"):
+            col = int(rng.integers(len(FLIP_COLUMNS)))
+            self.student_flags[stu, col] = not self.student_flags[stu, col]
+            touched_students[stu] = True
+
+        return {
+            "students": {"updates": self._student_rows(list(touched_students))},
+            "sections": {"updates": self._section_rows(list(touched_sections))},
+            "enrollments": {"adds": self._enrollment_rows(enroll_adds), "deletes": self._enrollment_rows(enroll_deletes)},
+        }
+
+    def _student_rows(self, students):
+        a = self.arrays
+        rows = {"Student_id": a["student_id"][students].tolist(), "School_id": [self.student_school[s] for s in students]}
+        for c, col in enumerate(FLIP_COLUMNS): rows[col] = ["Y" if self.student_flags[s, c] else "N" for s in students]
+        return rows
+
+    def _section_rows(self, sections):
+        a = self.arrays
+        return {"Section_id": a["section_id"][sections].tolist(), "School_id": a["section_school"][sections].tolist(),
+                "Teacher_id": [self.section_teacher[s] for s in sections]}
+
+    def _enrollment_rows(self, pairs):
+        a = self.arrays
+        return {
+            "School_id": [a["section_school"][sec] for _, sec in pairs],
+            "Section_id": [a["section_id"][sec] for _, sec in pairs],
+            "Student_id": [a["student_id"][stu] for stu, _ in pairs],
+        }
@@ -0,0 +1,92 @@
+"""
+Collision-free ID allocation.
+
+Every entity gets an ordinal that is unique within its kind (students, sections, ...):
+`district * capacity + position`. Here `position` is the entity's place inside its district and
+`capacity` is the most positions one district can use. Alphanumeric IDs run the ordinal through
+a keyed Feistel permutation of the full 4*length-bit hex space. The permutation is a bijection,
+so two ordinals can never share an ID, but the IDs still look random and depend on the seed.
+Sequential IDs put each (district, kind) in its own decimal block.
+"""
+import numpy as np
+
+FEISTEL_ROUNDS = 4
+
+# kind -> (namespace code, hex digits); schools pick 5 or 6 digits per school
+ID_KINDS = {
+    "school": (1, 6),
+    "teacher": (2, 7),
+    "staff": (3, 7),
+    "section": (4, 8),
+    "student": (5, 6),
+    "contact": (6, 8),
+    "attendance": (7, 10),
+}
+# Kinds that follow ID_MODE; contacts and attendance records are always hex
+SEQUENTIAL_KINDS = ["school", "teacher", "staff", "section", "student"]
+MIN_SEQUENTIAL_DIGITS = 5
+
+_MIX_1 = np.uint64(0x9E3779B97F4A7C15)
+_MIX_2 = np.uint64(0xBF58476D1CE4E5B9)
+
+
+def _round_function(half, key, mask):
+    """splitmix64-style mixer of one Feistel half (uint64 arithmetic wraps, which is intended)."""
+    x = (half ^ key) * _MIX_1
+    x ^= x >> np.uint64(31)
+    x *= _MIX_2
+    x ^= x >> np.uint64(29)
+    return x & mask
+
+
+def feistel_permute(values, bits, keys):
+    """Keyed bijection of [0, 2**bits) for even `bits`, applied elementwise to `values`."""
+    half = np.uint64(bits // 2)
+    mask = np.uint64((1 << (bits // 2)) - 1)
+    x = np.asarray(values, dtype=np.uint64)
+    left, right = x >> half, x & mask
+    for key in keys:
+        left, right = right, left ^ _round_function(right, key, mask)
+    return (left << half) | right
+
+
+class IdAllocator:
+    """
+    IDs for one run. `capacities` maps each kind in ID_KINDS to the largest number of positions a
+    single district can use, which keeps districts in disjoint ordinal ranges.
+    """
+
+    def __init__(self, seed, capacities):
+        self.capacities = capacities
+        self._keys = {
+            kind: np.random.SeedSequence([seed, code]).generate_state(FEISTEL_ROUNDS, dtype=np.uint64)
+            for kind, (code, _) in ID_KINDS.items()
+        }
+        largest = max(capacities[k] for k in SEQUENTIAL_KINDS)
+        self.sequential_digits = max(MIN_SEQUENTIAL_DIGITS, len(str(largest - 1)))
+
+    def ordinals(self, kind, district, positions):
+        positions = np.asarray(positions, dtype=np.int64)
+        if len(positions) and positions.max() >= self.capacities[kind]:
+            raise ValueError(f"{kind} position {positions.max()} is outside its capacity {self.capacities[kind]}")
+        return district * self.capacities[kind] + positions
+
+    def check_capacity(self, num_districts):
+        """Raises ValueError when `num_districts` districts would overflow any hex ID space."""
+        for kind, (_, length) in ID_KINDS.items():
+            length = 5 if kind == "school" else length
+            needed, available = num_districts * self.capacities[kind], 1 << (4 * length)
+            if needed > available:
+                raise ValueError(f"{needed:,} {kind} IDs needed but {length} hex digits only hold {available:,}; reduce the district or roster sizes")
+
+    def hex_ids(self, kind, district, positions, length=None):
+        length = length or ID_KINDS[kind][1]
+        ordinals = self.ordinals(kind, district, positions)
+        if len(ordinals) and ordinals.max() >= 1 << (4 * length):
+            raise ValueError(f"{kind} IDs exhausted: {length} hex digits hold {1 << (4 * length):,}")
+        return [f"{v:0{length}x}" for v in feistel_permute(ordinals, 4 * length, self._keys[kind]).tolist()]
+
+    def sequential_ids(self, kind, district, positions):
+        positions = self.ordinals(kind, district, positions) - district * self.capacities[kind]
+        block = ((district + 1) * 10 + ID_KINDS[kind][0]) * 10 ** self.sequential_digits
+        return [str(block + p) for p in positions.tolist()]
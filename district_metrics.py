@@ -0,0 +1,178 @@
+"""
+Per-stage timing and memory for the generator.
+
+Code under `with metrics.stage("teachers") as st:` is charged to that stage, and `st.rows`
+(`st.bytes` for writers) counts what it produced. Stages nest without double counting: entering
+a nested stage pauses its parent, so every second is charged to exactly one stage (exclusive
+time). The same goes for memory: each stage is charged with how far it raised its process's peak
+RSS (peak_rss_growth_bytes), so resetting the peak (reset_peak_rss) before a district makes its
+stages add up to the district's own peak.
+
+Work done in another process is recorded under scope() and merged back in by the caller, along
+with that process's peak RSS (worker_peak_rss). One stage can also be run under cProfile
+(profile()/dump_profile()).
+"""
+import copy
+import sys
+import time
+from contextlib import contextmanager
+
+try: import resource
+except ImportError: resource = None  # Windows: no peak RSS
+
+FIELDS = ("seconds", "rows", "bytes", "calls", "peak_rss_growth_bytes")
+
+
+def _max_rss():
+    """This process's peak RSS in bytes since it started or was last reset (0 where unsupported)."""
+    if resource is None: return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # Linux reports KiB
+
+
+def reset_peak_rss():
+    """
+    Lowers this process's peak RSS to its current RSS, so peak_rss_bytes() covers only what runs
+    next. Linux only (/proc/self/clear_refs); returns whether it worked.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as fh: fh.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_bytes():
+    """Peak resident set size of this process since the last reset_peak_rss() (None where unsupported)."""
+    return _max_rss() or None
+
+
+def children_peak_rss_bytes():
+    """Largest peak resident set size among this process's finished children, e.g. pool workers (None where unsupported)."""
+    if resource is None: return None
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return (peak if sys.platform == "darwin" else peak * 1024) or None
+
+
+def with_rates(stages):
+    """Adds rows_per_sec to a {stage: {seconds, rows, bytes, calls, peak_rss_growth_bytes}} mapping."""
+    return {
+        name: dict(rec, rows_per_sec=rec["rows"] / rec["seconds"] if rec["seconds"] else None)
+        for name, rec in stages.items()
+    }
+
+
+class _Stage:
+    __slots__ = ("name", "rows", "bytes", "_start", "_peak")
+
+    def __init__(self, name):
+        self.name = name
+        self.rows = 0
+        self.bytes = 0
+        self._start = 0.0
+        self._peak = 0
+
+
+class StageMetrics:
+    def __init__(self):
+        self.stages = {}
+        self._stack = []
+        self.worker_peak_rss = 0
+        self.peak_rss_scoped = False
+        self.profile_stage = None
+        self._profiler = None
+        self._profile_depth = 0
+
+    def reset(self):
+        self.stages = {}
+        self._stack = []
+        self.worker_peak_rss = 0
+
+    def reset_peaks(self):
+        """
+        Starts a new peak RSS window for this process (reset_peak_rss; peak_rss_scoped says whether
+        that worked) and for the workers merged from now on.
+        """
+        self.worker_peak_rss = 0
+        self.peak_rss_scoped = reset_peak_rss()
+
+    def _charge(self, name, **amounts):
+        rec = self.stages.setdefault(name, {"seconds": 0.0, **{k: 0 for k in FIELDS[1:]}})
+        for k, v in amounts.items(): rec[k] += v
+
+    def stage(self, name):
+        return _StageContext(self, name)
+
+    def snapshot(self):
+        """{stage: {seconds, rows, bytes, calls, peak_rss_growth_bytes, rows_per_sec}} for everything recorded so far."""
+        return with_rates(self.stages)
+
+    def totals(self):
+        return copy.deepcopy(self.stages)
+
+    def since(self, before):
+        """snapshot() of only what was recorded after `before` (an earlier totals())."""
+        diff = {}
+        for name, rec in self.stages.items():
+            old = before.get(name, dict.fromkeys(FIELDS, 0))
+            if rec["calls"] != old["calls"] or rec["seconds"] != old["seconds"]:
+                diff[name] = {k: rec[k] - old[k] for k in FIELDS}
+        return with_rates(diff)
+
+    @contextmanager
+    def scope(self):
+        """Records the enclosed stages into a fresh dict (yielded) instead of self.stages."""
+        saved, self.stages = self.stages, {}
+        scoped = self.stages
+        try: yield scoped
+        finally: self.stages = saved
+
+    def merge(self, stages, peak_rss=None):
+        """Adds stages recorded under scope() in another process, whose peak RSS meanwhile was `peak_rss`."""
+        for name, rec in stages.items(): self._charge(name, **{k: rec[k] for k in FIELDS})
+        if peak_rss: self.worker_peak_rss = max(self.worker_peak_rss, peak_rss)
+
+    def profile(self, name):
+        """Runs every `name` stage under cProfile from now on."""
+        import cProfile
+        self.profile_stage = name
+        self._profiler = cProfile.Profile()
+
+    def dump_profile(self, path):
+        """Writes the collected cProfile stats to `path` and returns a pstats.Stats (None if nothing ran)."""
+        import pstats
+        if self._profiler is None or not self._profiler.getstats(): return None
+        self._profiler.dump_stats(path)
+        return pstats.Stats(path)
+
+
+class _StageContext:
+    __slots__ = ("metrics", "current")
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.current = _Stage(name)
+
+    def __enter__(self):
+        now, peak = time.perf_counter(), _max_rss()
+        stack = self.metrics._stack
+        if stack:
+            parent = stack[-1]
+            self.metrics._charge(parent.name, seconds=now - parent._start, peak_rss_growth_bytes=peak - parent._peak)
+        self.current._start, self.current._peak = now, peak
+        stack.append(self.current)
+        if self.current.name == self.metrics.profile_stage:
+            if not self.metrics._profile_depth: self.metrics._profiler.enable()
+            self.metrics._profile_depth += 1
+        return self.current
+
+    def __exit__(self, *exc):
+        if self.current.name == self.metrics.profile_stage:
+            self.metrics._profile_depth -= 1
+            if not self.metrics._profile_depth: self.metrics._profiler.disable()
+        now, peak = time.perf_counter(), _max_rss()
+        stack = self.metrics._stack
+        stage = stack.pop()
+        self.metrics._charge(stage.name, seconds=now - stage._start, rows=stage.rows, bytes=stage.bytes, calls=1, peak_rss_growth_bytes=peak - stage._peak)
+        if stack: stack[-1]._start, stack[-1]._peak = now, peak
+        return False
@@ -0,0 +1,185 @@
+"""
+Compressed packaging of the text output (PACKAGE = "gzip", "zstd" or "zip").
+
+Each table file is compressed as it is written. The writer thread only encodes text. The bytes
+go through a small bounded queue to a CompressedSink thread, which compresses them and writes the
+result. zlib and zstandard release the GIL, so compression overlaps with generation, and the
+queue keeps memory bounded when compression falls behind.
+
+gzip / zstd write `{table}.{ext}.gz` / `.zst` files into the district folder. zip compresses each
+table to a raw deflate stream in a temp folder. When the district closes, the streams are copied
+into one `{dist_name}_Data.zip` (write_zip; Zip64 once an entry or offset passes 4 GiB).
+There is no second compression pass. Every package gets a package_manifest.json listing each
+file's rows, stored and uncompressed bytes and the SHA-256 of its uncompressed contents. Headers
+carry no timestamps, so a seed still gives byte-identical output.
+"""
+import hashlib
+import io
+import json
+import os
+import queue
+import shutil
+import struct
+import threading
+import zlib
+
+PACKAGE_MODES = ["none", "gzip", "zstd", "zip"]
+# mode -> suffix appended to each table file (zip entries keep their plain names)
+PACKAGE_SUFFIXES = {"gzip": ".gz", "zstd": ".zst", "zip": ""}
+MANIFEST_NAME = "package_manifest.json"   # not manifest.json, which district_cache entries use
+SINK_BLOCK_BYTES = 1 << 20      # bytes handed to the compression thread at a time
+SINK_QUEUE_BLOCKS = 4           # blocks buffered per file before the writer waits
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+ZIP64_LIMIT = 0xFFFFFFFF       # sizes and offsets from here on go in Zip64 extra fields
+
+
+def require_package(mode):
+    """Fails fast (before any generation) when `mode` needs an optional package that is missing."""
+    if mode == "zstd":
+        try: import zstandard  # noqa: F401
+        except ImportError: raise RuntimeError("PACKAGE='zstd' needs zstandard: pip install zstandard") from None
+
+
+def _compressor(mode):
+    """A compress()/flush() object: a gzip stream, a zstd frame or raw deflate (zip entries)."""
+    if mode == "zstd":
+        import zstandard
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+    return zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31 if mode == "gzip" else -15)
+
+
+class CompressedSink(io.RawIOBase):
+    """
+    Write-only binary file whose bytes are compressed on a background thread into `path`.
+    Also tracks the uncompressed size, SHA-256 and CRC-32, and the stored (compressed) size.
+    """
+
+    def __init__(self, path, mode):
+        super().__init__()
+        self.path = path
+        self.raw_bytes = 0
+        self.stored_bytes = 0
+        self.crc32 = 0
+        self._sha = hashlib.sha256()
+        self._compressor = _compressor(mode)
+        self._fh = open(path, "wb")
+        self._queue = queue.Queue(maxsize=SINK_QUEUE_BLOCKS)
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name=f"compress:{os.path.basename(path)}", daemon=True)
+        self._thread.start()
+
+    def writable(self): return True
+
+    def write(self, data):
+        if self._error: raise self._error
+        self._queue.put(bytes(data))
+        return len(data)
+
+    def _run(self):
+        while True:
+            block = self._queue.get()
+            if block is None: break
+            if self._error: continue
+            try:
+                self.raw_bytes += len(block)
+                self._sha.update(block)
+                self.crc32 = zlib.crc32(block, self.crc32)
+                self._store(self._compressor.compress(block))
+            except Exception as e:  # surfaced by the next write() or close()
+                self._error = e
+
+    def _store(self, data):
+        self._fh.write(data)
+        self.stored_bytes += len(data)
+
+    @property
+    def sha256(self): return self._sha.hexdigest()
+
+    def close(self):
+        if self.closed: return
+        super().close()
+        self._queue.put(None)
+        self._thread.join()
+        try:
+            if self._error: raise self._error
+            self._store(self._compressor.flush())
+        finally:
+            self._fh.close()
+
+
+def open_text(path, mode, newline=None):
+    """A text file for `path` that compresses through a CompressedSink; returns (file, sink)."""
+    sink = CompressedSink(path, mode)
+    return io.TextIOWrapper(io.BufferedWriter(sink, SINK_BLOCK_BYTES), encoding="utf-8", newline=newline), sink
+
+
+def manifest(mode, entries):
+    """The package manifest document for `entries`: [{"table", "file", "rows", "bytes", "raw_bytes", "sha256"}]."""
+    return {"package": mode, "files": entries}
+
+
+def write_manifest(path, mode, entries):
+    with open(path, "w", encoding="utf-8") as fh: json.dump(manifest(mode, entries), fh, indent=2)
+
+
+# --- zip assembly -----------------------------------------------------------------------------
+_DOS_DATE = (0 << 9) | (1 << 5) | 1     # 1980-01-01, the earliest zip date, 00:00:00
+_UTF8_FLAG = 0x0800
+_ZIP64_MARK = 0xFFFFFFFF        # 32-bit field value meaning "see the Zip64 field"
+
+
+def _zip64_extra(*values):
+    return struct.pack("<HH", 0x0001, 8 * len(values)) + b"".join(struct.pack("<Q", v) for v in values)
+
+
+def write_zip(path, members):
+    """
+    Writes a zip of already-compressed members: (name, raw deflate file, CRC-32, compressed size,
+    uncompressed size) tuples, whose data is copied as is. Small members may give their data as
+    bytes instead of a file path.
+    """
+    central = []
+    with open(path, "wb") as out:
+        for name, data, crc, csize, usize in members:
+            offset = out.tell()
+            encoded = name.encode("utf-8")
+            zip64 = csize >= ZIP64_LIMIT or usize >= ZIP64_LIMIT
+            extra = _zip64_extra(usize, csize) if zip64 else b""
+            out.write(struct.pack("<IHHHHHIIIHH", 0x04034B50, 45 if zip64 else 20, _UTF8_FLAG, 8, 0, _DOS_DATE,
+                                  crc, _ZIP64_MARK if zip64 else csize, _ZIP64_MARK if zip64 else usize, len(encoded), len(extra)))
+            out.write(encoded + extra)
+            if isinstance(data, bytes): out.write(data)
+            else:
+                with open(data, "rb") as fh: shutil.copyfileobj(fh, out, 1 << 22)
+            central.append((encoded, crc, csize, usize, offset))
+
+        cd_start = out.tell()
+        for encoded, crc, csize, usize, offset in central:
+            big = [v for v in (usize, csize, offset) if v >= ZIP64_LIMIT]
+            extra = _zip64_extra(*big) if big else b""
+            clamp = lambda v: _ZIP64_MARK if v >= ZIP64_LIMIT else v
+            version = 45 if big else 20
+            out.write(struct.pack("<IHHHHHHIIIHHHHHII", 0x02014B50, 0x0300 | version, version, _UTF8_FLAG, 8, 0, _DOS_DATE,
+                                  crc, clamp(csize), clamp(usize), len(encoded), len(extra), 0, 0, 0, 0o644 << 16, clamp(offset)))
+            out.write(encoded + extra)
+        cd_end = out.tell()
+
+        cd_size, count = cd_end - cd_start, len(central)
+        if cd_start >= ZIP64_LIMIT or cd_size >= ZIP64_LIMIT or count >= 0xFFFF:
+            out.write(struct.pack("<IQHHIIQQQQ", 0x06064B50, 44, 45, 45, 0, 0, count, count, cd_size, cd_start))
+            out.write(struct.pack("<IIQI", 0x07064B50, 0, cd_end, 1))
+            out.write(struct.pack("<IHHHHIIH", 0x06054B50, 0, 0, 0xFFFF, 0xFFFF, _ZIP64_MARK, _ZIP64_MARK, 0))
+        else:
+            out.write(struct.pack("<IHHHHIIH", 0x06054B50, 0, 0, count, count, cd_size, cd_start, 0))
+
+
+def deflate_bytes(data):
+    """(raw deflate data, CRC-32) of a small in-memory member."""
+    comp = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, -15)
+    return comp.compress(data) + comp.flush(), zlib.crc32(data)
+
+
+def parts_dir(archive):
+    """Temp folder the raw deflate streams of `archive` are written to before assembly."""
+    return f"{os.path.splitext(archive)[0]}.parts"
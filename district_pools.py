@@ -0,0 +1,133 @@
+"""
+Pre-sampled name / phone / address pools.
+
+Faker resolves every `first_name_male()` / `last_name()` / `street_address()` call through its
+provider dispatch, which dominates roster generation once the RNG is vectorized. This module
+pulls the en_US provider word lists (with Faker's own frequency weights) out once, caches them
+as JSON on disk, and samples them in bulk by index with NumPy. Only the vectorized and counter
+generation modes draw from the pools; the standard mode keeps its per-row Faker calls.
+"""
+import json
+import os
+
+import numpy as np
+
+POOL_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "demo-district-generator")
+
+
+def _weighted(values):
+    """Faker stores weighted lists as OrderedDict(value -> weight) and unweighted ones as tuples."""
+    if hasattr(values, "items"):
+        return [list(values.keys()), [float(w) for w in values.values()]]
+    return [list(values), None]
+
+
+def extract_provider_lists(locale="en_US"):
+    """Reads the raw word lists straight from Faker's locale providers (slow path, cache miss only)."""
+    from importlib import import_module
+    person = import_module(f"faker.providers.person.{locale}").Provider
+    address = import_module(f"faker.providers.address.{locale}").Provider
+    return {
+        "first_names_male": _weighted(person.first_names_male),
+        "first_names_female": _weighted(person.first_names_female),
+        "last_names": _weighted(person.last_names),
+        "street_suffixes": _weighted(address.street_suffixes),
+        "secondary_prefixes": [f.split(" ")[0] for f in address.secondary_address_formats],
+    }
+
+
+def load_pool_data(locale="en_US", cache_dir=POOL_CACHE_DIR):
+    """
+    Word lists for `locale`, from the on-disk cache when present.
+    The cache file is keyed by the installed Faker version so an upgrade rebuilds it.
+    """
+    from importlib import metadata  # ~40ms to import, so only when pools are first built
+    try: faker_version = metadata.version("faker")
+    except metadata.PackageNotFoundError: faker_version = "unknown"
+    cache_path = os.path.join(cache_dir, f"faker_pools_{locale}_{faker_version}.json")
+
+    if os.path.exists(cache_path):
+        with open(cache_path, encoding="utf-8") as fh:
+            return json.load(fh)
+
+    data = extract_provider_lists(locale)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as fh:
+            json.dump(data, fh)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass  # Read-only home directory: pools still work, just without the cache
+    return data
+
+
+class _Pool:
+    """One word list plus its cumulative weights for inverse-CDF sampling."""
+
+    def __init__(self, values, weights):
+        self.values = np.asarray(values, dtype=object)
+        self.cdf = None
+        if weights is not None:
+            cdf = np.cumsum(np.asarray(weights, dtype=float))
+            self.cdf = cdf / cdf[-1]
+
+    def sample(self, rng, n):
+        if self.cdf is None: idx = rng.integers(0, len(self.values), n)
+        else: idx = np.minimum(np.searchsorted(self.cdf, rng.random(n), side="right"), len(self.values) - 1)
+        return self.values[idx]
+
+
+class NamePools:
+    """
+    Bulk samplers for people, phones and street addresses.
+    Every method takes a count and returns an object ndarray of strings drawn from `rng`.
+    """
+
+    def __init__(self, rng, locale="en_US", cache_dir=POOL_CACHE_DIR):
+        data = load_pool_data(locale, cache_dir)
+        self.rng = rng
+        self._male = _Pool(*data["first_names_male"])
+        self._female = _Pool(*data["first_names_female"])
+        self._last = _Pool(*data["last_names"])
+        self._suffix = _Pool(*data["street_suffixes"])
+        self._secondary = np.asarray(data["secondary_prefixes"], dtype=object)
+
+    def using(self, rng):
+        """The same word lists drawing from another generator (e.g. district_counter.CounterDraws)."""
+        other = object.__new__(NamePools)
+        other.__dict__.update(self.__dict__, rng=rng)
+        return other
+
+    def first_names_male(self, n): return self._male.sample(self.rng, n)
+    def first_names_female(self, n): return self._female.sample(self.rng, n)
+    def last_names(self, n): return self._last.sample(self.rng, n)
+
+    def first_names(self, n, genders=None):
+        """First names matching `genders` ('M'/'F' per row), or a 50/50 mix when omitted."""
+        if genders is None: genders = np.where(self.rng.random(n) < 0.5, 'M', 'F')
+        return np.where(np.asarray(genders) == 'M', self.first_names_male(n), self.first_names_female(n))
+
+    def full_names(self, n):
+        return np.char.add(np.char.add(self.first_names(n).astype(str), " "), self.last_names(n).astype(str)).astype(object)
+
+    def phones(self, n):
+        """10-digit NANP numbers (area code and exchange never start with 0/1), already clean."""
+        area = self.rng.integers(200, 1000, n, dtype=np.int64)
+        exchange = self.rng.integers(200, 1000, n, dtype=np.int64)
+        line = self.rng.integers(0, 10000, n, dtype=np.int64)
+        return (area * 10_000_000 + exchange * 10_000 + line).astype(str).astype(object)
+
+    def street_addresses(self, n):
+        """'{building} {name} {suffix}', with an 'Apt./Suite ###' tail on half of them like Faker."""
+        digits = self.rng.integers(3, 6, n)
+        building = self.rng.integers(10 ** (digits - 1), 10 ** digits)
+        names = np.where(self.rng.random(n) < 0.5, self.first_names(n), self.last_names(n))
+        suffixes = self._suffix.sample(self.rng, n)
+        secondary = self._secondary[self.rng.integers(0, len(self._secondary), n)]
+        units = self.rng.integers(100, 1000, n)
+        with_unit = self.rng.random(n) < 0.5
+        return np.array([
+            f"{b} {nm} {sf} {sec} {u}" if w else f"{b} {nm} {sf}"
+            for b, nm, sf, sec, u, w in zip(building, names, suffixes, secondary, units, with_unit)
+        ], dtype=object)
@@ -0,0 +1,211 @@
+"""
+Local stand-in for the Clever API: paginated JSON over plain asyncio HTTP/1.1 (keep-alive, GET only).
+
+    GET /v3.0/{districts|schools|sections|students|teachers|contacts|enrollments}?limit=100&starting_after=<cursor>
+
+Responses have the Clever v3 shape, {"data": [{"data": {...}}], "links": [{"rel": "self"|"next", "uri": ...}]},
+with each record's SFTP columns plus "id" and "district". Records carry no "uri": there are no
+per-record endpoints to point at, since finding one record by id would mean generating every school.
+Every collection is ordered district, school, row. Its cursors are opaque (district, school, row)
+positions, so resuming a page costs nothing however deep it is.
+
+Nothing is generated up front. A page generates only the schools it touches, each from its own
+seed (the generator's seed_unit), so the pages are identical to the files a normal run writes
+for the same config. The most recently used schools are kept in an LRU cache, with each served
+collection's records JSON-encoded once, so a page of a cached school is just a string join.
+Generation runs on the event loop itself: the generator reseeds shared module state, so it must
+never run concurrently.
+"""
+import asyncio
+import base64
+import json
+from collections import OrderedDict
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+import numpy as np
+
+API_PREFIX = "/v3.0"
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 10000
+
+# collection -> (school table, id column); districts come from the contexts instead
+COLLECTIONS = {
+    "schools": ("schools", "School_id"), "sections": ("sections", "Section_id"),
+    "students": ("students", "Student_id"), "teachers": ("teachers", "Teacher_id"),
+    "contacts": ("contacts", "Contact_sis_id"), "enrollments": ("enrollments", None),
+}
+
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+
+
+class RequestError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def encode_cursor(district, school, row):
+    return base64.urlsafe_b64encode(f"{district}.{school}.{row}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    try:
+        district, school, row = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode().split(".")
+        return int(district), int(school), int(row)
+    except (ValueError, UnicodeDecodeError):
+        raise RequestError(400, f"invalid cursor: {token!r}") from None
+
+
+def _json_default(value):
+    if isinstance(value, np.generic): return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+_dumps = json.JSONEncoder(separators=(",", ":"), default=_json_default).encode
+
+
+def table_rows(data):
+    """A table given as row dicts or a dict of columns, as row dicts."""
+    if isinstance(data, dict): return [dict(zip(data, values)) for values in zip(*data.values())]
+    return data
+
+
+def encode_records(rows, id_col, dist_name):
+    """Each row as its encoded {"data": {...}} list item."""
+    return [_dumps({"data": {"id": row[id_col] if id_col else None, "district": dist_name, **row}}) for row in rows]
+
+
+def content_length(headers):
+    """A request's Content-Length: 0 when absent, None when it is not a non-negative integer."""
+    try: length = int(headers.get("content-length", 0))
+    except ValueError: return None
+    return length if length >= 0 else None
+
+
+class DistrictStore:
+    """
+    Lazily generated, LRU-cached schools. `school_tables(ctx, s_idx)` returns a school's
+    {table: rows or columns}, the way the generator's generate_school does.
+    """
+
+    def __init__(self, contexts, schools_per_district, school_tables, cache_schools=64):
+        self.contexts = contexts
+        self.schools_per_district = schools_per_district
+        self.school_tables = school_tables
+        self.cache_schools = cache_schools
+        self._cache = OrderedDict()
+        self.generated = 0
+
+    def school(self, district, s_idx):
+        """{"tables": generated tables, "encoded": {collection: encoded records}} of one school."""
+        key = (district, s_idx)
+        entry = self._cache.get(key)
+        if entry is None:
+            entry = {"tables": self.school_tables(self.contexts[district], s_idx), "encoded": {}}
+            self.generated += 1
+            self._cache[key] = entry
+            if len(self._cache) > self.cache_schools: self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(key)
+        return entry
+
+    def records(self, collection, district, s_idx):
+        entry = self.school(district, s_idx)
+        encoded = entry["encoded"].get(collection)
+        if encoded is None:
+            table, id_col = COLLECTIONS[collection]
+            rows = table_rows(entry["tables"].get(table) or [])
+            encoded = entry["encoded"][collection] = encode_records(rows, id_col, self.contexts[district]["dist_name"])
+        return encoded
+
+    def page(self, collection, cursor, limit):
+        """(encoded records, next cursor or None) for one page of `collection` starting at `cursor`."""
+        district, s_idx, row = cursor
+        if not (0 <= district < len(self.contexts) and 0 <= s_idx < self.schools_per_district and row >= 0):
+            raise RequestError(400, f"cursor out of range: {cursor}")
+        if collection == "districts":
+            rows = [{"id": ctx["dist_name"], "name": ctx["dist_name"], "state": ctx["state_abbr"]} for ctx in self.contexts[district:district + limit]]
+            stop = district + len(rows)
+            return [_dumps({"data": r}) for r in rows], (stop, 0, 0) if stop < len(self.contexts) else None
+
+        records = []
+        while district < len(self.contexts):
+            if s_idx >= self.schools_per_district:
+                district, s_idx, row = district + 1, 0, 0
+                continue
+            encoded = self.records(collection, district, s_idx)
+            n = len(encoded)
+            if row < n:
+                take = min(n, row + limit - len(records))
+                records.extend(encoded[row:take])
+                row = take
+            if len(records) >= limit:
+                if row >= n: s_idx, row = s_idx + 1, 0
+                if s_idx >= self.schools_per_district: district, s_idx = district + 1, 0
+                # A next link even if the rest turns out empty; that page just has no data
+                return records, (district, s_idx, row) if district < len(self.contexts) else None
+            s_idx, row = s_idx + 1, 0
+        return records, None
+
+
+class ClientServer:
+    """The HTTP side: routes /v3.0/{collection} requests to a DistrictStore."""
+
+    def __init__(self, store):
+        self.store = store
+        self.requests = 0
+
+    def handle(self, method, target):
+        """(status, encoded JSON body) for one request."""
+        if method != "GET": raise RequestError(405, f"{method} is not supported")
+        url = urlsplit(target)
+        parts = url.path.rstrip("/").split("/")
+        if len(parts) != 3 or "/".join(parts[:2]) != API_PREFIX or (parts[2] not in COLLECTIONS and parts[2] != "districts"):
+            raise RequestError(404, f"no such endpoint: {url.path}")
+        collection = parts[2]
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        try: limit = int(query.get("limit", DEFAULT_LIMIT))
+        except ValueError: raise RequestError(400, "limit must be an integer") from None
+        if not 1 <= limit <= MAX_LIMIT: raise RequestError(400, f"limit must be between 1 and {MAX_LIMIT}")
+        cursor = decode_cursor(query["starting_after"]) if "starting_after" in query else (0, 0, 0)
+
+        records, next_cursor = self.store.page(collection, cursor, limit)
+        links = [{"rel": "self", "uri": target}]
+        if next_cursor is not None:
+            query = urlencode({"limit": limit, "starting_after": encode_cursor(*next_cursor)})
+            links.append({"rel": "next", "uri": f"{API_PREFIX}/{collection}?{query}"})
+        return 200, f'{{"data":[{",".join(records)}],"links":{_dumps(links)}}}'.encode("utf-8")
+
+    async def connection(self, reader, writer):
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                lines = head.decode("latin-1").split("\r\n")
+                try: method, target, version = lines[0].split(" ")
+                except ValueError: break
+                headers = {k.strip().lower(): v.strip() for k, _, v in (line.partition(":") for line in lines[1:] if line)}
+                length = content_length(headers)
+                if length: await reader.readexactly(length)
+                self.requests += 1
+                try:
+                    if length is None: raise RequestError(400, f"invalid Content-Length: {headers['content-length']!r}")
+                    status, payload = self.handle(method, target)
+                except RequestError as e: status, payload = e.status, _dumps({"error": str(e)}).encode("utf-8")
+                except Exception as e: status, payload = 500, _dumps({"error": f"{type(e).__name__}: {e}"}).encode("utf-8")
+                # Without a usable Content-Length the next request's start is unknown, so the connection ends here
+                keep_alive = length is not None and headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                writer.write(
+                    f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\nContent-Type: application/json\r\n"
+                    f"Content-Length: {len(payload)}\r\nConnection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1")
+                    + payload)
+                await writer.drain()
+                if not keep_alive: break
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host, port, on_ready=None):
+        server = await asyncio.start_server(self.connection, host, port, backlog=1024)
+        if on_ready: on_ready(server)
+        async with server: await server.serve_forever()
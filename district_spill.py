@@ -0,0 +1,73 @@
+"""
+Append-only integer columns for state that spans a whole district (attendance inputs).
+
+Schools append fixed-width integer columns as they finish, and the finished columns are read
+back in one go (columns) or a slice at a time (read). On disk (state-scale mode) each column is
+a flat temp file, so memory does not grow with the district. In memory the columns are plain
+NumPy arrays, which are still far smaller than object arrays of ID strings.
+"""
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+
+class ColumnSpill:
+    def __init__(self, dtypes, on_disk=False, spill_dir=None):
+        self.dtypes = {name: np.dtype(dtype) for name, dtype in dtypes.items()}
+        self.rows = 0
+        self._dir = tempfile.mkdtemp(prefix="district_spill_", dir=spill_dir) if on_disk else None
+        if self._dir: self._files = {name: open(self._path(name), "wb") for name in self.dtypes}
+        else: self._parts = {name: [] for name in self.dtypes}
+
+    def _path(self, name): return os.path.join(self._dir, f"{name}.bin")
+
+    def append(self, **columns):
+        n = None
+        for name, dtype in self.dtypes.items():
+            values = np.ascontiguousarray(columns[name], dtype=dtype)
+            if n is not None and len(values) != n: raise ValueError(f"column {name} has {len(values)} rows, expected {n}")
+            n = len(values)
+            if self._dir: self._files[name].write(values.tobytes())
+            else: self._parts[name].append(values)
+        self.rows += n or 0
+
+    def _finish(self):
+        if self._dir:
+            for fh in self._files.values(): fh.close()
+        else:
+            self._parts = {name: [np.concatenate(parts) if parts else np.empty(0, self.dtypes[name])] for name, parts in self._parts.items()}
+
+    def columns(self):
+        """The appended columns ({name: array}, memmaps when on disk). Call after the last append."""
+        self._finish()
+        if not self._dir: return {name: parts[0] for name, parts in self._parts.items()}
+        out = {}
+        for name, dtype in self.dtypes.items():
+            out[name] = np.memmap(self._path(name), dtype=dtype, mode="r", shape=(self.rows,)) if self.rows else np.empty(0, dtype)
+        return out
+
+    def read(self, start, stop):
+        """
+        Rows [start, stop) of every column. On disk they are read into fresh arrays rather than
+        mapped, so reading a spill front to back never keeps more than one slice resident.
+        Call after the last append.
+        """
+        self._finish()
+        if not self._dir: return {name: parts[0][start:stop] for name, parts in self._parts.items()}
+        out = {}
+        for name, dtype in self.dtypes.items():
+            with open(self._path(name), "rb") as fh:
+                fh.seek(start * dtype.itemsize)
+                out[name] = np.fromfile(fh, dtype=dtype, count=max(min(stop, self.rows) - start, 0))
+        return out
+
+    def close(self):
+        if self._dir is None: return
+        for fh in self._files.values(): fh.close()
+        shutil.rmtree(self._dir, ignore_errors=True)
+        self._dir = None
+
+    def __enter__(self): return self
+    def __exit__(self, *exc): self.close()
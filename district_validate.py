@@ -0,0 +1,332 @@
+"""
+Streaming checks of written district folders (csv, json, jsonl, parquet or arrow files), including
+packaged ones: .gz / .zst table files and `{dist_name}_Data.zip` archives (see district_package).
+
+Each table is read a chunk at a time and nothing keeps rows around. A key column is kept as one
+64-bit hash per key (KeySet), and the hashes are sorted once the table is done. So memory grows
+with the number of keys, not rows: enrollments and attendance are checked against the parents'
+sorted hashes as they stream past, and only their own keys are kept. Tables are read parents
+first (schools, teachers, sections, students, ...), so every foreign key can be checked in the
+same pass.
+
+The checks:
+  * keys are unique within a district (TABLE_KEYS, plus Contact_sis_id);
+  * foreign keys resolve (FOREIGN_KEYS); blank values count as violations unless the column is optional;
+  * email addresses never collide, in any email column of the district;
+  * the Clever column rules: grades, Y/N flags, genders, races, home languages and DOBs inside the
+    birth year generate_dob gives each grade.
+In the denormalized contacts layout a student repeats once per contact. Those repeated rows
+(same Student_id as the row before) are only checked for their contact columns.
+"""
+import csv
+import datetime
+import gzip
+import io
+import json
+import os
+import re
+import zipfile
+
+import numpy as np
+
+from district_db import TABLE_KEYS
+from district_writers import FLAG_COLUMNS
+
+DEFAULT_CHUNK_ROWS = 50000
+MAX_EXAMPLES = 3
+
+# Files checked for a table, preferred first when a table was written in several formats
+READ_ORDER = ["parquet", "arrow", "csv", "jsonl", "json"]
+COMPRESSED_SUFFIXES = (".gz", ".zst")
+# Parents before children, so foreign keys are checked while streaming; other files are not tables
+TABLE_ORDER = ["schools", "teachers", "staff", "sections", "students", "contacts", "enrollments", "attendance", "resources"]
+
+# table -> [(column, parent table, parent column, optional)]
+FOREIGN_KEYS = {
+    "teachers": [("School_id", "schools", "School_id", False)],
+    "staff": [("School_id", "schools", "School_id", False)],
+    "sections": [("School_id", "schools", "School_id", False), ("Teacher_id", "teachers", "Teacher_id", False),
+                 ("Teacher_2_id", "teachers", "Teacher_id", True)],
+    "students": [("School_id", "schools", "School_id", False)],
+    "contacts": [("Student_id", "students", "Student_id", False)],
+    "enrollments": [("School_id", "schools", "School_id", False), ("Section_id", "sections", "Section_id", False),
+                    ("Student_id", "students", "Student_id", False)],
+    "attendance": [("school_id", "schools", "School_id", False), ("student_id", "students", "Student_id", False),
+                   ("section_id", "sections", "Section_id", True)],
+}
+EMAIL_COLUMNS = ["Email_address", "Teacher_email", "Staff_email", "Principal_email", "Contact_email"]
+GRADE_COLUMNS = ["Grade", "Low_grade", "High_grade"]
+# How many years before the expected birth year a DOB may be, for files generated in an earlier year
+DOB_YEAR_SLACK = 1
+
+_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+
+def _text(value):
+    """A cell as the text a CSV file holds (typed parquet/arrow/json values included)."""
+    if value is None: return ""
+    if isinstance(value, bool): return "Y" if value else "N"
+    if isinstance(value, (datetime.date, datetime.datetime)): return value.strftime("%Y-%m-%d")
+    return str(value)
+
+
+def _hashes(values):
+    return np.fromiter((hash(v) for v in values), dtype=np.int64, count=len(values))
+
+
+class KeySet:
+    """The 64-bit hashes of one key column. add() per chunk, then finish() before contains()."""
+
+    def __init__(self):
+        self._parts = []
+        self.keys = None
+
+    def __bool__(self): return bool(self._parts) or self.keys is not None
+
+    def add(self, values):
+        self._parts.append(_hashes(values))
+
+    def hashes(self):
+        """Every hash added so far, unsorted (before finish())."""
+        return np.concatenate(self._parts) if self._parts else np.empty(0, dtype=np.int64)
+
+    def finish(self):
+        """Sorts the hashes; returns how many values repeat an earlier one."""
+        self.keys = np.sort(self.hashes())
+        self._parts = []
+        return int(np.count_nonzero(self.keys[1:] == self.keys[:-1]))
+
+    def contains(self, values):
+        h = _hashes(values)
+        if not len(self.keys): return np.zeros(len(h), dtype=bool)
+        idx = np.minimum(np.searchsorted(self.keys, h), len(self.keys) - 1)
+        return self.keys[idx] == h
+
+
+def _split_name(name):
+    """(table, format) of a table file name, compression suffix ignored."""
+    for suffix in COMPRESSED_SUFFIXES:
+        if name.endswith(suffix): name = name[:-len(suffix)]
+    table, _, ext = name.rpartition(".")
+    return table, ext
+
+
+def table_files(folder):
+    """
+    {table: path} of the table files in `folder` (or the members of a district zip, as
+    `archive.zip/member` paths), one per table, READ_ORDER deciding between formats.
+    """
+    if folder.endswith(".zip"):
+        with zipfile.ZipFile(folder) as zf: names = zf.namelist()
+    else:
+        names = [name for name in os.listdir(folder) if os.path.isfile(os.path.join(folder, name))]
+    found = {}
+    for name in names:
+        table, ext = _split_name(name)
+        if table not in TABLE_ORDER or ext not in READ_ORDER: continue
+        if table not in found or READ_ORDER.index(ext) < READ_ORDER.index(found[table][1]):
+            found[table] = (os.path.join(folder, name), ext)
+    return {table: found[table][0] for table in TABLE_ORDER if table in found}
+
+
+def _open_text(path, newline=None):
+    """A table file for reading: plain, .gz, .zst or a member of a district zip."""
+    archive, sep, member = path.partition(".zip" + os.sep)
+    if sep:
+        # The member keeps the archive file open until it is closed itself, so the ZipFile can go now
+        with zipfile.ZipFile(archive + ".zip") as zf: member_fh = zf.open(member)
+        return io.TextIOWrapper(member_fh, encoding="utf-8", newline=newline)
+    if path.endswith(".gz"): return gzip.open(path, "rt", encoding="utf-8", newline=newline)
+    if path.endswith(".zst"):
+        import zstandard
+        return zstandard.open(path, "rt", encoding="utf-8", newline=newline)
+    return open(path, newline=newline, encoding="utf-8")
+
+
+def _json_records(fh, read_size=1 << 20):
+    """Objects of a top-level JSON array, decoded incrementally."""
+    decoder = json.JSONDecoder()
+    buf, eof = fh.read(read_size), False
+    pos = len(buf) - len(buf.lstrip())
+    if buf[pos:pos + 1] != "[": raise ValueError(f"{fh.name}: not a JSON array")
+    pos += 1
+    while True:
+        while pos < len(buf) and buf[pos] in " \t\r\n,": pos += 1
+        if pos < len(buf) and buf[pos] == "]": return
+        try:
+            if pos >= len(buf): raise json.JSONDecodeError("need more data", buf, pos)
+            record, pos = decoder.raw_decode(buf, pos)
+            yield record
+        except json.JSONDecodeError:
+            if eof: raise ValueError(f"{fh.name}: truncated JSON array") from None
+            more = fh.read(read_size)
+            eof = not more
+            buf, pos = buf[pos:] + more, 0
+
+
+def _record_chunks(records, chunk_rows):
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= chunk_rows:
+            yield chunk
+            chunk = []
+    if chunk: yield chunk
+
+
+def iter_chunks(path, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Yields {column: [text values]} chunks of at most `chunk_rows` rows of one table file."""
+    ext = _split_name(os.path.basename(path))[1]
+    if ext in ("parquet", "arrow"):
+        import pyarrow as pa
+        if ext == "parquet":
+            import pyarrow.parquet as pq
+            batches = pq.ParquetFile(path).iter_batches(batch_size=chunk_rows)
+        else:
+            reader = pa.ipc.open_file(path)
+            batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+        for batch in batches:
+            for start in range(0, batch.num_rows, chunk_rows):
+                part = batch.slice(start, chunk_rows).to_pydict()
+                yield {col: [_text(v) for v in values] for col, values in part.items()}
+        return
+
+    with _open_text(path, newline="" if ext == "csv" else None) as fh:
+        if ext == "csv":
+            reader = csv.reader(fh)
+            header = next(reader, None)
+            if header is None: return
+            for rows in _record_chunks(reader, chunk_rows):
+                yield dict(zip(header, (list(col) for col in zip(*rows))))
+            return
+        records = (json.loads(line) for line in fh if line.strip()) if ext == "jsonl" else _json_records(fh)
+        for rows in _record_chunks(records, chunk_rows):
+            columns = list(dict.fromkeys(k for row in rows for k in row))
+            yield {col: [_text(row.get(col)) for row in rows] for col in columns}
+
+
+class DistrictValidator:
+    """
+    Checks one district folder. `grade_ages` maps each Clever grade to the age generate_dob uses,
+    `languages` / `races` / `genders` are the allowed values of those columns.
+    """
+
+    def __init__(self, grade_ages, languages, races, genders=("M", "F", "X"), chunk_rows=DEFAULT_CHUNK_ROWS, reference_year=None):
+        self.grade_ages = dict(grade_ages)
+        self.value_rules = {
+            **{col: (set(grade_ages), "not a Clever grade") for col in GRADE_COLUMNS},
+            **{col: ({"Y", "N"}, "not Y/N") for col in FLAG_COLUMNS},
+            "Gender": (set(genders), "not a Clever gender"),
+            "Race": (set(races) | {""}, "not a Clever race"),
+            "Home_language": (set(languages), "not a known language code"),
+        }
+        self.chunk_rows = chunk_rows
+        self.reference_year = reference_year or datetime.date.today().year
+
+    def validate(self, folder):
+        """{"folder", "tables": {table: {"file", "rows"}}, "violations": [{"table", "check", "count", "examples"}]}."""
+        self.keys, self.emails, self._violations = {}, {}, {}
+        tables, paths = {}, table_files(folder)
+        for table, path in paths.items():
+            tables[table] = {"file": os.path.basename(path), "rows": self._table(table, path)}
+        self._email_collisions(paths)
+        violations = [{"table": t, "check": c, "count": v["count"], "examples": v["examples"]} for (t, c), v in self._violations.items()]
+        self.keys = self.emails = None
+        return {"folder": folder, "tables": tables, "violations": violations}
+
+    def _count(self, table, check, count, examples=()):
+        if not count: return
+        entry = self._violations.setdefault((table, check), {"count": 0, "examples": []})
+        entry["count"] += count
+        entry["examples"].extend(list(dict.fromkeys(examples))[:MAX_EXAMPLES - len(entry["examples"])])
+
+    def _flag(self, table, check, values, bad):
+        """Counts the `values` selected by the mask `bad` as violations of `check`."""
+        bad_values = [v for v, b in zip(values, bad) if b]
+        self._count(table, check, len(bad_values), bad_values[:MAX_EXAMPLES])
+
+    def _table(self, table, path):
+        key = TABLE_KEYS.get(table)
+        key_set, contact_keys = KeySet(), KeySet()
+        rows, last_student = 0, None
+        for chunk in iter_chunks(path, self.chunk_rows):
+            n = len(next(iter(chunk.values()), []))
+            rows += n
+            # Denormalized contacts: a student row repeated for each further contact
+            entity = np.ones(n, dtype=bool)
+            if table == "students" and "Contact_sis_id" in chunk:
+                ids = np.asarray(chunk["Student_id"], dtype=object)
+                entity[1:] = ids[1:] != ids[:-1]
+                if n: entity[0] = ids[0] != last_student
+                last_student = ids[-1] if n else last_student
+                contact_keys.add(chunk["Contact_sis_id"])
+            entity_rows = {col: [v for v, e in zip(values, entity) if e] for col, values in chunk.items()} if not entity.all() else chunk
+
+            if key and all(c in chunk for c in key):
+                values = entity_rows[key[0]] if len(key) == 1 else list(zip(*(entity_rows[c] for c in key)))
+                key_set.add(values)
+                self._flag(table, f"blank {'/'.join(key)}", values, [not all(v) if isinstance(v, tuple) else not v for v in values])
+            for col, parent, parent_col, optional in FOREIGN_KEYS.get(table, []):
+                if col not in chunk or parent not in self.keys: continue
+                values = entity_rows[col]
+                present = np.fromiter((bool(v) for v in values), dtype=bool, count=len(values))
+                found = self.keys[parent].contains(values)
+                self._flag(table, f"{col} not in {parent}.{parent_col}", values, ~found & (present | (not optional)))
+            for col in EMAIL_COLUMNS:
+                if col not in chunk: continue
+                values = chunk[col] if col == "Contact_email" else entity_rows[col]
+                self.emails.setdefault((table, col), KeySet()).add([v.lower() for v in values if v])
+            self._rules(table, entity_rows)
+
+        if key and key_set:
+            self._count(table, f"duplicate {'/'.join(key)}", key_set.finish())
+            self.keys[table] = key_set
+        if contact_keys: self._count(table, "duplicate Contact_sis_id", contact_keys.finish())
+        return rows
+
+    def _rules(self, table, chunk):
+        for col, (allowed, message) in self.value_rules.items():
+            if col in chunk: self._flag(table, f"{col} {message}", chunk[col], [v not in allowed for v in chunk[col]])
+        if "DOB" not in chunk: return
+        dobs, grades = chunk["DOB"], chunk.get("Grade", [""] * len(chunk["DOB"]))
+        bad_format = [not _DATE.match(v) for v in dobs]
+        self._flag(table, "DOB not a YYYY-MM-DD date", dobs, bad_format)
+        years = [int(v[:4]) if not b else None for v, b in zip(dobs, bad_format)]
+        expected = [self.reference_year - self.grade_ages[g] if g in self.grade_ages else None for g in grades]
+        self._flag(table, "DOB outside the birth year of its grade", [f"{g}: {d}" for g, d in zip(grades, dobs)],
+                   [y is not None and e is not None and not e - DOB_YEAR_SLACK <= y <= e for y, e in zip(years, expected)])
+
+    def _email_collisions(self, paths):
+        """
+        Email columns whose addresses repeat, counted per (table, column). Only hashes are kept
+        while streaming, so the columns with collisions are read once more to put addresses to
+        (at most MAX_EXAMPLES of) their repeated hashes.
+        """
+        parts = {source: key_set.hashes() for source, key_set in self.emails.items()}
+        if not parts: return
+        unique, counts = np.unique(np.concatenate(list(parts.values())), return_counts=True)
+        repeated = unique[counts > 1]
+        for (table, col), hashes in parts.items():
+            hit = np.isin(hashes, repeated)
+            if not hit.any(): continue
+            wanted = list(dict.fromkeys(hashes[hit].tolist()))[:MAX_EXAMPLES]
+            self._count(table, f"{col} collides with another address", int(hit.sum()), self._addresses(paths[table], col, wanted))
+
+    def _addresses(self, path, col, wanted):
+        """The lower-cased addresses in `col` of `path` whose hashes are in `wanted`, in that order."""
+        found, want = {}, set(wanted)
+        for chunk in iter_chunks(path, self.chunk_rows):
+            for value in chunk.get(col, []):
+                if value and hash(value.lower()) in want: found.setdefault(hash(value.lower()), value.lower())
+            if len(found) == len(want): break
+        return [found[h] for h in wanted if h in found]
+
+
+def district_folders(output_dir):
+    """The `{dist_name}_Data` folders (or `{dist_name}_Data.zip` archives) under `output_dir`."""
+    if not os.path.isdir(output_dir): raise FileNotFoundError(f"{output_dir} does not exist")
+    folders = []
+    for name in sorted(os.listdir(output_dir)):
+        path = os.path.join(output_dir, name)
+        if (name.endswith("_Data") and os.path.isdir(path)) or (name.endswith("_Data.zip") and os.path.isfile(path)): folders.append(path)
+    return folders
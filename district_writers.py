@@ -0,0 +1,409 @@
+"""
+Streaming, bounded-memory table writers.
+
+Rows are pushed as they are generated (either a list of row dicts or a dict of columns) and
+buffered up to `buffer_rows` before being written, so a district never has to sit in memory as
+one big list. The column order of a table is fixed by the first rows written to it, which is the
+same order `pd.DataFrame(list_of_dicts)` produced for save_data.
+
+Columnar formats (Parquet, Arrow IPC/Feather) need the optional `pyarrow` package and write typed
+columns: dates as date32, Clever Y/N flags as booleans and low-cardinality text as dictionaries.
+The text formats can instead be packaged: compressed while they are written, on background
+threads, into .gz/.zst files or one zip per district, with a manifest (see district_package).
+"""
+import csv
+import json
+import os
+import shutil
+
+import numpy as np
+
+import district_package
+from district_metrics import StageMetrics
+
+DEFAULT_BUFFER_ROWS = 5000
+DEFAULT_ROW_GROUP_SIZE = 100000
+
+# OUTPUT_FORMAT -> file formats written for each table
+FORMAT_TARGETS = {
+    "csv": ["csv"],
+    "json": ["json"],
+    "jsonl": ["jsonl"],
+    "both": ["csv", "json"],
+    "parquet": ["parquet"],
+    "arrow": ["arrow"],
+}
+COLUMNAR_FORMATS = ["parquet", "arrow"]
+# Formats whose files can be packaged (PACKAGE); the columnar ones compress internally
+PACKAGE_FORMATS = ["csv", "json", "jsonl", "both"]
+# Formats loaded into one shared database file instead of per-table files (see district_db)
+DATABASE_FORMATS = ["sqlite", "duckdb"]
+# Codecs each columnar format accepts ("none" = uncompressed)
+COMPRESSION_CODECS = {
+    "parquet": ["zstd", "snappy", "gzip", "brotli", "lz4", "none"],
+    "arrow": ["zstd", "lz4", "none"],
+}
+
+# Column typing for the columnar formats; anything not listed is a plain string
+DATE_COLUMNS = {"DOB", "Term_start", "Term_end", "attendance_date"}
+FLAG_COLUMNS = {"IEP_status", "FRL_status", "ELL_status", "Section_504_status", "Gifted_status", "Disability_status"}
+INT_COLUMNS = {"ext.locker_number"}
+CATEGORY_COLUMNS = {
+    "School_id", "school_id", "Grade", "Low_grade", "High_grade", "Gender", "Race", "Home_language",
+    "Disability_type", "Subject", "Term_name", "School_city", "School_state", "Department", "Title",
+    "Contact_relationship", "Contact_type", "Contact_phone_type", "ext.bus_route",
+    "attendance_type", "attendance_status", "excuse_code",
+}
+
+
+def require_format(fmt):
+    """Fails fast (before any generation) when `fmt` needs an optional package that is missing."""
+    if fmt in COLUMNAR_FORMATS:
+        try: import pyarrow  # noqa: F401
+        except ImportError: raise RuntimeError(f"'{fmt}' output needs pyarrow: pip install pyarrow") from None
+    if fmt == "duckdb":
+        try: import duckdb  # noqa: F401
+        except ImportError: raise RuntimeError("'duckdb' output needs duckdb: pip install duckdb") from None
+
+
+def _json_default(value):
+    if isinstance(value, np.generic): return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class _FileWriter:
+    """Base for one output file. Subclasses implement _open/_write_block/_finish."""
+    extension = None
+
+    def __init__(self, path, compression=None, row_group_size=DEFAULT_ROW_GROUP_SIZE, package=None):
+        self.package = None if package in (None, "none") else package
+        self.path = path + district_package.PACKAGE_SUFFIXES[self.package] if self.package else path
+        self.compression = compression
+        self.row_group_size = row_group_size
+        self.rows_written = 0
+        self.sink = None
+        self._fh = None
+
+    def _open_text(self, newline=None):
+        """The text file to write to: plain, or compressing through a district_package sink."""
+        if not self.package: return open(self.path, "w", newline=newline, encoding="utf-8")
+        # A zip entry is a raw deflate stream next to its final name until the archive is assembled
+        stream_path = f"{self.path}.deflate" if self.package == "zip" else self.path
+        fh, self.sink = district_package.open_text(stream_path, self.package, newline)
+        return fh
+
+    @property
+    def bytes_written(self):
+        if self.sink: return self.sink.stored_bytes
+        return os.path.getsize(self.path) if self.rows_written else 0
+
+    def write_block(self, columns, rows):
+        if self._fh is None: self._open(columns)
+        self._write_block(columns, rows)
+        self.rows_written += len(rows)
+
+    def close(self):
+        if self._fh is None: return
+        self._finish()
+        self._fh.close()
+        self._fh = None
+
+
+class CsvFileWriter(_FileWriter):
+    extension = "csv"
+
+    def _open(self, columns):
+        self._fh = self._open_text(newline="")
+        self._csv = csv.writer(self._fh, lineterminator=os.linesep)
+        self._csv.writerow(columns)
+
+    def _write_block(self, columns, rows):
+        self._csv.writerows(rows)
+
+    def _finish(self): pass
+
+
+class JsonlFileWriter(_FileWriter):
+    """JSON Lines: one compact object per row, appendable and trivially streamable."""
+    extension = "jsonl"
+
+    def _open(self, columns):
+        self._fh = self._open_text()
+
+    def _write_block(self, columns, rows):
+        dumps = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False, default=_json_default).encode
+        self._fh.write("".join(dumps(dict(zip(columns, row))) + "\n" for row in rows))
+
+    def _finish(self): pass
+
+
+class JsonFileWriter(_FileWriter):
+    """
+    The legacy records array (`df.to_json(orient='records', indent=4)`), written one buffer at a time.
+    Each block is rendered by pandas and spliced into a single top-level array.
+    """
+    extension = "json"
+
+    def _open(self, columns):
+        self._fh = self._open_text()
+        self._fh.write("[\n")
+
+    def _write_block(self, columns, rows):
+        import pandas as pd
+        body = pd.DataFrame.from_records(rows, columns=columns).to_json(orient="records", indent=4)
+        if self.rows_written: self._fh.write(",\n")
+        self._fh.write(body[2:-2])
+
+    def _finish(self):
+        self._fh.write("\n]")
+
+
+class _ArrowFileWriter(_FileWriter):
+    """
+    Shared typing for the pyarrow-backed formats. Category columns keep one growing dictionary per
+    column, so every batch's dictionary extends the previous one (an Arrow IPC file requirement).
+    """
+
+    def _open(self, columns):
+        import pyarrow as pa
+        self._pa = pa
+        self._dictionaries = {c: {} for c in columns if c in CATEGORY_COLUMNS}
+        self._schema = pa.schema([(c, self._arrow_type(c)) for c in columns])
+        self._fh = open(self.path, "wb")
+        self._open_sink()
+
+    def _arrow_type(self, name):
+        pa = self._pa
+        if name in DATE_COLUMNS: return pa.date32()
+        if name in FLAG_COLUMNS: return pa.bool_()
+        if name in INT_COLUMNS: return pa.int64()
+        if name in CATEGORY_COLUMNS: return pa.dictionary(pa.int32(), pa.string())
+        return pa.string()
+
+    def _arrow_array(self, name, values):
+        pa = self._pa
+        if name in DATE_COLUMNS:
+            return pa.array([v or None for v in values], type=pa.string()).cast(pa.date32())
+        if name in FLAG_COLUMNS:
+            return pa.array([None if v in (None, "") else v == "Y" for v in values], type=pa.bool_())
+        if name in INT_COLUMNS:
+            return pa.array([None if v is None else int(v) for v in values], type=pa.int64())
+        if name in CATEGORY_COLUMNS:
+            lookup = self._dictionaries[name]
+            indices = [None if v is None else lookup.setdefault(str(v), len(lookup)) for v in values]
+            return pa.DictionaryArray.from_arrays(pa.array(indices, type=pa.int32()), pa.array(list(lookup), type=pa.string()))
+        return pa.array([None if v is None else str(v) for v in values], type=pa.string())
+
+    def _write_block(self, columns, rows):
+        arrays = [self._arrow_array(name, values) for name, values in zip(columns, zip(*rows))]
+        self._write_table(self._pa.Table.from_arrays(arrays, schema=self._schema))
+
+    @property
+    def _codec(self):
+        return None if self.compression in (None, "none") else self.compression
+
+
+class ParquetFileWriter(_ArrowFileWriter):
+    """Parquet with `row_group_size`-row groups; batches are held back until a group is full."""
+    extension = "parquet"
+
+    def _open_sink(self):
+        import pyarrow.parquet as pq
+        self._writer = pq.ParquetWriter(self._fh, self._schema, compression=self._codec or "none")
+        self._pending, self._pending_rows = [], 0
+
+    def _write_table(self, table):
+        self._pending.append(table)
+        self._pending_rows += table.num_rows
+        if self._pending_rows >= self.row_group_size: self._flush_groups()
+
+    def _flush_groups(self, final=False):
+        """Writes the full groups pending (and, when `final`, the short last one); the rest waits for more rows."""
+        if not self._pending: return
+        table = self._pa.concat_tables(self._pending)
+        full = table.num_rows if final else table.num_rows - table.num_rows % self.row_group_size
+        if full: self._writer.write_table(table.slice(0, full), row_group_size=self.row_group_size)
+        rest = table.slice(full)
+        self._pending, self._pending_rows = ([rest] if rest.num_rows else []), rest.num_rows
+
+    def _finish(self):
+        self._flush_groups(final=True)
+        self._writer.close()
+
+
+class ArrowFileWriter(_ArrowFileWriter):
+    """Arrow IPC file (Feather v2), readable with pyarrow.feather.read_table."""
+    extension = "arrow"
+
+    def _open_sink(self):
+        import pyarrow.ipc as ipc
+        options = ipc.IpcWriteOptions(compression=self._codec, emit_dictionary_deltas=True)
+        self._writer = ipc.new_file(self._fh, self._schema, options=options)
+
+    def _write_table(self, table):
+        self._writer.write_table(table, max_chunksize=self.row_group_size)
+
+    def _finish(self):
+        self._writer.close()
+
+
+FILE_WRITERS = {cls.extension: cls for cls in (CsvFileWriter, JsonlFileWriter, JsonFileWriter, ParquetFileWriter, ArrowFileWriter)}
+
+
+class TableWriter:
+    """
+    Buffered writer for one table, fanned out to every file format in `fmt`.
+    Accepts row dicts (write_rows) or a dict of equal-length columns (write_columns).
+    Time spent serializing, and the bytes it adds to each file, is charged to the "write.<format>" stages of `metrics`.
+    """
+
+    def __init__(self, output_dir, filename, fmt, buffer_rows=DEFAULT_BUFFER_ROWS, metrics=None, **file_options):
+        self.filename = filename
+        self.buffer_rows = buffer_rows
+        self.metrics = metrics or StageMetrics()
+        self.columns = None
+        self.rows_written = 0
+        self._buffer = []
+        self._files = self._open_files(output_dir, filename, fmt, file_options)
+
+    def _open_files(self, output_dir, filename, fmt, file_options):
+        if fmt not in FORMAT_TARGETS: raise ValueError(f"Unknown output format: {fmt}")
+        return [FILE_WRITERS[ext](os.path.join(output_dir, f"{filename}.{ext}"), **file_options) for ext in FORMAT_TARGETS[fmt]]
+
+    @property
+    def files(self):
+        """The file writers that received rows."""
+        return [f for f in self._files if f.rows_written]
+
+    @property
+    def paths(self):
+        return [f.path for f in self.files]
+
+    @property
+    def bytes_written(self):
+        return sum(f.bytes_written for f in self.files)
+
+    def _set_columns(self, keys):
+        if self.columns is None:
+            self.columns = list(keys)
+            self._index = set(self.columns)
+            return
+        extra = [k for k in keys if k not in self._index]
+        if extra: raise ValueError(f"{self.filename}: columns {extra} appeared after the header was fixed")
+
+    def write_rows(self, rows):
+        if not rows: return
+        if self.columns is None:
+            # Union of keys in first-seen order, like pd.DataFrame(list_of_dicts)
+            self._set_columns(dict.fromkeys(k for row in rows for k in row))
+        else:
+            for row in rows: self._set_columns(row)
+        cols = self.columns
+        self._buffer.extend(tuple(row.get(c) for c in cols) for row in rows)
+        if len(self._buffer) >= self.buffer_rows: self.flush()
+
+    def write_columns(self, columns):
+        self._set_columns(columns)
+        n = len(next(iter(columns.values()))) if columns else 0
+        if not n: return
+        missing = [None] * n
+        self._buffer.extend(zip(*(columns.get(c, missing) for c in self.columns)))
+        if len(self._buffer) >= self.buffer_rows: self.flush()
+
+    def write(self, data):
+        """Rows (list of dicts) or a column chunk (dict of sequences)."""
+        if isinstance(data, dict): self.write_columns(data)
+        else: self.write_rows(data)
+
+    def flush(self):
+        if not self._buffer: return
+        for f in self._files:
+            with self.metrics.stage(f"write.{f.extension}") as st:
+                before = f.bytes_written
+                f.write_block(self.columns, self._buffer)
+                st.rows, st.bytes = len(self._buffer), f.bytes_written - before
+        self.rows_written += len(self._buffer)
+        self._buffer = []
+
+    def close(self):
+        self.flush()
+        for f in self._files:
+            with self.metrics.stage(f"write.{f.extension}") as st:
+                before = f.bytes_written
+                f.close()
+                st.bytes = f.bytes_written - before
+
+
+def detach_linked_files(folder):
+    """
+    Unlinks files in `folder` that share an inode with something else (e.g. a district_cache
+    entry), so writing into the folder creates fresh files instead of overwriting the linked copies.
+    """
+    if not os.path.isdir(folder): return
+    for name in os.listdir(folder):
+        path = os.path.join(folder, name)
+        if os.path.isfile(path) and os.stat(path).st_nlink > 1: os.unlink(path)
+
+
+class DistrictWriter:
+    """
+    Lazily opens one TableWriter per table of a district's output folder.
+    `file_options` (compression, row_group_size) are passed through to the columnar file writers.
+    With `package` (gzip, zstd or zip; text formats only) the files are compressed as they are
+    written and a manifest is added. For zip the district becomes the single archive
+    `{output_dir}.zip`, which is then also its output_dir. Files hard-linked into the folder
+    (restored from the cache by an earlier run) are detached first, whether or not this run caches.
+    """
+    package = None
+
+    def __init__(self, output_dir, fmt, buffer_rows=DEFAULT_BUFFER_ROWS, metrics=None, package=None, **file_options):
+        self.package = None if package in (None, "none") else package
+        if self.package and fmt not in PACKAGE_FORMATS: raise ValueError(f"{fmt} output cannot be packaged (only {PACKAGE_FORMATS})")
+        self.output_dir = f"{output_dir}.zip" if self.package == "zip" else output_dir
+        self._files_dir = district_package.parts_dir(self.output_dir) if self.package == "zip" else output_dir
+        os.makedirs(self._files_dir, exist_ok=True)
+        detach_linked_files(self._files_dir)
+        self.fmt = fmt
+        self.buffer_rows = buffer_rows
+        self.metrics = metrics
+        self.file_options = dict(file_options, package=self.package) if self.package else file_options
+        self.tables = {}
+
+    def table(self, name):
+        if name not in self.tables:
+            self.tables[name] = TableWriter(self._files_dir, name, self.fmt, self.buffer_rows, self.metrics, **self.file_options)
+        return self.tables[name]
+
+    @property
+    def paths(self):
+        if self.package == "zip": return [self.output_dir]
+        paths = [p for writer in self.tables.values() for p in writer.paths]
+        return paths + [os.path.join(self.output_dir, district_package.MANIFEST_NAME)] if self.package else paths
+
+    def _write_package(self):
+        """The manifest, and for zip the archive itself (entries in table order, manifest last)."""
+        files = [(name, f) for name, writer in self.tables.items() for f in writer.files]
+        entries = [{"table": name, "file": os.path.basename(f.path), "rows": f.rows_written, "bytes": f.sink.stored_bytes,
+                    "raw_bytes": f.sink.raw_bytes, "sha256": f.sink.sha256} for name, f in files]
+        if self.package != "zip":
+            district_package.write_manifest(os.path.join(self.output_dir, district_package.MANIFEST_NAME), self.package, entries)
+            return
+        doc = json.dumps(district_package.manifest(self.package, entries), indent=2).encode("utf-8")
+        data, crc = district_package.deflate_bytes(doc)
+        members = [(os.path.basename(f.path), f.sink.path, f.sink.crc32, f.sink.stored_bytes, f.sink.raw_bytes) for _, f in files]
+        district_package.write_zip(self.output_dir, members + [(district_package.MANIFEST_NAME, data, crc, len(data), len(doc))])
+        shutil.rmtree(self._files_dir, ignore_errors=True)
+
+    def write(self, name, data):
+        if data is None or len(data) == 0: return
+        self.table(name).write(data)
+
+    def close(self):
+        for writer in self.tables.values(): writer.close()
+        if self.package:
+            with (self.metrics or StageMetrics()).stage("write.package") as st:
+                self._write_package()
+                st.bytes = os.path.getsize(self.output_dir if self.package == "zip" else os.path.join(self.output_dir, district_package.MANIFEST_NAME))
+
+    def __enter__(self): return self
+    def __exit__(self, *exc): self.close()
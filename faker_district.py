@@ -1,28 +1,80 @@
+"""
+Demo District Generator.
+
+Run it as a script for the interactive (or --config driven) CLI, or import it and call
+generate() / iter_tables() / generate_tables() with a config built from DEFAULTS.
+Faker, rich and pandas, like the optional features' modules (cache, database, deltas, server,
+validator), are only imported by the code paths that need them.
+"""
 import os
+import contextlib
+import json
 import random
-import uuid
 import datetime
 import re
-import pandas as pd
-from faker import Faker
-from rich.console import Console
-from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn
-from rich.prompt import IntPrompt, Confirm, Prompt, FloatPrompt
+import time
+import zlib
+import numpy as np
+from district_counter import CounterDraws
+from district_ids import IdAllocator, SEQUENTIAL_KINDS
+from district_metrics import StageMetrics, peak_rss_bytes, reset_peak_rss
+from district_pools import NamePools
+from district_spill import ColumnSpill
+from district_package import PACKAGE_MODES, require_package
+from district_writers import DistrictWriter, TableWriter, FORMAT_TARGETS, COLUMNAR_FORMATS, DATABASE_FORMATS, PACKAGE_FORMATS, COMPRESSION_CODECS, require_format
+
+class LazyObject:
+    """Builds the wrapped object on first attribute access, so unused heavy imports never happen."""
+    def __init__(self, factory):
+        self._factory = factory
+        self._obj = None
+
+    @property
+    def loaded(self): return self._obj is not None
+
+    def __getattr__(self, name):
+        if self._obj is None: self._obj = self._factory()
+        return getattr(self._obj, name)
+
+def _make_faker():
+    with stage("pools"):
+        from faker import Faker
+        instance = Faker('en_US')
+    if _faker_seed is not None: instance.seed_instance(_faker_seed)
+    return instance
+
+def _make_pools():
+    with stage("pools"): return NamePools(rng)
 
-fake = Faker('en_US')
-console = Console()
+metrics = StageMetrics()             # per-stage wall time / row counts / memory (see district_metrics)
+stage = metrics.stage
+_faker_seed = None
+fake = LazyObject(_make_faker)       # standard mode only; vectorized runs never import Faker
+rng = np.random.default_rng()
+pools = LazyObject(_make_pools)      # loading is charged to the "pools" stage, not whichever needed them first
 
 # ==========================================
 # 1. DEFAULT CONFIGURATION
 # ==========================================
 DEFAULTS = {
     "ID_MODE": "alphanumeric",
+    "SEED": None,                 # None = fresh seed per run (printed, so it can be replayed with --seed)
+    "GEN_MODE": "standard",       # standard = per-student loop, vectorized = batched NumPy roster per school, counter = random-access (see district_counter)
     "OUTPUT_FORMAT": "csv",
+    "STREAM_BUFFER_ROWS": 5000,   # rows buffered per table before each write
+    "COMPRESSION": "zstd",        # parquet / arrow codec
+    "ROW_GROUP_SIZE": 100000,     # parquet row group (arrow record batch) size
+    "PACKAGE": "none",            # csv/json: gzip / zstd = compressed file per table, zip = one archive per district (see district_package)
+    "CACHE_ENABLED": False,       # reuse unchanged districts from <output>/.cache (needs a fixed SEED to hit)
+    "CACHE_MAX_BYTES": 2 * 1024 ** 3,
     "NUM_DISTRICTS": 1,
     "SCHOOLS_PER_DISTRICT": 5,
     "TEACHERS_PER_SCHOOL": 10,
     "SECTIONS_PER_SCHOOL": 30,
     "STUDENTS_PER_SECTION": 20,
+    "ENROLLMENT_MODE": "per_section",  # per_section = new students for every section, schedule = per-grade pools taking several sections
+    "SECTIONS_PER_STUDENT": 4,    # schedule mode: most sections one student takes per term
+    "BLOCK_SECTIONS": 0,          # 0 = one unit per school; N = state-scale mode, students generated N sections at a time
     
     # Term Configuration
     "SCHOOL_START_YEAR": "2025",
@@ -38,11 +90,21 @@ DEFAULTS = {
     "DO_RESOURCES": False,
     "DO_ATTENDANCE": False,
     "DO_CONTACTS": True, # New Toggle for Contact Generation
+    "CONTACTS_LAYOUT": "denormalized",  # denormalized = one students row per contact, normalized = separate contacts table
     
     # Attendance Context
     "ATT_START_DATE": "2025-09-01", 
     "ATT_DAYS": 5,
-    "ATT_MODE": "Section" 
+    "ATT_MODE": "Section",
+
+    # Change Feed (see district_deltas): daily churn as a fraction of the population each acts on
+    "SNAPSHOT_ENABLED": False,    # save a compact snapshot.npz per district, the starting point for --deltas
+    "DELTA_DAYS": 5,
+    "CHURN_DROP": 0.002,          # of enrollments
+    "CHURN_TRANSFER": 0.0005,     # of students
+    "CHURN_ENROLL": 0.002,        # of students
+    "CHURN_TEACHER": 0.005,       # of sections
+    "CHURN_FLAGS": 0.001,         # of students
 }
 
 # ==========================================
@@ -54,7 +116,6 @@ GENERIC_DISTRICT_NAMES = [
     "Clearwater", "HopeSprings", "NorthStar", "GoldenPlains",
     "SilverLake", "WillowCreek", "Unity", "CedarRidge"
 ]
-random.shuffle(GENERIC_DISTRICT_NAMES)
 
 STATE_MAPPINGS = {
     "C4a": ("California", "CA"), "T3x": ("Texas", "TX"), "N3y": ("New York", "NY"),
@@ -87,91 +148,181 @@ LANG_WEIGHTS = list(LANGUAGE_MAP.values())
 DISABILITY_MAP = { "AUT": "Autism", "DB": "Deaf-blindness", "DD": "Developmental delay", "EMN": "Emotional disturbance", "HI": "Hearing impairment", "ID": "Intellectual Disability", "MD": "Multiple disabilities", "OI": "Orthopedic impairment", "OHI": "Other health impairment", "SLD": "Specific learning disability", "SLI": "Speech or language impairment", "TBI": "Traumatic brain injury", "VI": "Visual impairment" }
 DISABILITY_CODES = list(DISABILITY_MAP.keys())
 
+# Household makeup for contacts (see generate_household_contacts), flattened into
+# (probability, members) with members as (relationship, contact type, new last name?)
+HOUSEHOLD_TEMPLATES = [
+    (0.50,        [("Mother", "Parent/Guardian", False), ("Father", "Parent/Guardian", False)]),
+    (0.25 * 0.7,  [("Mother", "Parent/Guardian", False)]),
+    (0.25 * 0.3,  [("Mother", "Parent/Guardian", False), ("Aunt", "Emergency", False)]),
+    (0.10,        [("Father", "Parent/Guardian", False)]),
+    (0.10,        [("Mother", "Parent/Guardian", False), ("Step-father", "Parent/Guardian", True)]),
+    (0.05 / 3,    [("Grandmother", "Guardian", False)]),
+    (0.05 / 3,    [("Grandfather", "Guardian", False)]),
+    (0.05 / 3,    [("Aunt", "Guardian", False)]),
+]
+MALE_RELATIONSHIPS = ["Father", "Step-father", "Grandfather", "Uncle"]
+MAX_HOUSEHOLD = max(len(members) for _, members in HOUSEHOLD_TEMPLATES)
+STAFF_PER_SCHOOL = 2
+
+# attendance mode -> (statuses, weights)
+ATT_STATUS_WEIGHTS = {
+    "daily": (["present", "absent", "tardy"], [0.90, 0.05, 0.05]),
+    "section": (["present", "absent", "tardy"], [0.92, 0.04, 0.04]),
+}
+ATT_CHUNK_ROWS = 100000
+# What attendance keeps per enrollment: school index and district positions, IDs are re-derived
+ENROLLMENT_POSITIONS = {"school": np.int32, "section": np.int64, "student": np.int64, "term": np.int16}
+SUBJECTS = ['Math', 'Science', 'ELA', 'History']
+SCHOOL_TYPES = ['Elementary', 'Middle', 'High', 'Academy']
+# Counter mode: seed stream (after schools 0, supplemental 1, deltas 2) and a code per entity kind
+COUNTER_STREAM = 3
+COUNTER_KINDS = {"school": 0, "section": 1, "student": 2, "contact": 3}
+
+GRADE_AGE_MAP = {'PK':4,'KG':5,'1':6,'2':7,'3':8,'4':9,'5':10,'6':11,'7':12,'8':13,'9':14,'10':15,'11':16,'12':17}
+
+# Allowed values for the enumerated settings (used by the prompts and build_config)
+SETTING_CHOICES = {
+    "ID_MODE": ["sequential", "alphanumeric"],
+    "GEN_MODE": ["standard", "vectorized", "counter"],
+    "OUTPUT_FORMAT": list(FORMAT_TARGETS) + DATABASE_FORMATS,
+    "NUM_TERMS": [2, 3, 4],
+    "ATT_MODE": ["Daily", "Section"],
+    "CONTACTS_LAYOUT": ["denormalized", "normalized"],
+    "ENROLLMENT_MODE": ["per_section", "schedule"],
+    "PACKAGE": PACKAGE_MODES,
+}
+
 # ==========================================
 # 3. USER INPUT LOGIC
 # ==========================================
-console.rule("[bold green]Demo District Generator (v6.0 - Student Contacts)[/bold green]")
-
-USE_DEFAULTS = Confirm.ask(f"Apply default settings?", default=False)
-
-if USE_DEFAULTS:
-    ID_MODE = DEFAULTS["ID_MODE"]
-    OUTPUT_FORMAT = DEFAULTS["OUTPUT_FORMAT"]
-    NUM_DISTRICTS = DEFAULTS["NUM_DISTRICTS"]
-    SCHOOLS_PER_DISTRICT = DEFAULTS["SCHOOLS_PER_DISTRICT"]
-    TEACHERS_PER_SCHOOL = DEFAULTS["TEACHERS_PER_SCHOOL"]
-    SECTIONS_PER_SCHOOL = DEFAULTS["SECTIONS_PER_SCHOOL"]
-    STUDENTS_PER_SECTION = DEFAULTS["STUDENTS_PER_SECTION"]
-    
-    SCHOOL_START_YEAR = DEFAULTS["SCHOOL_START_YEAR"]
-    NUM_TERMS = DEFAULTS["NUM_TERMS"]
-    INCLUDE_SUMMER = DEFAULTS["INCLUDE_SUMMER"]
-    
-    PROB_FRL = DEFAULTS["PROB_FRL"]
-    PROB_IEP = DEFAULTS["PROB_IEP"]
-    PROB_ELL = DEFAULTS["PROB_ELL"]
-    PROB_504 = DEFAULTS["PROB_504"]
-    PROB_GIFTED = DEFAULTS["PROB_GIFTED"]
-    PROB_DISABILITY = DEFAULTS["PROB_DISABILITY"]
-    
-    DO_EXTENSIONS = DEFAULTS["DO_EXTENSIONS"]
-    DO_RESOURCES = DEFAULTS["DO_RESOURCES"]
-    DO_ATTENDANCE = DEFAULTS["DO_ATTENDANCE"]
-    DO_CONTACTS = DEFAULTS["DO_CONTACTS"]
-
-    ATT_CONFIG = {'start_date': DEFAULTS["ATT_START_DATE"], 'days': DEFAULTS["ATT_DAYS"], 'mode': DEFAULTS["ATT_MODE"]}
-    console.print("[yellow]Defaults loaded![/yellow]")
-else:
-    ID_MODE = Prompt.ask("Select ID Mode", choices=["sequential", "alphanumeric"], default=DEFAULTS["ID_MODE"])
-    OUTPUT_FORMAT = Prompt.ask("Output Format", choices=["csv", "json", "both"], default="csv")
-    NUM_DISTRICTS = IntPrompt.ask("Districts", default=DEFAULTS["NUM_DISTRICTS"])
-    SCHOOLS_PER_DISTRICT = IntPrompt.ask("Schools per District", default=DEFAULTS["SCHOOLS_PER_DISTRICT"])
-    TEACHERS_PER_SCHOOL = IntPrompt.ask("Teachers per School", default=DEFAULTS["TEACHERS_PER_SCHOOL"])
-    SECTIONS_PER_SCHOOL = IntPrompt.ask("Sections per School", default=DEFAULTS["SECTIONS_PER_SCHOOL"])
-    STUDENTS_PER_SECTION = IntPrompt.ask("Students per Section", default=DEFAULTS["STUDENTS_PER_SECTION"])
+def get_console():
+    global _console
+    if _console is None:
+        from rich.console import Console
+        _console = Console()
+    return _console
+
+_console = None
+
+def prompt_settings():
+    """Asks for the run configuration (or takes DEFAULTS) and returns it as a settings dict."""
+    from rich.prompt import IntPrompt, Confirm, Prompt, FloatPrompt
+    console = get_console()
+    settings = dict(DEFAULTS)
+    if Confirm.ask(f"Apply default settings?", default=False):
+        console.print("[yellow]Defaults loaded![/yellow]")
+        return settings
+
+    settings["ID_MODE"] = Prompt.ask("Select ID Mode", choices=SETTING_CHOICES["ID_MODE"], default=DEFAULTS["ID_MODE"])
+    settings["GEN_MODE"] = Prompt.ask("Generation Mode", choices=SETTING_CHOICES["GEN_MODE"], default=DEFAULTS["GEN_MODE"])
+    settings["OUTPUT_FORMAT"] = Prompt.ask("Output Format", choices=SETTING_CHOICES["OUTPUT_FORMAT"], default="csv")
+    if settings["OUTPUT_FORMAT"] in COLUMNAR_FORMATS:
+        settings["COMPRESSION"] = Prompt.ask("   Compression", choices=COMPRESSION_CODECS[settings["OUTPUT_FORMAT"]], default=DEFAULTS["COMPRESSION"])
+        settings["ROW_GROUP_SIZE"] = IntPrompt.ask("   Row Group Size", default=DEFAULTS["ROW_GROUP_SIZE"])
+    elif settings["OUTPUT_FORMAT"] in PACKAGE_FORMATS:
+        settings["PACKAGE"] = Prompt.ask("   Package", choices=SETTING_CHOICES["PACKAGE"], default=DEFAULTS["PACKAGE"])
+    settings["NUM_DISTRICTS"] = IntPrompt.ask("Districts", default=DEFAULTS["NUM_DISTRICTS"])
+    settings["SCHOOLS_PER_DISTRICT"] = IntPrompt.ask("Schools per District", default=DEFAULTS["SCHOOLS_PER_DISTRICT"])
+    settings["TEACHERS_PER_SCHOOL"] = IntPrompt.ask("Teachers per School", default=DEFAULTS["TEACHERS_PER_SCHOOL"])
+    settings["SECTIONS_PER_SCHOOL"] = IntPrompt.ask("Sections per School", default=DEFAULTS["SECTIONS_PER_SCHOOL"])
+    settings["STUDENTS_PER_SECTION"] = IntPrompt.ask("Students per Section", default=DEFAULTS["STUDENTS_PER_SECTION"])
+    if settings["GEN_MODE"] != "standard":
+        settings["ENROLLMENT_MODE"] = Prompt.ask("Enrollment Mode", choices=SETTING_CHOICES["ENROLLMENT_MODE"], default=DEFAULTS["ENROLLMENT_MODE"])
+    if settings["ENROLLMENT_MODE"] == "schedule":
+        settings["SECTIONS_PER_STUDENT"] = IntPrompt.ask("   Sections per Student per Term", default=DEFAULTS["SECTIONS_PER_STUDENT"])
 
     console.print("\n[bold cyan]-- Term Configuration --[/bold cyan]")
-    SCHOOL_START_YEAR = Prompt.ask("School Start Year (YYYY)", default=DEFAULTS["SCHOOL_START_YEAR"])
-    NUM_TERMS = IntPrompt.ask("Terms per Year (2=Sem, 3=Tri, 4=Qtr)", choices=["2", "3", "4"], default=DEFAULTS["NUM_TERMS"])
-    INCLUDE_SUMMER = Confirm.ask("Include Summer Session?", default=DEFAULTS["INCLUDE_SUMMER"])
+    settings["SCHOOL_START_YEAR"] = Prompt.ask("School Start Year (YYYY)", default=DEFAULTS["SCHOOL_START_YEAR"])
+    settings["NUM_TERMS"] = IntPrompt.ask("Terms per Year (2=Sem, 3=Tri, 4=Qtr)", choices=["2", "3", "4"], default=DEFAULTS["NUM_TERMS"])
+    settings["INCLUDE_SUMMER"] = Confirm.ask("Include Summer Session?", default=DEFAULTS["INCLUDE_SUMMER"])
 
     console.print("\n[bold yellow]-- Demographics --[/bold yellow]")
-    PROB_FRL = FloatPrompt.ask("Prob. FRL", default=DEFAULTS["PROB_FRL"])
-    PROB_IEP = FloatPrompt.ask("Prob. IEP", default=DEFAULTS["PROB_IEP"])
-    PROB_ELL = FloatPrompt.ask("Prob. ELL", default=DEFAULTS["PROB_ELL"])
-    PROB_504 = FloatPrompt.ask("Prob. 504", default=DEFAULTS["PROB_504"])
-    PROB_GIFTED = FloatPrompt.ask("Prob. Gifted", default=DEFAULTS["PROB_GIFTED"])
-    PROB_DISABILITY = FloatPrompt.ask("Prob. Disability", default=DEFAULTS["PROB_DISABILITY"])
+    settings["PROB_FRL"] = FloatPrompt.ask("Prob. FRL", default=DEFAULTS["PROB_FRL"])
+    settings["PROB_IEP"] = FloatPrompt.ask("Prob. IEP", default=DEFAULTS["PROB_IEP"])
+    settings["PROB_ELL"] = FloatPrompt.ask("Prob. ELL", default=DEFAULTS["PROB_ELL"])
+    settings["PROB_504"] = FloatPrompt.ask("Prob. 504", default=DEFAULTS["PROB_504"])
+    settings["PROB_GIFTED"] = FloatPrompt.ask("Prob. Gifted", default=DEFAULTS["PROB_GIFTED"])
+    settings["PROB_DISABILITY"] = FloatPrompt.ask("Prob. Disability", default=DEFAULTS["PROB_DISABILITY"])
 
     console.print("\n[bold cyan]-- Supplemental Data --[/bold cyan]")
-    DO_EXTENSIONS = Confirm.ask("Add Extension Fields?", default=DEFAULTS["DO_EXTENSIONS"])
-    DO_CONTACTS = Confirm.ask("Generate Student Contacts?", default=DEFAULTS["DO_CONTACTS"])
-    DO_RESOURCES = Confirm.ask("Generate Resources Data?", default=DEFAULTS["DO_RESOURCES"])
-    DO_ATTENDANCE = Confirm.ask("Generate Attendance Data?", default=DEFAULTS["DO_ATTENDANCE"])
-
-    ATT_CONFIG = {}
-    if DO_ATTENDANCE:
-        ATT_CONFIG['start_date'] = Prompt.ask("   Attendance Start Date", default=DEFAULTS["ATT_START_DATE"])
-        ATT_CONFIG['days'] = IntPrompt.ask("   Days to Generate", default=DEFAULTS["ATT_DAYS"])
-        ATT_CONFIG['mode'] = Prompt.ask("   Mode", choices=["Daily", "Section"], default=DEFAULTS["ATT_MODE"])
+    settings["DO_EXTENSIONS"] = Confirm.ask("Add Extension Fields?", default=DEFAULTS["DO_EXTENSIONS"])
+    settings["DO_CONTACTS"] = Confirm.ask("Generate Student Contacts?", default=DEFAULTS["DO_CONTACTS"])
+    if settings["DO_CONTACTS"]:
+        settings["CONTACTS_LAYOUT"] = Prompt.ask("   Contacts Layout", choices=SETTING_CHOICES["CONTACTS_LAYOUT"], default=DEFAULTS["CONTACTS_LAYOUT"])
+    settings["DO_RESOURCES"] = Confirm.ask("Generate Resources Data?", default=DEFAULTS["DO_RESOURCES"])
+    settings["DO_ATTENDANCE"] = Confirm.ask("Generate Attendance Data?", default=DEFAULTS["DO_ATTENDANCE"])
+
+    if settings["DO_ATTENDANCE"]:
+        settings["ATT_START_DATE"] = Prompt.ask("   Attendance Start Date", default=DEFAULTS["ATT_START_DATE"])
+        settings["ATT_DAYS"] = IntPrompt.ask("   Days to Generate", default=DEFAULTS["ATT_DAYS"])
+        settings["ATT_MODE"] = Prompt.ask("   Mode", choices=SETTING_CHOICES["ATT_MODE"], default=DEFAULTS["ATT_MODE"])
     else:
-        ATT_CONFIG = {'start_date': "2025-01-01", 'days': 0, 'mode': "Section"}
+        settings.update({"ATT_START_DATE": "2025-01-01", "ATT_DAYS": 0, "ATT_MODE": "Section"})
+    return settings
 
-if not Confirm.ask("Ready to generate?", default=True): exit()
+def apply_settings(settings):
+    """
+    Installs a settings dict as the module-level config (ID_MODE, PROB_FRL, ...) the generators read.
+    Also used as the process-pool initializer, so every worker sees the same configuration.
+    """
+    global ATT_CONFIG, TERM_CYCLE, id_allocator
+    globals().update({key: settings[key] for key in DEFAULTS})
+    ATT_CONFIG = {'start_date': settings["ATT_START_DATE"], 'days': settings["ATT_DAYS"], 'mode': settings["ATT_MODE"]}
+    TERM_CYCLE = generate_term_schedule(settings["SCHOOL_START_YEAR"], settings["NUM_TERMS"], settings["INCLUDE_SUMMER"])
+    id_allocator = IdAllocator(SEED or 0, id_capacities(settings))
+
+def id_capacities(settings):
+    """Most positions one district can use per ID kind (see district_ids)."""
+    schools = settings["SCHOOLS_PER_DISTRICT"]
+    students = schools * settings["SECTIONS_PER_SCHOOL"] * settings["STUDENTS_PER_SECTION"]
+    return {
+        "school": schools,
+        "teacher": schools * settings["TEACHERS_PER_SCHOOL"],
+        "staff": schools * STAFF_PER_SCHOOL + 1,     # + the district admin
+        "section": schools * settings["SECTIONS_PER_SCHOOL"],
+        "student": students,
+        "contact": students * MAX_HOUSEHOLD,
+        "attendance": students * max(settings["ATT_DAYS"], 1),
+    }
 
 # ==========================================
 # 4. HELPER FUNCTIONS
 # ==========================================
-def get_hex_id(length=6): return uuid.uuid4().hex[:length]
-def get_sequential_id(base, counter): return str(base + counter)
+def allocate_ids(kind, district, positions, length=None):
+    """
+    Unique IDs for entities at `positions` (their place within the district) of one kind,
+    hex or sequential per ID_MODE. Unique by construction, not by chance (see district_ids).
+    """
+    if ID_MODE == 'sequential' and kind in SEQUENTIAL_KINDS: return id_allocator.sequential_ids(kind, district, positions)
+    return id_allocator.hex_ids(kind, district, positions, length)
+
+def allocate_id(kind, district, position, length=None): return allocate_ids(kind, district, [position], length)[0]
 
 def generate_dob(grade):
     current_year = datetime.date.today().year
-    grade_map = {'PK':4,'KG':5,'1':6,'2':7,'3':8,'4':9,'5':10,'6':11,'7':12,'8':13,'9':14,'10':15,'11':16,'12':17}
-    target_age = grade_map.get(grade, 10)
+    target_age = GRADE_AGE_MAP.get(grade, 10)
     birth_year = current_year - target_age
     return fake.date_between(start_date=datetime.date(birth_year,1,1), end_date=datetime.date(birth_year,12,31)).strftime('%Y-%m-%d')
 
+def seed_unit(*key):
+    """
+    Reseeds `random`, Faker and the shared NumPy generator (and so the pools) from (SEED, *key).
+    Every unit of work (one school, one district's supplemental tables) is seeded this way,
+    so output is identical however the units are spread over worker processes.
+    """
+    global _faker_seed
+    seq = np.random.SeedSequence([SEED, *key])
+    py_seed, _faker_seed = (int(x) for x in seq.generate_state(2))
+    random.seed(py_seed)
+    if fake.loaded: fake.seed_instance(_faker_seed)
+    rng.bit_generator.state = np.random.PCG64(seq).state
+
+def district_names():
+    """GENERIC_DISTRICT_NAMES in a per-seed shuffled order."""
+    names = list(GENERIC_DISTRICT_NAMES)
+    random.Random(SEED).shuffle(names)
+    return names
+
 def generate_date_range(start_str, days):
     dates = []
     current = datetime.datetime.strptime(start_str, "%Y-%m-%d").date()
@@ -180,10 +331,40 @@ def generate_date_range(start_str, days):
         current += datetime.timedelta(days=1)
     return dates
 
+def draw_names(n):
+    """n (first, last) pairs: bulk pool draws in vectorized and counter mode, Faker calls in standard mode (no pool speedup there)."""
+    if GEN_MODE != 'standard': return list(zip(pools.first_names(n), pools.last_names(n)))
+    return [(fake.first_name(), fake.last_name()) for _ in range(n)]
+
+def entity_draws(kind, district, positions):
+    """
+    (generator, pools) to draw a batch of `kind` entities at district `positions` from: the shared
+    ones, or in counter mode ones keyed by each entity's own position (see district_counter).
+    """
+    if GEN_MODE != 'counter': return rng, pools
+    draws = CounterDraws(np.random.SeedSequence([SEED, district, COUNTER_STREAM, COUNTER_KINDS[kind]]), positions)
+    return draws, pools.using(draws)
+
+def school_grades(school_type):
+    """(Low_grade, High_grade, every grade in between) a school of `school_type` teaches."""
+    if 'Elementary' in school_type: low, high = 'KG', '5'
+    elif 'Middle' in school_type: low, high = '6', '8'
+    elif 'High' in school_type: low, high = '9', '12'
+    else: low, high = 'KG', '12'
+    return low, high, [str(g) if g > 0 else 'KG' for g in range(int(low) if low.isdigit() else 0, (int(high) if high.isdigit() else 12) + 1)]
+
+def counter_school_header(district, s_idx):
+    """Counter mode: (School_id, school type, section grades) of a school, without generating any of it."""
+    draws, _ = entity_draws("school", district, [s_idx])
+    school_id = allocate_id("school", district, s_idx, int(draws.choice([5, 6], 1)[0]))
+    school_type = draws.choice(SCHOOL_TYPES, 1)[0]
+    sec_draws, _ = entity_draws("section", district, s_idx * SECTIONS_PER_SCHOOL + np.arange(SECTIONS_PER_SCHOOL))
+    return school_id, school_type, sec_draws.choice(school_grades(school_type)[2], SECTIONS_PER_SCHOOL)
+
 def clean_phone():
-    """Returns a clean 10 digit number"""
-    raw = fake.phone_number()
-    return re.sub("[^0-9]", "", raw)[:10]
+    """Returns a clean 10 digit number: Faker's, without its extension or +1/001 prefix"""
+    raw = fake.phone_number().split("x")[0]
+    return re.sub("[^0-9]", "", raw)[-10:]
 
 def generate_term_schedule(anchor_year_str, num_terms, include_summer):
     y_start = int(anchor_year_str)
@@ -207,9 +388,10 @@ def generate_term_schedule(anchor_year_str, num_terms, include_summer):
         terms.append({"Term_name": f"Summer {y_end}", "Term_start": f"{y_end}-06-01", "Term_end": f"{y_end}-07-30"})
     return terms
 
-def generate_household_contacts(student_last_name, email_domain):
+def generate_household_contacts(student_last_name, email_domain, district, student_pos):
     """
     Generates a list of contact dictionaries based on household makeup probabilities.
+    Contact k of the student at `student_pos` gets contact position student_pos * MAX_HOUSEHOLD + k.
     Logic:
       50% - Nuclear (Mom & Dad)
       25% - Single Mother
@@ -225,7 +407,7 @@ def generate_household_contacts(student_last_name, email_domain):
         if not last_n: last_n = student_last_name
         
         # Gender inference for names (simple assumption based on relationship)
-        if rel in ["Father", "Step-father", "Grandfather", "Uncle"]:
+        if rel in MALE_RELATIONSHIPS:
             f_name = fake.first_name_male()
         else:
             f_name = fake.first_name_female()
@@ -237,7 +419,7 @@ def generate_household_contacts(student_last_name, email_domain):
             "Contact_phone": clean_phone(),
             "Contact_phone_type": random.choice(["Cell", "Home", "Work"]),
             "Contact_email": f"{f_name}.{last_n}@{email_domain}".lower(),
-            "Contact_sis_id": f"cont-{uuid.uuid4().hex[:8]}"
+            "Contact_sis_id": f"cont-{allocate_id('contact', district, student_pos * MAX_HOUSEHOLD + len(contacts))}"
         }
 
     # SCENARIO 1: Nuclear (Mom & Dad)
@@ -268,120 +450,327 @@ def generate_household_contacts(student_last_name, email_domain):
 
     return contacts
 
+def generate_household_contacts_batch(last_names, email_domain, district, student_pos, draws=None):
+    """
+    Bulk generate_household_contacts for a block of students (at district positions `student_pos`),
+    drawing from the name/phone pools. `draws` is the students' generator (see entity_draws).
+    Returns (owner, contacts): owner[k] is the index of the student that contact row k belongs to,
+    contacts is a dict of contact columns in make_contact() order.
+    """
+    n = len(last_names)
+    probs = np.array([p for p, _ in HOUSEHOLD_TEMPLATES])
+    width = max(len(members) for _, members in HOUSEHOLD_TEMPLATES)
+    sizes = np.array([len(members) for _, members in HOUSEHOLD_TEMPLATES])
+    rel_table = np.full((len(HOUSEHOLD_TEMPLATES), width), "", dtype=object)
+    type_table = rel_table.copy()
+    new_last_table = np.zeros((len(HOUSEHOLD_TEMPLATES), width), dtype=bool)
+    for t, (_, members) in enumerate(HOUSEHOLD_TEMPLATES):
+        for k, (rel, type_str, new_last) in enumerate(members):
+            rel_table[t, k], type_table[t, k], new_last_table[t, k] = rel, type_str, new_last
+
+    pick = (draws or rng).choice(len(HOUSEHOLD_TEMPLATES), size=n, p=probs / probs.sum())
+    counts = sizes[pick]
+    owner = np.repeat(np.arange(n), counts)
+    slot = np.arange(len(owner)) - np.repeat(np.cumsum(counts) - counts, counts)
+    template = pick[owner]
+
+    m = len(owner)
+    contact_pos = np.asarray(student_pos)[owner] * MAX_HOUSEHOLD + slot
+    c_draws, c_pools = entity_draws("contact", district, contact_pos)
+    rel = rel_table[template, slot]
+    is_male = np.isin(rel, MALE_RELATIONSHIPS)
+    f_names = np.where(is_male, c_pools.first_names_male(m), c_pools.first_names_female(m))
+    l_names = np.where(new_last_table[template, slot], c_pools.last_names(m), np.asarray(last_names, dtype=object)[owner])
+
+    contacts = {
+        "Contact_relationship": rel,
+        "Contact_type": type_table[template, slot],
+        "Contact_name": [f"{f} {l}" for f, l in zip(f_names, l_names)],
+        "Contact_phone": c_pools.phones(m),
+        "Contact_phone_type": weighted_column(["Cell", "Home", "Work"], [1, 1, 1], m, c_draws),
+        "Contact_email": [f"{f}.{l}@{email_domain}".lower() for f, l in zip(f_names, l_names)],
+        "Contact_sis_id": [f"cont-{x}" for x in allocate_ids("contact", district, contact_pos)],
+    }
+    return owner, contacts
+
+def generate_dob_batch(grades, draws=None):
+    """Vectorized generate_dob: uniform birth date inside the target year for each grade."""
+    current_year = datetime.date.today().year
+    ages = np.array([GRADE_AGE_MAP.get(g, 10) for g in grades], dtype=np.int64)
+    year_start = (current_year - ages - 1970).astype('datetime64[Y]').astype('datetime64[D]')
+    year_len = (year_start.astype('datetime64[Y]') + 1).astype('datetime64[D]') - year_start
+    offsets = ((draws or rng).random(len(ages)) * year_len.astype(np.int64)).astype(np.int64)
+    return np.datetime_as_string(year_start + offsets, unit='D')
+
+def flag_column(prob, n, draws=None):
+    """n Clever Y/N flags drawn with probability `prob` of Y."""
+    return np.where((draws or rng).random(n) < prob, "Y", "N")
+
+def weighted_column(values, weights, n, draws=None):
+    p = np.asarray(weights, dtype=float)
+    return np.asarray(values, dtype=object)[(draws or rng).choice(len(values), size=n, p=p / p.sum())]
+
+def assign_schedule(sec_grades, sec_terms, sec_subjects):
+    """
+    Schedule mode rosters for one school's sections (given by grade, term index and subject).
+    Each grade gets one student pool, just big enough that every section can fill. Within a term
+    a student takes at most SECTIONS_PER_STUDENT sections and at most one per subject, so no two of
+    their sections clash. Seats are filled one (grade, term, subject) batch at a time, largest
+    subject first, from the least-loaded students of the pool; nothing searches per student.
+    Returns (student grades, enrollment student rows, enrollment section indexes), enrollments
+    grouped by student.
+    """
+    sec_grades, sec_terms, sec_subjects = (np.asarray(a, dtype=object) for a in (sec_grades, sec_terms, sec_subjects))
+    pool_grades, enrolled_students, enrolled_sections = [], [], []
+    first = 0
+    for grade in dict.fromkeys(sec_grades):
+        in_grade = sec_grades == grade
+        batches = {}   # term -> [(subject sections)], largest subject first
+        for term in dict.fromkeys(sec_terms[in_grade]):
+            in_term = in_grade & (sec_terms == term)
+            subject_secs = [np.flatnonzero(in_term & (sec_subjects == subj)) for subj in dict.fromkeys(sec_subjects[in_term])]
+            batches[term] = sorted(subject_secs, key=len, reverse=True)
+        pool = max(max(-(-sum(map(len, secs)) * STUDENTS_PER_SECTION // SECTIONS_PER_STUDENT), len(secs[0]) * STUDENTS_PER_SECTION)
+                   for secs in batches.values())
+
+        for secs in batches.values():
+            load = np.zeros(pool, dtype=np.int64)
+            for subject_secs in secs:
+                free = np.flatnonzero(load < SECTIONS_PER_STUDENT)
+                free = free[np.lexsort((rng.random(len(free)), load[free]))]
+                taken = rng.permutation(free[:len(subject_secs) * STUDENTS_PER_SECTION])
+                load[taken] += 1
+                enrolled_students.append(first + taken)
+                enrolled_sections.append(np.repeat(subject_secs, STUDENTS_PER_SECTION)[:len(taken)])
+        pool_grades.extend([grade] * pool)
+        first += pool
+
+    if not enrolled_students: return np.empty(0, dtype=object), np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    students, sections = np.concatenate(enrolled_students), np.concatenate(enrolled_sections)
+    by_student = np.lexsort((sections, students))
+    return np.asarray(pool_grades, dtype=object), students[by_student], sections[by_student]
+
+def generate_student_block(school_id, school_code, grades, positions, enrolled, state_abbr, district_prefix, district, email_domain):
+    """
+    Vectorized Section D for one school: students in `grades` at district `positions`, drawn in one
+    pass. `enrolled` is (student row per enrollment, Section_id per enrollment).
+    Returns (students, enrollments, contacts) as dicts of columns with the same columns and row
+    order as the per-student loop. In counter mode every value of a student depends only on its position.
+    """
+    n = len(positions)
+    grades = np.asarray(grades, dtype=object)
+    stu_ids = allocate_ids("student", district, positions)
+    draws, stu_pools = entity_draws("student", district, positions)
+
+    if ID_MODE == 'alphanumeric':
+        stu_nums = [f"{district_prefix}{num}" for num in draws.integers(100000, 1000000, n)]
+        state_ids = [f"{state_abbr}-{school_code}-{num}" for num in stu_nums]
+    else:
+        stu_nums, state_ids = stu_ids, stu_ids
+
+    genders = np.where(draws.random(n) < 0.5, 'M', 'F')
+    first_names = stu_pools.first_names(n, genders)
+    last_names = stu_pools.last_names(n)
+    email_nums = draws.integers(10, 100, n)
+
+    has_disability = flag_column(PROB_DISABILITY, n, draws)
+    dis_names = np.asarray([DISABILITY_MAP[c] for c in DISABILITY_CODES], dtype=object)
+    dis_type = np.where(has_disability == "Y", dis_names[draws.integers(0, len(DISABILITY_CODES), n)], "")
+
+    students = {
+        "School_id": [school_id] * n, "Student_id": stu_ids, "Student_number": stu_nums, "State_id": state_ids,
+        "Last_name": last_names, "First_name": first_names, "Grade": grades, "Gender": genders,
+        "DOB": generate_dob_batch(grades, draws),
+        "Email_address": [f"{f[0]}{l}{num}@{email_domain}".lower() for f, l, num in zip(first_names, last_names, email_nums)],
+        "Race": weighted_column(CLEVER_RACE_VALUES, RACE_WEIGHTS, n, draws),
+        "Home_language": weighted_column(LANG_KEYS, LANG_WEIGHTS, n, draws),
+        "IEP_status": flag_column(PROB_IEP, n, draws),
+        "FRL_status": flag_column(PROB_FRL, n, draws),
+        "ELL_status": flag_column(PROB_ELL, n, draws),
+        "Section_504_status": flag_column(PROB_504, n, draws),
+        "Gifted_status": flag_column(PROB_GIFTED, n, draws),
+        "Disability_status": has_disability,
+        "Disability_type": dis_type,
+    }
+    if DO_EXTENSIONS:
+        students['ext.locker_number'] = draws.integers(100, 10000, n)
+        students['ext.bus_route'] = weighted_column(['Route A', 'Route B', 'Walk'], [1, 1, 1], n, draws)
+
+    enrolled_rows, enrolled_sections = enrolled
+    enrollments = {"School_id": [school_id] * len(enrolled_rows), "Section_id": enrolled_sections, "Student_id": np.asarray(stu_ids, dtype=object)[enrolled_rows]}
+
+    contacts = {}
+    if DO_CONTACTS:
+        with stage("contacts") as st:
+            owner, household = generate_household_contacts_batch(last_names, email_domain, district, positions, draws)
+            st.rows = len(owner)
+        if CONTACTS_LAYOUT == "normalized":
+            contacts = {"Student_id": np.asarray(stu_ids, dtype=object)[owner], **household}
+        else:
+            # One row per contact: repeat each student's columns once per household member
+            students = {k: np.asarray(v, dtype=object)[owner] for k, v in students.items()}
+            students.update(household)
+
+    return students, enrollments, contacts
+
+def file_options():
+    """Writer options for the columnar formats (ignored by csv/json)."""
+    return {"compression": COMPRESSION, "row_group_size": ROW_GROUP_SIZE}
+
 def save_data(data_list, filename, output_dir, fmt):
-    if not data_list: return
-    df = pd.DataFrame(data_list)
-    if fmt in ['csv', 'both']:
-        df.to_csv(os.path.join(output_dir, f"{filename}.csv"), index=False)
-    if fmt in ['json', 'both']:
-        df.to_json(os.path.join(output_dir, f"{filename}.json"), orient='records', indent=4)
+    """One-shot write of a whole table (rows or columns) through the streaming writers."""
+    if data_list is None or len(data_list) == 0: return
+    writer = TableWriter(output_dir, filename, fmt, STREAM_BUFFER_ROWS, **file_options())
+    writer.write(data_list)
+    writer.close()
 
 # ==========================================
 # 5. MAIN GENERATION LOOP
 # ==========================================
 base_output_dir = 'district_data_output'
-TERM_CYCLE = generate_term_schedule(SCHOOL_START_YEAR, NUM_TERMS, INCLUDE_SUMMER)
-console.print(f"\n[yellow]Term Logic Active:[/yellow] {len(TERM_CYCLE)} terms in rotation.")
+SCHOOL_TABLES = ["schools", "teachers", "staff", "students", "sections", "enrollments", "contacts"]
+
+def district_context(i, dist_name):
+    """Everything about district `i` that its schools share; derived from the index alone."""
+    state_key = STATE_KEYS[i % len(STATE_KEYS)]
+    state_name, state_abbr = STATE_MAPPINGS[state_key]
+    return {
+        "index": i, "dist_name": dist_name, "state_abbr": state_abbr,
+        "email_domain": f"{dist_name.lower()}.k12.edu",
+        "district_prefix": str(10 + i),
+    }
 
-with Progress(SpinnerColumn(), TextColumn("[progress.description]{task.description}"), BarColumn(), console=console) as progress:
-    main_task = progress.add_task("[green]Initializing...", total=NUM_DISTRICTS)
+def school_blocks():
+    """Section ranges one school is split into: the whole school, or BLOCK_SECTIONS at a time."""
+    if not BLOCK_SECTIONS: return [None]
+    return [range(lo, min(lo + BLOCK_SECTIONS, SECTIONS_PER_SCHOOL)) for lo in range(0, SECTIONS_PER_SCHOOL, BLOCK_SECTIONS)]
 
-    for i in range(NUM_DISTRICTS):
-        dist_name = GENERIC_DISTRICT_NAMES[i % len(GENERIC_DISTRICT_NAMES)]
-        progress.update(main_task, description=f"[green]Generating {dist_name}...[/green]")
+def generate_school(ctx, s_idx, block=None):
+    """
+    Sections A-E for one school of a district. Independent of every other school, so it can
+    run in any worker process. Returns {table name: rows or column chunk}, plus the
+    "enrollment_positions" attendance needs.
+    With `block` (a range of section indexes, state-scale mode) only the students of those sections
+    are generated, in a vectorized batch; the school, staff and sections rows come with the first block.
+    In schedule mode the school's students come from per-grade pools (see assign_schedule).
+    In counter mode the School_id, school type, section grades and every student and contact value are
+    keyed by position (see entity_draws), so they come out the same however the school is split.
+    """
+    seed_unit(ctx["index"], 0, s_idx)
+    state_abbr, email_domain = ctx["state_abbr"], ctx["email_domain"]
+    district, district_prefix = ctx["index"], ctx["district_prefix"]
+    teachers_data, staff_data = [], []
+    students_data, sections_data, enrollments_data, contacts_data = [], [], [], []
+
+    # A. SCHOOLS
+    with stage("schools") as st:
+        if GEN_MODE == 'counter':
+            school_id, school_type, counter_grades = counter_school_header(district, s_idx)
+        else:
+            school_id = allocate_id("school", district, s_idx, random.choice([5, 6]))
+            school_type = random.choice(SCHOOL_TYPES)
+        school_code = f"{s_idx + 1:02d}"
+        low, high, grade_list = school_grades(school_type)
+        valid_locations = REAL_LOCATIONS.get(state_abbr, [("City", "000")])
+        city_name, zip_prefix = random.choice(valid_locations)
+        if GEN_MODE != 'standard':
+            name_l, principal, address, phone = pools.last_names(1)[0], pools.full_names(1)[0], pools.street_addresses(1)[0], pools.phones(1)[0]
+        else:
+            name_l, principal, address, phone = fake.last_name(), fake.name(), fake.street_address(), clean_phone()
+        schools_data = [{
+            "School_id": school_id, "School_name": f"{name_l} {school_type}",
+            "School_number": school_code, "Low_grade": low, "High_grade": high,
+            "Principal": principal, "Principal_email": f"principal.{school_id}@{email_domain}",
+            "School_address": address, "School_city": city_name,
+            "School_state": state_abbr, "School_zip": f"{zip_prefix}{random.randint(10, 99)}",
+            "School_phone": phone
+        }]
+        st.rows = len(schools_data)
+
+    # E. ADMIN (district-wide row, listed first in staff and attached to the first school)
+    with stage("staff") as st:
+        if s_idx == 0:
+            admin_id = allocate_id("staff", district, SCHOOLS_PER_DISTRICT * STAFF_PER_SCHOOL)
+            staff_data.append({ "School_id": school_id, "Staff_id": admin_id, "Staff_email": f"admin@{email_domain}", "First_name": "System", "Last_name": "Admin", "Department": "Central", "Title": "Admin" })
+        st.rows = len(staff_data)
+
+    # B. TEACHERS
+    with stage("teachers") as st:
+        school_teacher_ids = []
+        teacher_names = draw_names(TEACHERS_PER_SCHOOL)
+        teacher_ids = allocate_ids("teacher", district, s_idx * TEACHERS_PER_SCHOOL + np.arange(TEACHERS_PER_SCHOOL))
+        for t_idx in range(TEACHERS_PER_SCHOOL):
+            t_id = teacher_ids[t_idx]
+            if ID_MODE == 'alphanumeric':
+                t_num = f"T-{random.randint(100000, 999999)}"
+                st_id = f"{state_abbr}-{t_num}"
+            else:
+                t_num, st_id = t_id, t_id
+            f, l = teacher_names[t_idx]
+            teachers_data.append({
+                "School_id": school_id, "Teacher_id": t_id, "Teacher_number": t_num, "State_teacher_id": st_id,
+                "Teacher_email": f"{f[0].lower()}{l.lower()}@{email_domain}", "First_name": f, "Last_name": l, "Title": "Teacher"
+            })
+            school_teacher_ids.append(t_id)
+        st.rows = len(teachers_data)
+
+    # C. STAFF
+    with stage("staff") as st:
+        staff_ids = allocate_ids("staff", district, s_idx * STAFF_PER_SCHOOL + np.arange(STAFF_PER_SCHOOL))
+        for st_id, (f, l) in zip(staff_ids, draw_names(STAFF_PER_SCHOOL)):
+            staff_data.append({
+                "School_id": school_id, "Staff_id": st_id, "Staff_email": f"{f}.{l}@{email_domain}",
+                "First_name": f, "Last_name": l, "Department": "Admin", "Title": "Staff"
+            })
+        st.rows = STAFF_PER_SCHOOL
+
+    # D. ROSTERING
+    teacher_load_counts = {} 
+    school_sec_ids, school_sec_grades, school_sec_terms, school_sec_subjects = [], [], [], []
+    # Students drawn in one batch after the section loop (build_config keeps schedule and state-scale modes off the standard loop)
+    batched = GEN_MODE != 'standard'
+    section_ids = allocate_ids("section", district, s_idx * SECTIONS_PER_SCHOOL + np.arange(SECTIONS_PER_SCHOOL))
+    first_student = s_idx * SECTIONS_PER_SCHOOL * STUDENTS_PER_SECTION
+
+    with stage("sections") as st:
+        for sec_idx in range(SECTIONS_PER_SCHOOL):
+            sec_id = section_ids[sec_idx]
+            p_teach = random.choice(school_teacher_ids)
+            s_teach = random.choice([t for t in school_teacher_ids if t != p_teach]) if sec_idx == 0 else None
         
-        state_key = STATE_KEYS[i % len(STATE_KEYS)]
-        state_name, state_abbr = STATE_MAPPINGS[state_key]
-        email_domain = f"{dist_name.lower()}.k12.edu"
-        district_prefix = str(10 + i) 
-        base_id_seq = (i + 1) * 100000 
-
-        # Containers
-        schools_data, teachers_data, staff_data = [], [], []
-        students_data, sections_data, enrollments_data = [], [], []
-
-        # A. SCHOOLS
-        for s_idx in range(SCHOOLS_PER_DISTRICT):
-            if ID_MODE == 'alphanumeric': school_id = get_hex_id(random.choice([5, 6]))
-            else: school_id = get_sequential_id(base_id_seq, s_idx * 100)
-            school_type = random.choice(['Elementary', 'Middle', 'High', 'Academy'])
-            school_code = f"{s_idx + 1:02d}"
-            if 'Elementary' in school_type: low, high = 'KG', '5'
-            elif 'Middle' in school_type: low, high = '6', '8'
-            elif 'High' in school_type: low, high = '9', '12'
-            else: low, high = 'KG', '12'
-            valid_locations = REAL_LOCATIONS.get(state_abbr, [("City", "000")])
-            city_name, zip_prefix = random.choice(valid_locations)
-            schools_data.append({
-                "School_id": school_id, "School_name": f"{fake.last_name()} {school_type}",
-                "School_number": school_code, "Low_grade": low, "High_grade": high,
-                "Principal": fake.name(), "Principal_email": f"principal.{school_id}@{email_domain}",
-                "School_address": fake.street_address(), "School_city": city_name,
-                "School_state": state_abbr, "School_zip": f"{zip_prefix}{random.randint(10, 99)}",
-                "School_phone": fake.phone_number()
+            current_load = teacher_load_counts.get(p_teach, 0)
+            term_idx = current_load % len(TERM_CYCLE)
+            selected_term = TERM_CYCLE[term_idx]
+            teacher_load_counts[p_teach] = current_load + 1
+
+            s_grade = counter_grades[sec_idx] if GEN_MODE == 'counter' else random.choice(grade_list)
+            s_subj = random.choice(SUBJECTS)
+            sections_data.append({
+                "School_id": school_id, "Section_id": sec_id, "Teacher_id": p_teach, "Teacher_2_id": s_teach,
+                "Name": f"{s_grade} - {s_subj} ({sec_idx+1})", "Grade": s_grade, "Subject": s_subj,
+                "Term_name": selected_term["Term_name"], "Term_start": selected_term["Term_start"], "Term_end": selected_term["Term_end"]
             })
 
-            # B. TEACHERS
-            school_teacher_ids = []
-            for t_idx in range(TEACHERS_PER_SCHOOL):
-                if ID_MODE == 'alphanumeric':
-                    t_id = get_hex_id(7)
-                    t_num = f"T-{random.randint(100000, 999999)}"
-                    st_id = f"{state_abbr}-{t_num}"
-                else:
-                    t_id = get_sequential_id(base_id_seq, (s_idx * 1000) + t_idx)
-                    t_num, st_id = t_id, t_id
-                f, l = fake.first_name(), fake.last_name()
-                teachers_data.append({
-                    "School_id": school_id, "Teacher_id": t_id, "Teacher_number": t_num, "State_teacher_id": st_id,
-                    "Teacher_email": f"{f[0].lower()}{l.lower()}@{email_domain}", "First_name": f, "Last_name": l, "Title": "Teacher"
-                })
-                school_teacher_ids.append(t_id)
-
-            # C. STAFF
-            for st_idx in range(2):
-                st_id = get_hex_id(7) if ID_MODE == 'alphanumeric' else get_sequential_id(base_id_seq, 9000 + st_idx)
-                f, l = fake.first_name(), fake.last_name()
-                staff_data.append({
-                    "School_id": school_id, "Staff_id": st_id, "Staff_email": f"{f}.{l}@{email_domain}",
-                    "First_name": f, "Last_name": l, "Department": "Admin", "Title": "Staff"
-                })
-
-            # D. ROSTERING
-            grade_list = [str(g) if g > 0 else 'KG' for g in range(int(low) if low.isdigit() else 0, (int(high) if high.isdigit() else 12) + 1)]
-            teacher_load_counts = {} 
-
-            for sec_idx in range(SECTIONS_PER_SCHOOL):
-                sec_id = get_hex_id(8) if ID_MODE == 'alphanumeric' else get_sequential_id(base_id_seq, 50000 + sec_idx)
-                p_teach = random.choice(school_teacher_ids)
-                s_teach = random.choice([t for t in school_teacher_ids if t != p_teach]) if sec_idx == 0 else None
-                
-                current_load = teacher_load_counts.get(p_teach, 0)
-                term_idx = current_load % len(TERM_CYCLE)
-                selected_term = TERM_CYCLE[term_idx]
-                teacher_load_counts[p_teach] = current_load + 1
-
-                s_grade = random.choice(grade_list)
-                s_subj = random.choice(['Math', 'Science', 'ELA', 'History'])
-                sections_data.append({
-                    "School_id": school_id, "Section_id": sec_id, "Teacher_id": p_teach, "Teacher_2_id": s_teach,
-                    "Name": f"{s_grade} - {s_subj} ({sec_idx+1})", "Grade": s_grade, "Subject": s_subj,
-                    "Term_name": selected_term["Term_name"], "Term_start": selected_term["Term_start"], "Term_end": selected_term["Term_end"]
-                })
+            school_sec_ids.append(sec_id)
+            school_sec_grades.append(s_grade)
+            school_sec_terms.append(term_idx)
+            school_sec_subjects.append(s_subj)
+            if batched: continue
 
+            with stage("students") as stu_stage:
                 for stu_idx in range(STUDENTS_PER_SECTION):
+                    stu_pos = first_student + sec_idx * STUDENTS_PER_SECTION + stu_idx
+                    stu_id = allocate_id("student", district, stu_pos)
                     if ID_MODE == 'alphanumeric':
-                        stu_id = get_hex_id(6)
                         stu_num = f"{district_prefix}{random.randint(100000, 999999)}"
                         state_id = f"{state_abbr}-{school_code}-{stu_num}"
                     else:
-                        stu_id = get_sequential_id(base_id_seq, 200000 + (sec_idx * 100) + stu_idx)
                         stu_num, state_id = stu_id, stu_id
 
                     gender_code = random.choice(['M', 'F'])
                     f = fake.first_name_male() if gender_code == 'M' else fake.first_name_female()
                     l = fake.last_name()
-                    
+            
                     has_disability = "Y" if random.random() < PROB_DISABILITY else "N"
                     dis_code, dis_type = ("", "")
                     if has_disability == "Y":
@@ -410,8 +799,15 @@ with Progress(SpinnerColumn(), TextColumn("[progress.description]{task.descripti
                     # --- CONTACTS LOGIC ---
                     if DO_CONTACTS:
                         # 1. Generate household (list of dicts)
-                        household = generate_household_contacts(l, email_domain)
-                        # 2. Iterate and create a new row for each contact
+                        with stage("contacts") as contact_stage:
+                            household = generate_household_contacts(l, email_domain, district, stu_pos)
+                            contact_stage.rows += len(household)
+                        if CONTACTS_LAYOUT == "normalized":
+                            # 2a. One student row, contacts go to their own table keyed by Student_id
+                            students_data.append(base_student_obj)
+                            contacts_data.extend({"Student_id": stu_id, **contact} for contact in household)
+                            household = []
+                        # 2b. Iterate and create a new row for each contact
                         for contact in household:
                             row = base_student_obj.copy()
                             row.update(contact) # Add Contact Fields
@@ -422,81 +818,696 @@ with Progress(SpinnerColumn(), TextColumn("[progress.description]{task.descripti
 
                     # Enrollments (Only ONE per student per section, regardless of contact rows)
                     enrollments_data.append({"School_id": school_id, "Section_id": sec_id, "Student_id": stu_id})
+                stu_stage.rows += STUDENTS_PER_SECTION
+        st.rows = len(sections_data)
+
+    sec_range = range(SECTIONS_PER_SCHOOL) if block is None else block
+    sec_terms = np.asarray(school_sec_terms, dtype=np.int16)
+    if block is not None:
+        school_sec_ids, school_sec_grades = school_sec_ids[block.start:block.stop], school_sec_grades[block.start:block.stop]
+        first_student += block.start * STUDENTS_PER_SECTION
+        if block.start:
+            # Later blocks only add students: own seed, school-level rows came with the first block
+            seed_unit(ctx["index"], 0, s_idx, block.start)
+            schools_data, teachers_data, staff_data, sections_data = [], [], [], []
+
+    # Enrollments as (student row, section index within sec_range) pairs
+    if ENROLLMENT_MODE == 'schedule':
+        with stage("schedule") as st:
+            grades, stu_rows, sec_rows = assign_schedule(school_sec_grades, school_sec_terms, school_sec_subjects)
+            st.rows = len(stu_rows)
+    else:
+        sec_rows = np.repeat(np.arange(len(sec_range)), STUDENTS_PER_SECTION)
+        stu_rows = np.arange(len(sec_rows))
+        grades = np.asarray(school_sec_grades, dtype=object)[sec_rows]
+
+    if batched and len(grades):
+        with stage("students") as st:
+            enrolled = (stu_rows, np.asarray(school_sec_ids, dtype=object)[sec_rows])
+            students_data, enrollments_data, contacts_data = generate_student_block(school_id, school_code, grades, first_student + np.arange(len(grades)), enrolled, state_abbr, district_prefix, district, email_domain)
+            st.rows = len(grades)
+
+    sec_of_row = sec_range.start + sec_rows
+    return {
+        "schools": schools_data, "teachers": teachers_data, "staff": staff_data,
+        "students": students_data, "sections": sections_data, "enrollments": enrollments_data,
+        "contacts": contacts_data,
+        "school_id": school_id,
+        "enrollment_positions": {
+            "school": np.full(len(sec_of_row), s_idx, dtype=np.int32),
+            "section": s_idx * SECTIONS_PER_SCHOOL + sec_of_row,
+            "student": first_student + stu_rows,
+            "term": sec_terms[sec_of_row],
+        },
+    }
 
-        # E. ADMIN
-        if schools_data:
-            admin_id = get_hex_id(7) if ID_MODE == 'alphanumeric' else str(base_id_seq + 99999)
-            staff_data.insert(0, { "School_id": schools_data[0]['School_id'], "Staff_id": admin_id, "Staff_email": f"admin@{email_domain}", "First_name": "System", "Last_name": "Admin", "Department": "Central", "Title": "Admin" })
+def generate_school_unit(unit, worker=False):
+    """
+    Process-pool entry point: unit is (district context, school index, section block or None).
+    Returns (tables, stage metrics, peak RSS), the metrics being merged by whichever process
+    consumes them. In a `worker` process the peak RSS is reset first, so it is this unit's own;
+    otherwise it is None (the caller measures its own process).
+    """
+    ctx, s_idx, block = unit
+    if worker: reset_peak_rss()
+    with metrics.scope() as stages:
+        tables = generate_school(ctx, s_idx, block)
+    return tables, stages, peak_rss_bytes() if worker else None
+
+def generate_supplemental(ctx, att_inputs, school_ids):
+    """
+    Resources and attendance for a finished district, yielded as (table name, rows or columns).
+    `att_inputs` holds the attendance inputs (see generate_attendance) and `school_ids` the district's School_ids by index.
+    """
+    seed_unit(ctx["index"], 1)
 
-        # --- SUPPLEMENTAL GENERATION ---
+    if DO_RESOURCES:
+        library_pool = [
+            ("District Math: Algebra I", "student,teacher"), ("District Math: Geometry", "student,teacher"),
+            ("Virtual Lab: Biology", "student,teacher"), ("District Digital Library", "student,teacher"),
+            ("World Atlas Interactive", "student,teacher"), ("Attendance Dashboard", "teacher")
+        ]
         resources_data = []
-        attendance_data = []
-
-        if DO_RESOURCES:
-            progress.update(main_task, description=f"[cyan]Resources for {dist_name}...[/cyan]")
-            library_pool = [
-                ("District Math: Algebra I", "student,teacher"), ("District Math: Geometry", "student,teacher"),
-                ("Virtual Lab: Biology", "student,teacher"), ("District Digital Library", "student,teacher"),
-                ("World Atlas Interactive", "student,teacher"), ("Attendance Dashboard", "teacher")
-            ]
+        with stage("resources") as st:
             for title, roles in library_pool:
                 prefix = title.split(':')[0][:3].upper().replace(" ", "")
-                res_id = f"RES-{prefix}-{str(abs(hash(title)))[:4]}"
+                res_id = f"RES-{prefix}-{zlib.crc32(title.encode()) % 10000:04d}"
                 resources_data.append({"resource_id": res_id, "title": title, "roles": roles})
+            st.rows = len(resources_data)
+        yield "resources", resources_data
 
-        if DO_ATTENDANCE:
-            progress.update(main_task, description=f"[cyan]Attendance for {dist_name}...[/cyan]")
-            valid_dates = generate_date_range(ATT_CONFIG['start_date'], ATT_CONFIG['days'])
-            stu_to_sec = {}
-            if ATT_CONFIG['mode'] == "Section":
-                for row in enrollments_data:
-                    sid = row['Student_id']
-                    if sid not in stu_to_sec: stu_to_sec[sid] = []
-                    stu_to_sec[sid].append(row['Section_id'])
-            
-            # For attendance, we need unique student IDs, so we dedupe the list from students_data
-            unique_student_map = {v['Student_id']: v['School_id'] for v in students_data}
-
-            for date_obj in valid_dates:
-                date_str = date_obj.strftime("%Y-%m-%d")
-                for sid, sch_id in unique_student_map.items():
-                    if ATT_CONFIG['mode'] == "Daily":
-                        status = random.choices(["present", "absent", "tardy"], weights=[0.90, 0.05, 0.05])[0]
-                        excuse = f"EXC-{random.randint(100,999)}" if status != "present" else ""
-                        attendance_data.append({
-                            "sis_id": f"att-{uuid.uuid4().hex[:10]}", "school_id": sch_id, "student_id": sid,
-                            "section_id": "", "attendance_date": date_str, "attendance_type": "daily",
-                            "attendance_status": status, "excuse_code": excuse
-                        })
-                    else:
-                        for sec_id in stu_to_sec.get(sid, []):
-                            status = random.choices(["present", "absent", "tardy"], weights=[0.92, 0.04, 0.04])[0]
-                            excuse = f"EXC-{random.randint(100,999)}" if status != "present" else ""
-                            attendance_data.append({
-                                "sis_id": f"att-{uuid.uuid4().hex[:10]}", "school_id": sch_id, "student_id": sid,
-                                "section_id": sec_id, "attendance_date": date_str, "attendance_type": "section",
-                                "attendance_status": status, "excuse_code": excuse
-                            })
-
-        # --- SAVING (CSV / JSON) ---
-        progress.update(main_task, description=f"[yellow]Saving {dist_name}...[/yellow]")
-        out_dir = os.path.join(base_output_dir, f"{dist_name}_Data")
-        os.makedirs(out_dir, exist_ok=True)
-        
-        save_data(schools_data, "schools", out_dir, OUTPUT_FORMAT)
-        save_data(teachers_data, "teachers", out_dir, OUTPUT_FORMAT)
-        save_data(staff_data, "staff", out_dir, OUTPUT_FORMAT)
-        
-        # Students data now contains duplicates for contacts, so we save it as is.
-        save_data(students_data, "students", out_dir, OUTPUT_FORMAT)
-        
-        save_data(sections_data, "sections", out_dir, OUTPUT_FORMAT)
-        save_data(enrollments_data, "enrollments", out_dir, OUTPUT_FORMAT)
-        
-        if resources_data: save_data(resources_data, "resources", out_dir, OUTPUT_FORMAT)
-        if attendance_data: save_data(attendance_data, "attendance", out_dir, OUTPUT_FORMAT)
+    if DO_ATTENDANCE and att_inputs is not None:
+        for chunk in generate_attendance(ctx, att_inputs, school_ids): yield "attendance", chunk
+
+def student_section_index(students):
+    """
+    Index from students to their enrollment rows, students in first-seen order: student k's rows
+    are rows[offsets[k]:offsets[k + 1]], so rows itself lists every student followed by all of
+    their sections and rows[offsets[:-1]] lists each student once.
+    """
+    _, first_idx, inverse, counts = np.unique(students, return_index=True, return_inverse=True, return_counts=True)
+    seen = np.argsort(first_idx)
+    rank = np.empty_like(seen)
+    rank[seen] = np.arange(len(seen))
+    rows = np.argsort(rank[inverse], kind='stable')
+    offsets = np.concatenate([[0], np.cumsum(counts[seen])])
+    return rows, offsets
+
+def attendance_order_keys():
+    """Names of the attendance orders: one per term ("term_0", ...) in schedule-mode Section attendance, else "rows"."""
+    by_term = ATT_CONFIG['mode'] != "Daily" and ENROLLMENT_MODE == "schedule"
+    return [f"term_{t}" for t in range(len(TERM_CYCLE))] if by_term else ["rows"]
+
+def attendance_order(positions):
+    """
+    {attendance_order_keys() name: rows} of one unit's ENROLLMENT_POSITIONS, in attendance order:
+    each student once (Daily) or each student followed by all of their sections. No student spans
+    two units, so a district's order is its units' orders one after another, and only one unit
+    is ever indexed at a time.
+    """
+    rows, offsets = student_section_index(positions["student"])
+    order = rows[offsets[:-1]] if ATT_CONFIG['mode'] == "Daily" else rows
+    keys = attendance_order_keys()
+    if keys == ["rows"]: return {"rows": order}
+    terms = positions["term"][order]
+    return {key: order[terms == t] for t, key in enumerate(keys)}
+
+def term_of_date(date_str):
+    """Index into TERM_CYCLE of the term in session on `date_str` (-1 between terms)."""
+    for t_idx, term in enumerate(TERM_CYCLE):
+        if term["Term_start"] <= date_str <= term["Term_end"]: return t_idx
+    return -1
+
+def generate_attendance(ctx, att_inputs, school_ids):
+    """
+    Yields attendance column chunks, one date (and at most ATT_CHUNK_ROWS rows) at a time.
+    Statuses and excuse codes are drawn in vectorized batches and sis_ids are allocated from a
+    per-district counter, so memory is bounded by the chunk size no matter how many days are requested.
+    `att_inputs` maps attendance_order_keys() to spills of ENROLLMENT_POSITIONS already in attendance
+    order (integer positions only); each chunk is read back and re-derives its IDs (see allocate_ids).
+    In schedule mode Section attendance only lists each student's sections of the term in session.
+    """
+    district = ctx["index"]
+    daily = ATT_CONFIG['mode'] == "Daily"
+    statuses, weights = ATT_STATUS_WEIGHTS["daily" if daily else "section"]
+    att_type = "daily" if daily else "section"
+    status_values = np.asarray(statuses, dtype=object)
+    counter = 0
+
+    for date_obj in generate_date_range(ATT_CONFIG['start_date'], ATT_CONFIG['days']):
+        date_str = date_obj.strftime("%Y-%m-%d")
+        day_inputs = att_inputs["rows"] if "rows" in att_inputs else att_inputs.get(f"term_{term_of_date(date_str)}")
+        if day_inputs is None: continue
+        for start in range(0, day_inputs.rows, ATT_CHUNK_ROWS):
+            stop = min(start + ATT_CHUNK_ROWS, day_inputs.rows)
+            n = stop - start
+            with stage("attendance") as st:
+                positions = day_inputs.read(start, stop)
+                status = status_values[rng.choice(len(statuses), size=n, p=weights)]
+                excuse_nums = rng.integers(100, 1000, n)
+                chunk = {
+                    "sis_id": [f"att-{x}" for x in allocate_ids("attendance", district, np.arange(counter, counter + n))],
+                    "school_id": school_ids[positions["school"]],
+                    "student_id": allocate_ids("student", district, positions["student"]),
+                    "section_id": [""] * n if daily else allocate_ids("section", district, positions["section"]),
+                    "attendance_date": [date_str] * n,
+                    "attendance_type": [att_type] * n, "attendance_status": status,
+                    "excuse_code": [f"EXC-{e}" if s != "present" else "" for s, e in zip(status, excuse_nums)],
+                }
+                st.rows = n
+            yield chunk
+            counter += n
+
+def ordered_unit_results(units, workers):
+    """
+    Yields generate_school_unit(unit) for each unit, in order.
+    With workers > 1 the units run in a process pool, keeping at most 2 * workers in flight so
+    finished schools never pile up faster than the writer drains them.
+    """
+    if workers <= 1:
+        for unit in units: yield generate_school_unit(unit)
+        return
+
+    from collections import deque
+    from concurrent.futures import ProcessPoolExecutor
+    settings = current_settings()
+    with ProcessPoolExecutor(max_workers=workers, initializer=apply_settings, initargs=(settings,)) as pool:
+        pending = deque()
+        unit_iter = iter(units)
+        for unit in unit_iter:
+            pending.append(pool.submit(generate_school_unit, unit, True))
+            if len(pending) >= 2 * workers: break
+        while pending:
+            yield pending.popleft().result()
+            for unit in unit_iter:
+                pending.append(pool.submit(generate_school_unit, unit, True))
+                break
+
+def current_settings(): return {key: globals()[key] for key in DEFAULTS}
+
+def district_contexts():
+    names = district_names()
+    return [district_context(i, names[i % len(names)]) for i in range(NUM_DISTRICTS)]
+
+def index_range(value, limit, name):
+    """
+    `value` as a sorted list of 0-based indexes below `limit`: None for all of them, or an int,
+    a slice or any iterable of ints (e.g. a range). Raises ValueError when that selects nothing
+    or an index out of range.
+    """
+    if value is None: return list(range(limit))
+    if isinstance(value, slice): indexes = list(range(*value.indices(limit)))
+    else: indexes = sorted({value} if isinstance(value, int) else set(value))
+    if not indexes or not 0 <= indexes[0] <= indexes[-1] < limit:
+        shown = "{}:{}".format(*("" if i is None else i for i in (value.start, value.stop))) if isinstance(value, slice) else repr(value)
+        raise ValueError(f"{name} must select indexes in [0, {limit}), got {shown}")
+    return indexes
+
+def iter_district_tables(workers=1, on_event=None, contexts=None, schools=None):
+    """
+    Core generator for the applied settings, parallelised over schools. Yields
+    (district context, table name, rows or columns) for every chunk of every district in output
+    order, then (context, None, None) once a district is complete. `on_event(kind, ctx, detail)`
+    is called with kind "district" (starting), "school" (one finished) and "supplemental".
+    `contexts` restricts the run to some districts and `schools` (a list of school indexes) to
+    some schools of each. Every district and school is seeded by its own index, so its rows do not
+    depend on which others are generated alongside it. Attendance is drawn over a whole district,
+    so it is left out when only some schools are generated.
+    """
+    notify = on_event or (lambda kind, ctx, detail=None: None)
+    if contexts is None: contexts = district_contexts()
+    if schools is None: schools = range(SCHOOLS_PER_DISTRICT)
+    with_attendance = DO_ATTENDANCE and len(schools) == SCHOOLS_PER_DISTRICT
+    blocks = school_blocks()
+    units = [(ctx, s_idx, block) for ctx in contexts for s_idx in schools for block in blocks]
+    results = ordered_unit_results(units, workers)
+
+    for ctx in contexts:
+        notify("district", ctx, len(contexts) * len(schools))
+        school_ids = []
+        # Enrollment positions in attendance order, the only input attendance needs; spilled to disk in state-scale mode
+        with contextlib.ExitStack() as spills:
+            att_inputs = {key: spills.enter_context(ColumnSpill(ENROLLMENT_POSITIONS, on_disk=BLOCK_SECTIONS > 0)) for key in attendance_order_keys()}
+            for s_idx in schools:
+                for _ in blocks:
+                    tables, stages, peak_rss = next(results)
+                    metrics.merge(stages, peak_rss)
+                    # In the denormalized layout students carry duplicate rows for contacts, so they are passed on as is.
+                    for name in SCHOOL_TABLES:
+                        if len(tables[name]): yield ctx, name, tables[name]
+                    if with_attendance:
+                        positions = tables["enrollment_positions"]
+                        with stage("attendance"):
+                            for key, rows in attendance_order(positions).items():
+                                att_inputs[key].append(**{name: column[rows] for name, column in positions.items()})
+                school_ids.append(tables["school_id"])
+                notify("school", ctx, s_idx)
+
+            # --- SUPPLEMENTAL GENERATION ---
+            if DO_RESOURCES or DO_ATTENDANCE:
+                notify("supplemental", ctx)
+                has_attendance = any(spill.rows for spill in att_inputs.values())
+                for name, data in generate_supplemental(ctx, att_inputs if has_attendance else None, np.array(school_ids, dtype=object)): yield ctx, name, data
+
+        yield ctx, None, None
+
+def code_files():
+    """Source files whose contents shape the output (hashed into the cache key)."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    return [os.path.join(here, f) for f in ("faker_district.py", "district_pools.py", "district_ids.py", "district_writers.py", "district_counter.py", "district_package.py", "district_deltas.py")]
+
+def district_run_metrics(ctx, writer, seconds, stages):
+    """
+    Per-district report: wall time, rows/bytes per table, stage metrics and the peak RSS of this
+    process and of the worker processes while the district ran (None where unknown, see StageMetrics.reset_peaks).
+    """
+    tables = {
+        name: {"rows": tw.rows_written, "bytes": tw.bytes_written, "files": [os.path.basename(p) for p in tw.paths]}
+        for name, tw in writer.tables.items()
+    }
+    return {
+        "district": ctx["dist_name"], "index": ctx["index"], "wall_seconds": seconds,
+        "peak_rss_bytes": peak_rss_bytes() if metrics.peak_rss_scoped else None,
+        "worker_peak_rss_bytes": metrics.worker_peak_rss or None,
+        "rows_written": sum(t["rows"] for t in tables.values()),
+        "bytes_written": sum(t["bytes"] for t in tables.values()),
+        "tables": tables, "stages": stages,
+    }
+
+def write_districts(output_dir=None, workers=1, on_event=None, write_metrics=False, districts=None, schools=None):
+    """
+    Streams every district to `{output_dir}/{dist_name}_Data/` in OUTPUT_FORMAT.
+    `districts` and `schools` (see index_range) restrict the run to some districts, and to some
+    schools of each; a folder written for only some schools holds just their rows (no attendance).
+    Calls on_event("saved", ctx, folder) after each district's files are closed; returns {dist_name: folder}.
+    With CACHE_ENABLED, districts whose key is already in `{output_dir}/.cache` are hard-linked
+    into place (on_event("cached", ctx, folder)) and only the rest are generated.
+    With write_metrics, each generated district also gets a run_metrics.json (see district_run_metrics),
+    passed to on_event("metrics", ctx, report).
+    The database formats instead load every district into one `{output_dir}/districts.<format>` file
+    (see district_db), whose path is returned for each district. Likewise PACKAGE "zip" writes
+    each district as one `{output_dir}/{dist_name}_Data.zip` (see district_package).
+    """
+    require_format(OUTPUT_FORMAT)
+    require_package(PACKAGE)
+    output_dir = output_dir or base_output_dir
+    folder_of = lambda ctx: os.path.join(output_dir, f"{ctx['dist_name']}_Data")
+    contexts = district_contexts()
+    folders, keys, todo = {}, {}, [contexts[i] for i in index_range(districts, NUM_DISTRICTS, "districts")]
+    schools = index_range(schools, SCHOOLS_PER_DISTRICT, "schools")
+    if len(schools) < SCHOOLS_PER_DISTRICT and (CACHE_ENABLED or SNAPSHOT_ENABLED or OUTPUT_FORMAT in DATABASE_FORMATS):
+        raise ValueError("Writing only some schools of a district needs file output without CACHE_ENABLED or SNAPSHOT_ENABLED")
+
+    cache = None
+    if CACHE_ENABLED:
+        import district_cache
+        cache = district_cache.DistrictCache(os.path.join(output_dir, ".cache"), CACHE_MAX_BYTES)
+        code_hash = district_cache.code_fingerprint(code_files())
+        settings, missing = current_settings(), []
+        for ctx in todo:
+            keys[ctx["index"]] = district_cache.district_cache_key(settings, ctx["index"], code_hash)
+            if cache.restore(keys[ctx["index"]], folder_of(ctx)) is None:
+                missing.append(ctx)
+                continue
+            folders[ctx["dist_name"]] = folder_of(ctx)
+            if on_event: on_event("cached", ctx, folders[ctx["dist_name"]])
+        todo = missing
+
+    db = None
+    if OUTPUT_FORMAT in DATABASE_FORMATS:
+        import district_db
+        os.makedirs(output_dir, exist_ok=True)
+        db_path = os.path.join(output_dir, f"{district_db.DATABASE_FILENAME}.{OUTPUT_FORMAT}")
+        db = district_db.DatabaseTarget(db_path, OUTPUT_FORMAT, non_unique=["students"] if DO_CONTACTS and CONTACTS_LAYOUT == "denormalized" else [])
+
+    if SNAPSHOT_ENABLED: import district_deltas
+    writer = snapshot = None
+    if write_metrics: metrics.reset_peaks()
+    started, before = time.perf_counter(), metrics.totals()
+    for ctx, name, data in iter_district_tables(workers, on_event, todo, schools):
+        if writer is None:
+            if db: writer = db.district(ctx["dist_name"], STREAM_BUFFER_ROWS, metrics)
+            else: writer = DistrictWriter(folder_of(ctx), OUTPUT_FORMAT, STREAM_BUFFER_ROWS, metrics, PACKAGE, **file_options())
+            if SNAPSHOT_ENABLED: snapshot = district_deltas.SnapshotBuilder()
+        if name is not None:
+            writer.write(name, data)
+            if snapshot: snapshot.add(name, data)
+            continue
+        # --- SAVING (flush remaining buffers) ---
+        writer.close()
+        folders[ctx["dist_name"]] = writer.output_dir
+        paths = writer.paths
+        if snapshot:
+            with stage("snapshot"):
+                paths.append(os.path.join(writer.output_dir, district_deltas.SNAPSHOT_NAME))
+                snapshot.build(ctx["index"]).save(paths[-1])
+            snapshot = None
+        if cache: cache.store(keys[ctx["index"]], writer.output_dir, paths, ctx["dist_name"])
+        if write_metrics:
+            report = district_run_metrics(ctx, writer, time.perf_counter() - started, metrics.since(before))
+            outside = db or PACKAGE == "zip"   # the district is a single file
+            report_path = os.path.join(output_dir, f"{ctx['dist_name']}_run_metrics.json") if outside else os.path.join(writer.output_dir, "run_metrics.json")
+            with open(report_path, "w", encoding="utf-8") as fh: json.dump(report, fh, indent=2)
+            if on_event: on_event("metrics", ctx, report)
+        writer = None
+        if write_metrics: metrics.reset_peaks()
+        started, before = time.perf_counter(), metrics.totals()
+        if on_event: on_event("saved", ctx, folders[ctx["dist_name"]])
+    if db:
+        with stage("write.index"): db.finish()
+    return folders
+
+def churn_rates():
+    """CHURN_* settings as district_deltas rates ({"drop": 0.002, ...})."""
+    import district_deltas
+    return {kind: globals()[f"CHURN_{kind.upper()}"] for kind in district_deltas.CHURN_POPULATIONS}
+
+def write_deltas(output_dir=None, days=None, on_event=None):
+    """
+    Change feed for districts already written with SNAPSHOT_ENABLED: advances each district's
+    snapshot.npz by `days` (default DELTA_DAYS) simulated days and writes only the changes, as
+    `{district folder}/deltas/day_NNN/{table}_{adds|updates|deletes}` files in OUTPUT_FORMAT,
+    packaged like the districts themselves (PACKAGE "zip" gives one day_NNN.zip per day).
+    Calls on_event("deltas", ctx, day folder) per day; returns {dist_name: [day folders]}.
+    """
+    import district_deltas
+    require_format(OUTPUT_FORMAT)
+    require_package(PACKAGE)
+    output_dir = output_dir or base_output_dir
+    days = DELTA_DAYS if days is None else days
+    rates, written = churn_rates(), {}
+    for ctx in district_contexts():
+        folder = os.path.join(output_dir, f"{ctx['dist_name']}_Data")
+        path = os.path.join(folder, district_deltas.SNAPSHOT_NAME)
+        if not os.path.exists(path): raise FileNotFoundError(f"{path} not found; generate the district with SNAPSHOT_ENABLED (--snapshot) first")
+        snap = district_deltas.DistrictSnapshot.load(path)
+        if snap.district_index != ctx["index"]: raise ValueError(f"{path} belongs to district #{snap.district_index}, not #{ctx['index']}")
+        for _ in range(days):
+            with stage("deltas") as st:
+                changes = snap.simulate_day(SEED, rates)
+                st.rows = sum(len(next(iter(cols.values()))) for kinds in changes.values() for cols in kinds.values())
+            day_folder = os.path.join(folder, "deltas", f"day_{snap.day:03d}")
+            with DistrictWriter(day_folder, OUTPUT_FORMAT, STREAM_BUFFER_ROWS, metrics, PACKAGE, **file_options()) as writer:
+                for table, kinds in changes.items():
+                    for kind, columns in kinds.items(): writer.write(f"{table}_{kind}", columns)
+            day_folder = writer.output_dir
+            written.setdefault(ctx["dist_name"], []).append(day_folder)
+            if on_event: on_event("deltas", ctx, day_folder)
+        snap.save(path)
+    return written
+
+# ==========================================
+# 6. LIBRARY API
+# ==========================================
+def build_config(overrides=None, **kwargs):
+    """
+    A complete settings dict: DEFAULTS updated with `overrides` and keyword arguments.
+    Unknown keys and out-of-range choices raise ValueError; SEED=None becomes a fresh random seed.
+    """
+    config = dict(DEFAULTS)
+    config.update(overrides or {})
+    config.update(kwargs)
+    unknown = sorted(set(config) - set(DEFAULTS))
+    if unknown: raise ValueError(f"Unknown setting(s): {', '.join(unknown)}")
+    for key, choices in SETTING_CHOICES.items():
+        if config[key] not in choices: raise ValueError(f"{key} must be one of {choices}, got {config[key]!r}")
+    if config["BLOCK_SECTIONS"] < 0: raise ValueError(f"BLOCK_SECTIONS must be >= 0, got {config['BLOCK_SECTIONS']!r}")
+    if config["SECTIONS_PER_STUDENT"] < 1: raise ValueError(f"SECTIONS_PER_STUDENT must be >= 1, got {config['SECTIONS_PER_STUDENT']!r}")
+    if config["GEN_MODE"] == "standard" and (config["BLOCK_SECTIONS"] or config["ENROLLMENT_MODE"] == "schedule"):
+        raise ValueError("BLOCK_SECTIONS and ENROLLMENT_MODE='schedule' draw students in batches; set GEN_MODE to 'vectorized' or 'counter'")
+    if config["BLOCK_SECTIONS"] and config["ENROLLMENT_MODE"] == "schedule":
+        raise ValueError("BLOCK_SECTIONS splits schools by section, which schedule mode cannot do (its students span sections)")
+    if config["OUTPUT_FORMAT"] in DATABASE_FORMATS and (config["CACHE_ENABLED"] or config["SNAPSHOT_ENABLED"]):
+        raise ValueError(f"CACHE_ENABLED and SNAPSHOT_ENABLED need file output, not OUTPUT_FORMAT={config['OUTPUT_FORMAT']!r}")
+    if config["PACKAGE"] != "none" and config["OUTPUT_FORMAT"] not in PACKAGE_FORMATS:
+        raise ValueError(f"PACKAGE needs one of the text formats {PACKAGE_FORMATS}, not OUTPUT_FORMAT={config['OUTPUT_FORMAT']!r} (use COMPRESSION for parquet/arrow)")
+    if config["PACKAGE"] == "zip" and (config["CACHE_ENABLED"] or config["SNAPSHOT_ENABLED"]):
+        raise ValueError("CACHE_ENABLED and SNAPSHOT_ENABLED need a district folder, not PACKAGE='zip'")
+    if config["OUTPUT_FORMAT"] in COMPRESSION_CODECS and config["COMPRESSION"] not in COMPRESSION_CODECS[config["OUTPUT_FORMAT"]]:
+        raise ValueError(f"COMPRESSION for {config['OUTPUT_FORMAT']} must be one of {COMPRESSION_CODECS[config['OUTPUT_FORMAT']]}, got {config['COMPRESSION']!r}")
+    if config["ROW_GROUP_SIZE"] < 1: raise ValueError(f"ROW_GROUP_SIZE must be >= 1, got {config['ROW_GROUP_SIZE']!r}")
+    if config["DELTA_DAYS"] < 0: raise ValueError(f"DELTA_DAYS must be >= 0, got {config['DELTA_DAYS']!r}")
+    for key in (k for k in DEFAULTS if k.startswith("CHURN_")):
+        if not 0 <= config[key] <= 1: raise ValueError(f"{key} must be between 0 and 1, got {config[key]!r}")
+    if config["SEED"] is None: config["SEED"] = random.SystemRandom().randrange(2 ** 32)
+    IdAllocator(config["SEED"], id_capacities(config)).check_capacity(config["NUM_DISTRICTS"])
+    return config
+
+def load_config_file(path):
+    """Settings overrides from a JSON or TOML file with the same keys as DEFAULTS."""
+    if path.endswith(".toml"):
+        try: import tomllib
+        except ImportError: raise RuntimeError("TOML configs need Python 3.11+ (or use a .json config)") from None
+        with open(path, "rb") as fh: return tomllib.load(fh)
+    with open(path, encoding="utf-8") as fh: return json.load(fh)
+
+def generate(config=None, output_dir=None, workers=1, on_event=None, write_metrics=False, districts=None, schools=None):
+    """
+    Headless run: writes every district for `config` (a dict of DEFAULTS overrides) and returns {dist_name: folder}.
+    `districts` / `schools` (an index, a range or a slice, 0-based) write only those districts, or those schools of each.
+    """
+    apply_settings(build_config(config))
+    return write_districts(output_dir, workers, on_event, write_metrics, districts, schools)
+
+def generate_deltas(config=None, output_dir=None, days=None, on_event=None):
+    """Headless change feed for output written earlier by generate() with the same config and SNAPSHOT_ENABLED."""
+    apply_settings(build_config(config))
+    return write_deltas(output_dir, days, on_event)
+
+def serve(config=None, host="127.0.0.1", port=8080, cache_schools=64, on_ready=None):
+    """
+    Serves `config`'s districts as a local Clever-style API (see district_server) until interrupted.
+    Schools are generated on demand as pages need them, with contacts in their own collection
+    (CONTACTS_LAYOUT is forced to "normalized"). on_ready(server) is called once it is listening.
+    """
+    import asyncio
+    asyncio.run(api_server(config, cache_schools).serve(host, port, on_ready))
+
+def api_server(config=None, cache_schools=64):
+    """The district_server.ClientServer serve() runs, for calling its handle() without a socket."""
+    import district_server
+    apply_settings(build_config(config, CONTACTS_LAYOUT="normalized", BLOCK_SECTIONS=0))
+    school_tables = lambda ctx, s_idx: generate_school(ctx, s_idx)
+    store = district_server.DistrictStore(district_contexts(), SCHOOLS_PER_DISTRICT, school_tables, cache_schools)
+    return district_server.ClientServer(store)
+
+def get_student(district, school, section, index, config=None):
+    """
+    One student of a counter-mode run, computed on its own: the student at `index` of `section` of
+    `school` of district number `district` (all 0-based). Returns (student row, [contact rows]),
+    the same values a full run of `config` writes (GEN_MODE is forced to "counter", contacts are
+    returned as in the normalized layout). Needs ENROLLMENT_MODE "per_section", where each
+    student belongs to exactly one section.
+    """
+    apply_settings(build_config(config, GEN_MODE="counter", CONTACTS_LAYOUT="normalized"))
+    if ENROLLMENT_MODE != "per_section": raise ValueError("get_student needs ENROLLMENT_MODE 'per_section' (schedule-mode students span sections)")
+    for name, value, limit in (("district", district, NUM_DISTRICTS), ("school", school, SCHOOLS_PER_DISTRICT),
+                               ("section", section, SECTIONS_PER_SCHOOL), ("index", index, STUDENTS_PER_SECTION)):
+        if not 0 <= value < limit: raise ValueError(f"{name} must be in [0, {limit}), got {value!r}")
+    ctx = district_contexts()[district]
+    school_id, _, sec_grades = counter_school_header(district, school)
+    section_id = allocate_id("section", district, school * SECTIONS_PER_SCHOOL + section)
+    position = (school * SECTIONS_PER_SCHOOL + section) * STUDENTS_PER_SECTION + index
+    students, _, contacts = generate_student_block(
+        school_id, f"{school + 1:02d}", sec_grades[section:section + 1], [position], (np.array([0]), np.array([section_id], dtype=object)),
+        ctx["state_abbr"], ctx["district_prefix"], district, ctx["email_domain"])
+    rows = lambda data: [dict(zip(data, values)) for values in zip(*data.values())]
+    return rows(students)[0], rows(contacts)
+
+def validate(output_dir=None, on_report=None):
+    """
+    Checks the district folders already written to `output_dir` (see district_validate): unique keys,
+    resolving references, email collisions and the Clever column rules. The files are streamed, so
+    no config is needed. Returns one report per folder, passing each to on_report(report) as it finishes.
+    """
+    import district_validate
+    validator = district_validate.DistrictValidator(GRADE_AGE_MAP, LANG_KEYS, CLEVER_RACE_VALUES)
+    reports = []
+    for folder in district_validate.district_folders(output_dir or base_output_dir):
+        with stage("validate") as st:
+            reports.append(validator.validate(folder))
+            st.rows = sum(t["rows"] for t in reports[-1]["tables"].values())
+        if on_report: on_report(reports[-1])
+    return reports
+
+def iter_tables(config=None, workers=1, districts=None, schools=None):
+    """
+    Headless streaming: yields (dist_name, table name, rows or columns) chunks without writing files.
+    `districts` / `schools` restrict it like generate() does.
+    """
+    apply_settings(build_config(config))
+    contexts = district_contexts()
+    contexts = [contexts[i] for i in index_range(districts, NUM_DISTRICTS, "districts")]
+    for ctx, name, data in iter_district_tables(workers, contexts=contexts, schools=index_range(schools, SCHOOLS_PER_DISTRICT, "schools")):
+        if name is not None: yield ctx["dist_name"], name, data
+
+def generate_tables(config=None, workers=1, districts=None, schools=None):
+    """Headless, in memory: {dist_name: {table name: [row dicts]}}. Meant for small test fixtures."""
+    out = {}
+    for dist_name, name, data in iter_tables(config, workers, districts, schools):
+        rows = [dict(zip(data, values)) for values in zip(*data.values())] if isinstance(data, dict) else list(data)
+        out.setdefault(dist_name, {}).setdefault(name, []).extend(rows)
+    return out
+
+# ==========================================
+# 7. COMMAND LINE
+# ==========================================
+def index_slice(text):
+    """--districts / --schools value: an index "N", or a Python-style "START:STOP" slice with either end optional."""
+    start, colon, stop = text.partition(":")
+    try:
+        if not colon: return int(start)
+        return slice(int(start) if start else None, int(stop) if stop else None)
+    except ValueError: raise ValueError(f"expected N or START:STOP, got {text!r}") from None
+
+def parse_args(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Generate Clever-compliant demo district data.")
+    parser.add_argument("--config", help="JSON/TOML file of DEFAULTS overrides; runs without any prompts")
+    parser.add_argument("--defaults", action="store_true", help="Use DEFAULTS as-is without prompting")
+    parser.add_argument("--output-dir", default=base_output_dir, help=f"Output folder (default: {base_output_dir})")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes for school generation (default: 1)")
+    parser.add_argument("--seed", type=int, default=None, help="Base random seed; the same seed gives the same output for any --workers")
+    parser.add_argument("--districts", type=index_slice, metavar="N|START:STOP", help="Only generate these districts (0-based, STOP excluded); each matches the full run's")
+    parser.add_argument("--schools", type=index_slice, metavar="N|START:STOP", help="Only generate these schools of each district (0-based, STOP excluded; no attendance)")
+    parser.add_argument("--cache", action="store_true", help="Reuse unchanged districts from <output-dir>/.cache (use with --seed)")
+    parser.add_argument("--metrics", action="store_true", help="Write run_metrics.json per district and print a per-stage summary")
+    parser.add_argument("--profile", metavar="STAGE", help="Run one stage (e.g. students, contacts, attendance, write.csv) under cProfile")
+    parser.add_argument("--serve", type=int, metavar="PORT", help="Instead of writing files, serve the districts as a local Clever-style JSON API on PORT")
+    parser.add_argument("--host", default="127.0.0.1", help="Address --serve listens on (default: 127.0.0.1)")
+    parser.add_argument("--package", choices=[m for m in PACKAGE_MODES if m != "none"],
+                        help="Compress csv/json output as it is written: a .gz or .zst file per table, or one zip per district")
+    parser.add_argument("--snapshot", action="store_true", help="Also save a compact snapshot.npz per district, the starting point for --deltas")
+    parser.add_argument("--validate", action="store_true",
+                        help="Instead of generating, check the districts in --output-dir: unique IDs, references, email collisions, column rules")
+    parser.add_argument("--deltas", type=int, nargs="?", const=-1, metavar="DAYS",
+                        help="Instead of generating, write DAYS (default: DELTA_DAYS) days of changes for districts saved with --snapshot")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    if (args.districts is not None or args.schools is not None) and (args.validate or args.serve is not None or args.deltas is not None):
+        raise SystemExit("--districts and --schools only apply when generating files")
+    if args.validate:
+        try: reports = validate(args.output_dir, on_report=print_validation_report)
+        except FileNotFoundError as e: raise SystemExit(str(e))
+        if not reports: raise SystemExit(f"No district folders found in {args.output_dir}")
+        if any(report["violations"] for report in reports): raise SystemExit(1)
+        return
+    interactive = not (args.config or args.defaults)
+    if interactive:
+        from rich.prompt import Confirm
+        get_console().rule("[bold green]Demo District Generator (v6.0 - Student Contacts)[/bold green]")
+        settings = prompt_settings()
+        if not Confirm.ask("Ready to generate?", default=True): return
+    else:
+        settings = load_config_file(args.config) if args.config else {}
+
+    if args.seed is not None: settings["SEED"] = args.seed
+    if args.cache: settings["CACHE_ENABLED"] = True
+    if args.snapshot: settings["SNAPSHOT_ENABLED"] = True
+    if args.package: settings["PACKAGE"] = args.package
+    if args.deltas is not None and args.deltas >= 0: settings["DELTA_DAYS"] = args.deltas
+    apply_settings(build_config(settings))
+    try: districts, schools = index_range(args.districts, NUM_DISTRICTS, "--districts"), index_range(args.schools, SCHOOLS_PER_DISTRICT, "--schools")
+    except ValueError as e: raise SystemExit(str(e))
+
+    if args.serve is not None:
+        console = get_console()
+        on_ready = lambda server: console.print(f"[green]Serving {NUM_DISTRICTS} district(s) on http://{args.host}:{args.serve}/v3.0/ (seed {SEED}), Ctrl+C to stop[/green]")
+        try: serve(current_settings(), args.host, args.serve, on_ready=on_ready)
+        except KeyboardInterrupt: console.print("\n[bold blue]Server stopped.[/bold blue]")
+        return
+
+    if args.deltas is not None:
+        console = get_console()
+        on_event = lambda kind, ctx, folder: console.print(f":memo: [green]{ctx['dist_name']}[/green] {os.path.basename(folder)}")
+        try: write_deltas(args.output_dir, on_event=on_event)
+        except (FileNotFoundError, ValueError) as e: raise SystemExit(str(e))
+        console.print("\n[bold blue]Change Feed Complete![/bold blue]")
+        return
+
+    from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, MofNCompleteColumn
+    console = get_console()
+    console.print(f"\n[yellow]Term Logic Active:[/yellow] {len(TERM_CYCLE)} terms in rotation.")
+    if args.profile:
+        metrics.profile(args.profile)
+        if args.workers > 1:
+            console.print("[yellow]--profile runs in a single process; ignoring --workers.[/yellow]")
+            args.workers = 1
+    console.print(f"[yellow]Seed:[/yellow] {SEED}  [yellow]Workers:[/yellow] {args.workers}")
+    reports = []
+
+    with Progress(SpinnerColumn(), TextColumn("[progress.description]{task.description}"), BarColumn(), MofNCompleteColumn(), console=console) as progress:
+        main_task = progress.add_task("[green]Initializing...", total=None)
+
+        def on_event(kind, ctx, detail=None):
+            dist_name = ctx["dist_name"]
+            if kind == "district":
+                progress.update(main_task, total=detail, description=f"[green]Generating {dist_name}...[/green]")
+            elif kind == "school":
+                progress.advance(main_task)
+            elif kind == "supplemental":
+                progress.update(main_task, description=f"[cyan]Supplemental data for {dist_name}...[/cyan]")
+            elif kind == "saved":
+                console.print(f":white_check_mark: [green]{dist_name} Complete[/green]")
+            elif kind == "cached":
+                console.print(f":recycle: [green]{dist_name} unchanged, reused from cache[/green]")
+            elif kind == "metrics":
+                reports.append(detail)
+
+        try: write_districts(args.output_dir, workers=args.workers, on_event=on_event, write_metrics=args.metrics, districts=districts, schools=schools)
+        except ValueError as e: raise SystemExit(str(e))
+
+    if reports: print_metrics_summary(reports)
+    if args.profile:
+        stats = metrics.dump_profile(os.path.join(args.output_dir, f"profile_{args.profile}.pstats"))
+        if stats is None: console.print(f"[red]Stage '{args.profile}' never ran, nothing profiled.[/red]")
+        else:
+            console.print(f"\n[bold]cProfile of '{args.profile}'[/bold] (full stats in {args.output_dir}/profile_{args.profile}.pstats):")
+            stats.sort_stats("cumulative").print_stats(20)
+    console.print("\n[bold blue]Generation Complete![/bold blue]")
+
+def print_metrics_summary(reports):
+    """Stage totals across the generated districts, then one line per district."""
+    from rich.table import Table
+    console = get_console()
+    stages = {}
+    for report in reports:
+        for name, rec in report["stages"].items(): stages.setdefault(name, []).append(rec)
+    total_seconds = sum(rec["seconds"] for recs in stages.values() for rec in recs) or 1.0
+
+    table = Table(title="Run Metrics")
+    for col in ("Stage", "Seconds", "Share", "Rows", "Rows/sec", "MiB written", "Peak RSS +MiB"): table.add_column(col, justify="left" if col == "Stage" else "right")
+    for name, recs in sorted(stages.items(), key=lambda kv: -sum(r["seconds"] for r in kv[1])):
+        seconds, rows = sum(r["seconds"] for r in recs), sum(r["rows"] for r in recs)
+        written, growth = sum(r["bytes"] for r in recs), max(r["peak_rss_growth_bytes"] for r in recs)
+        table.add_row(name, f"{seconds:.3f}", f"{seconds / total_seconds:.0%}", f"{rows:,}", f"{rows / seconds:,.0f}" if seconds and rows else "-",
+                      f"{written / 2 ** 20:,.1f}" if written else "-", f"{growth / 2 ** 20:,.1f}")
+    console.print(table)
+
+    mib = lambda n: "n/a" if n is None else f"{n / 2 ** 20:,.0f} MiB"
+    for report in reports:
+        workers = report["worker_peak_rss_bytes"]
+        console.print(f"  {report['district']}: {report['wall_seconds']:.2f}s, {report['rows_written']:,} rows, "
+                      f"{report['bytes_written'] / 2 ** 20:,.1f} MiB written, peak RSS {mib(report['peak_rss_bytes'])}"
+                      + (f" (workers {mib(workers)})" if workers else ""))
+
+def print_validation_report(report):
+    """One district's validate() report: table sizes, then every violation with its count."""
+    from rich.table import Table
+    console = get_console()
+    tables = ", ".join(f"{name} {info['rows']:,}" for name, info in report["tables"].items())
+    if not report["violations"]:
+        console.print(f":white_check_mark: [green]{os.path.basename(report['folder'])}[/green] valid ({tables})")
+        return
+    table = Table(title=f"{os.path.basename(report['folder'])}: {len(report['violations'])} failed check(s)")
+    for col in ("Table", "Check", "Count", "Examples"): table.add_column(col, justify="right" if col == "Count" else "left")
+    for v in report["violations"]: table.add_row(v["table"], v["check"], f"{v['count']:,}", ", ".join(map(str, v["examples"])))
+    console.print(table)
+    console.print(f"  rows checked: {tables}")
 
-        progress.advance(main_task)
-        console.print(f":white_check_mark: [green]{dist_name} Complete[/green]")
+apply_settings(DEFAULTS)
 
-console.print("\n[bold blue]Generation Complete![/bold blue]")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+import hashlib
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Small enough to run in a second or two, big enough for several schools, sections and attendance days
+SMALL = {
+    "SEED": 7, "NUM_DISTRICTS": 2, "SCHOOLS_PER_DISTRICT": 3, "TEACHERS_PER_SCHOOL": 4,
+    "SECTIONS_PER_SCHOOL": 6, "STUDENTS_PER_SECTION": 5, "DO_ATTENDANCE": True, "ATT_DAYS": 3,
+}
+
+
+def folder_digests(path):
+    """{relative path: sha256} of every file under `path`."""
+    out = {}
+    for root, _, files in os.walk(path):
+        for name in files:
+            full = os.path.join(root, name)
+            with open(full, "rb") as fh: out[os.path.relpath(full, path)] = hashlib.sha256(fh.read()).hexdigest()
+    return out
+
+
+@pytest.fixture
+def small():
+    return dict(SMALL)
@@ -0,0 +1,55 @@
+import os
+
+import pytest
+
+import district_cache
+import faker_district
+from conftest import folder_digests
+
+
+def run(config, output_dir):
+    events = []
+    faker_district.generate(config, output_dir, on_event=lambda kind, ctx, detail=None: events.append(kind))
+    return events
+
+
+def district_digests(output_dir):
+    return {path: digest for path, digest in folder_digests(output_dir).items() if not path.startswith(".cache")}
+
+
+def test_restored_districts_match_generated_ones(small, tmp_path):
+    config = dict(small, CACHE_ENABLED=True)
+    assert "cached" not in run(config, tmp_path)
+    first = district_digests(tmp_path)
+    assert run(config, tmp_path).count("cached") == small["NUM_DISTRICTS"]
+    assert district_digests(tmp_path) == first
+
+
+def test_damaged_entry_is_regenerated(small, tmp_path):
+    config = dict(small, NUM_DISTRICTS=1, CACHE_ENABLED=True)
+    run(config, tmp_path)
+    entry, = (tmp_path / ".cache").iterdir()
+    path = entry / "students.csv"
+    data = bytearray(path.read_bytes())
+    data[100] ^= 1  # same size, different contents
+    os.unlink(path)
+    path.write_bytes(bytes(data))
+    assert "cached" not in run(config, tmp_path)
+
+
+def test_uncached_run_leaves_cache_entries_intact(small, tmp_path):
+    config = dict(small, NUM_DISTRICTS=1, CACHE_ENABLED=True)
+    run(config, tmp_path)
+    run(config, tmp_path)  # restores hard links into the district folder
+    entries = folder_digests(tmp_path / ".cache")
+    run(dict(config, CACHE_ENABLED=False, PROB_FRL=0.9), tmp_path)
+    assert folder_digests(tmp_path / ".cache") == entries
+
+
+@pytest.mark.parametrize("library", ["faker", "numpy"])
+def test_library_upgrade_changes_the_key(monkeypatch, library):
+    key = lambda: district_cache.district_cache_key(faker_district.build_config({"SEED": 1}), 0, "code")
+    before = key()
+    if library == "numpy": monkeypatch.setattr(district_cache.np, "__version__", "0.0.1")
+    else: monkeypatch.setattr(district_cache.metadata, "version", lambda name: "0.0.1")
+    assert key() != before
@@ -0,0 +1,84 @@
+import pytest
+
+import faker_district
+from conftest import folder_digests
+
+
+def test_same_seed_same_output(small, tmp_path):
+    faker_district.generate(small, tmp_path / "a")
+    faker_district.generate(small, tmp_path / "b")
+    assert folder_digests(tmp_path / "a") == folder_digests(tmp_path / "b")
+
+
+@pytest.mark.parametrize("gen_mode", ["vectorized", "counter"])
+def test_output_does_not_depend_on_workers(small, tmp_path, gen_mode):
+    config = dict(small, GEN_MODE=gen_mode)
+    faker_district.generate(config, tmp_path / "one", workers=1)
+    faker_district.generate(config, tmp_path / "three", workers=3)
+    digests = folder_digests(tmp_path / "one")
+    assert digests and digests == folder_digests(tmp_path / "three")
+
+
+def test_counter_output_does_not_depend_on_blocks(small, tmp_path):
+    config = dict(small, GEN_MODE="counter")
+    faker_district.generate(config, tmp_path / "whole")
+    faker_district.generate(dict(config, BLOCK_SECTIONS=4), tmp_path / "blocks", workers=2)
+    assert folder_digests(tmp_path / "whole") == folder_digests(tmp_path / "blocks")
+
+
+def test_get_student_matches_full_run(small):
+    config = dict(small, GEN_MODE="counter", CONTACTS_LAYOUT="normalized")
+    tables = list(faker_district.generate_tables(config).values())
+    sections, per_section = small["SECTIONS_PER_SCHOOL"], small["STUDENTS_PER_SECTION"]
+    for district, school, section, index in [(0, 0, 0, 0), (0, 2, 5, 4), (1, 1, 3, 2)]:
+        student, contacts = faker_district.get_student(district, school, section, index, config)
+        expected = tables[district]["students"][(school * sections + section) * per_section + index]
+        assert student == expected
+        assert contacts == [c for c in tables[district]["contacts"] if c["Student_id"] == student["Student_id"]]
+
+
+@pytest.mark.parametrize("overrides", [{"BLOCK_SECTIONS": 2}, {"ENROLLMENT_MODE": "schedule"}])
+def test_standard_mode_rejects_batched_paths(overrides):
+    with pytest.raises(ValueError, match="GEN_MODE"):
+        faker_district.build_config(dict(overrides, GEN_MODE="standard"))
+
+
+@pytest.mark.parametrize("overrides, setting", [
+    ({"OUTPUT_FORMAT": "arrow", "COMPRESSION": "snappy"}, "COMPRESSION"),
+    ({"OUTPUT_FORMAT": "parquet", "COMPRESSION": "zip"}, "COMPRESSION"),
+    ({"OUTPUT_FORMAT": "parquet", "ROW_GROUP_SIZE": 0}, "ROW_GROUP_SIZE"),
+])
+def test_bad_columnar_settings_fail_up_front(overrides, setting):
+    with pytest.raises(ValueError, match=setting):
+        faker_district.build_config(overrides)
+
+
+@pytest.mark.parametrize("gen_mode", ["standard", "vectorized", "counter"])
+def test_one_school_alone_matches_full_run(small, gen_mode):
+    config = dict(small, GEN_MODE=gen_mode, CONTACTS_LAYOUT="normalized")
+    full = faker_district.generate_tables(config)
+    alone = faker_district.generate_tables(config, districts=1, schools=range(2, 3))
+    (name, tables), = alone.items()
+    assert "attendance" not in tables  # drawn over the whole district
+    school_id = tables["schools"][0]["School_id"]
+    for table, rows in tables.items():
+        if table == "resources": assert rows == full[name][table]
+        elif table == "contacts":
+            students = {row["Student_id"] for row in full[name]["students"] if row["School_id"] == school_id}
+            assert rows == [row for row in full[name][table] if row["Student_id"] in students]
+        else: assert rows == [row for row in full[name][table] if row["School_id"] == school_id]
+
+
+def test_district_range_matches_full_run(small, tmp_path):
+    faker_district.generate(small, tmp_path / "full")
+    folders = faker_district.generate(small, tmp_path / "one", districts=slice(1, None))
+    full = folder_digests(tmp_path / "full")
+    assert folder_digests(tmp_path / "one") == {path: digest for path, digest in full.items() if path.startswith(tuple(folders))}
+
+
+@pytest.mark.parametrize("gen_mode", ["standard", "vectorized", "counter"])
+def test_phone_numbers_are_ten_digits_in_every_mode(small, gen_mode):
+    config = dict(small, GEN_MODE=gen_mode, CONTACTS_LAYOUT="normalized", NUM_DISTRICTS=1, SCHOOLS_PER_DISTRICT=8)
+    tables, = faker_district.generate_tables(config).values()
+    phones = [row["School_phone"] for row in tables["schools"]] + [row["Contact_phone"] for row in tables["contacts"]]
+    assert all(len(phone) == 10 and phone.isdigit() for phone in phones)
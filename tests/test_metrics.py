@@ -0,0 +1,35 @@
+import sys
+
+import pytest
+
+import faker_district
+
+
+def reports(config, output_dir, workers=1):
+    found = []
+    faker_district.generate(config, output_dir, workers, on_event=lambda kind, ctx, detail=None: found.append(detail) if kind == "metrics" else None, write_metrics=True)
+    return found
+
+
+@pytest.mark.parametrize("output_format", ["csv", "json"])
+def test_stage_bytes_add_up_to_bytes_written(small, tmp_path, output_format):
+    for report in reports(dict(small, OUTPUT_FORMAT=output_format), tmp_path):
+        assert sum(rec["bytes"] for rec in report["stages"].values()) == report["bytes_written"] > 0
+
+
+def test_pool_loading_is_its_own_stage(small, tmp_path, monkeypatch):
+    monkeypatch.setattr(faker_district.pools, "_obj", None)  # as in a fresh process
+    first, *rest = reports(dict(small, GEN_MODE="vectorized"), tmp_path)
+    assert first["stages"]["pools"]["calls"] == 1
+    assert all("pools" not in report["stages"] for report in rest)
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="peak RSS is only reset on Linux")
+def test_peak_rss_is_per_district(small, tmp_path):
+    ballast = bytearray(512 * 2 ** 20)
+    ballast[::4096] = b"x" * len(range(0, len(ballast), 4096))  # touch every page, then give them back
+    del ballast
+    found = reports(dict(small, GEN_MODE="vectorized"), tmp_path, workers=2)
+    assert all(0 < report["peak_rss_bytes"] < 512 * 2 ** 20 for report in found)
+    assert all(report["worker_peak_rss_bytes"] for report in found)
+    assert all(rec["peak_rss_growth_bytes"] >= 0 for report in found for rec in report["stages"].values())
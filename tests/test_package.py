@@ -0,0 +1,65 @@
+import gzip
+import hashlib
+import json
+import os
+import zipfile
+
+import pytest
+
+import district_package
+import faker_district
+
+
+@pytest.fixture
+def config(small):
+    return dict(small, NUM_DISTRICTS=1, OUTPUT_FORMAT="both")
+
+
+def plain_files(config, output_dir):
+    folder, = faker_district.generate(config, output_dir).values()
+    out = {}
+    for name in os.listdir(folder):
+        with open(os.path.join(folder, name), "rb") as fh: out[name] = fh.read()
+    return out
+
+
+def check_manifest(manifest, mode, contents, plain):
+    """Every manifest entry matches its uncompressed contents, which match the plain run's file."""
+    assert manifest["package"] == mode
+    assert sorted(entry["table"] + "." + entry["file"].split(".")[1] for entry in manifest["files"]) == sorted(plain)
+    for entry in manifest["files"]:
+        data = contents[entry["file"]]
+        assert hashlib.sha256(data).hexdigest() == entry["sha256"]
+        assert len(data) == entry["raw_bytes"]
+        assert data == plain[entry["file"][:-len(district_package.PACKAGE_SUFFIXES[mode]) or None]]
+
+
+def test_zip_manifest_hashes(config, tmp_path):
+    plain = plain_files(config, tmp_path / "plain")
+    archive, = faker_district.generate(dict(config, PACKAGE="zip"), tmp_path / "zip").values()
+    assert archive.endswith("_Data.zip")
+    with zipfile.ZipFile(archive) as zf:
+        assert zf.testzip() is None
+        manifest = json.loads(zf.read(district_package.MANIFEST_NAME))
+        contents = {entry["file"]: zf.read(entry["file"]) for entry in manifest["files"]}
+        assert {info.filename: info.file_size for info in zf.infolist() if info.filename in contents} == \
+               {entry["file"]: entry["raw_bytes"] for entry in manifest["files"]}
+    check_manifest(manifest, "zip", contents, plain)
+
+
+def test_gzip_manifest_hashes(config, tmp_path):
+    plain = plain_files(config, tmp_path / "plain")
+    folder, = faker_district.generate(dict(config, PACKAGE="gzip"), tmp_path / "gzip").values()
+    with open(os.path.join(folder, district_package.MANIFEST_NAME), encoding="utf-8") as fh: manifest = json.load(fh)
+    contents = {}
+    for entry in manifest["files"]:
+        path = os.path.join(folder, entry["file"])
+        assert os.path.getsize(path) == entry["bytes"]
+        with gzip.open(path, "rb") as fh: contents[entry["file"]] = fh.read()
+    check_manifest(manifest, "gzip", contents, plain)
+
+
+def test_zip_is_byte_identical_across_workers(config, tmp_path):
+    one, = faker_district.generate(dict(config, PACKAGE="zip"), tmp_path / "one").values()
+    two, = faker_district.generate(dict(config, PACKAGE="zip"), tmp_path / "two", workers=2).values()
+    with open(one, "rb") as a, open(two, "rb") as b: assert a.read() == b.read()
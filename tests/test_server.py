@@ -0,0 +1,88 @@
+import asyncio
+import csv
+import json
+
+import pytest
+
+import district_server
+import faker_district
+
+
+def read_csv(path):
+    with open(path, newline="", encoding="utf-8") as fh: return list(csv.DictReader(fh))
+
+
+def fetch_all(server, collection, limit):
+    """Every record of `collection`, following the next links from the first page."""
+    records, target = [], f"/v3.0/{collection}?limit={limit}"
+    while target:
+        status, body = server.handle("GET", target)
+        assert status == 200
+        doc = json.loads(body)
+        assert all(set(item) == {"data"} for item in doc["data"])  # no uri without an endpoint behind it
+        records.extend(item["data"] for item in doc["data"])
+        assert len(doc["data"]) <= limit
+        target = next((link["uri"] for link in doc["links"] if link["rel"] == "next"), None)
+    return records
+
+
+@pytest.fixture
+def config(small):
+    return dict(small, CONTACTS_LAYOUT="normalized", DO_ATTENDANCE=False)
+
+
+@pytest.mark.parametrize("limit", [1, 7, 30, 10000])
+def test_pages_match_written_files(config, tmp_path, limit):
+    folders = faker_district.generate(config, tmp_path)
+    server = faker_district.api_server(config, cache_schools=2)
+    for collection, id_col in [("students", "Student_id"), ("sections", "Section_id"), ("contacts", "Contact_sis_id"), ("enrollments", None)]:
+        records = fetch_all(server, collection, limit)
+        written = [dict(row, district=name) for name, folder in folders.items() for row in read_csv(f"{folder}/{collection}.csv")]
+        assert len(records) == len(written)
+        for record, row in zip(records, written):
+            assert record["id"] == (row[id_col] if id_col else None)
+            assert {k: "" if record[k] is None else str(record[k]) for k in row} == row
+
+
+def test_districts_collection(config):
+    records = fetch_all(faker_district.api_server(config), "districts", 1)
+    assert [r["id"] for r in records] == [ctx["dist_name"] for ctx in faker_district.district_contexts()]
+
+
+@pytest.mark.parametrize("cursor", [(-1, 0, 0), (0, -1, 0), (0, 0, -1), (2, 0, 0), (0, 3, 0)])
+def test_out_of_range_cursor_is_a_bad_request(config, cursor):
+    server = faker_district.api_server(config)
+    with pytest.raises(district_server.RequestError) as err:
+        server.handle("GET", f"/v3.0/students?starting_after={district_server.encode_cursor(*cursor)}")
+    assert err.value.status == 400
+
+
+class Sink:
+    """The StreamWriter side of ClientServer.connection(), collecting what it writes."""
+
+    def __init__(self): self.data = b""
+    def write(self, data): self.data += data
+    async def drain(self): pass
+    def close(self): pass
+
+
+def exchange(server, request):
+    """The raw bytes ClientServer.connection() answers `request` with."""
+    async def run():
+        reader, sink = asyncio.StreamReader(), Sink()
+        reader.feed_data(request)
+        reader.feed_eof()
+        await server.connection(reader, sink)
+        return sink.data
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("length", [b"abc", b"-5"])
+def test_bad_content_length_is_a_bad_request(config, length):
+    server = faker_district.api_server(config)
+    request = b"GET /v3.0/districts HTTP/1.1\r\nContent-Length: " + length + b"\r\n\r\n"
+    response = exchange(server, request + b"GET /v3.0/districts HTTP/1.1\r\n\r\n")
+    head, _, body = response.partition(b"\r\n\r\n")
+    assert head.startswith(b"HTTP/1.1 400 ") and b"Connection: close" in head
+    assert "Content-Length" in json.loads(body)["error"]
+    assert response.count(b"HTTP/1.1") == 1  # the connection ends there
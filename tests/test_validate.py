@@ -0,0 +1,62 @@
+import csv
+import os
+
+import pytest
+
+import faker_district
+
+
+def rewrite_csv(path, edit):
+    """Rewrites a CSV file after `edit(rows)` changes its list of row dicts in place."""
+    with open(path, newline="", encoding="utf-8") as fh:
+        reader = csv.DictReader(fh)
+        header, rows = reader.fieldnames, list(reader)
+    edit(rows)
+    with open(path, "w", newline="", encoding="utf-8") as fh:
+        writer = csv.DictWriter(fh, header)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def checks(report):
+    return {(v["table"], v["check"]): v for v in report["violations"]}
+
+
+@pytest.fixture
+def written(small, tmp_path):
+    config = dict(small, NUM_DISTRICTS=1, CONTACTS_LAYOUT="normalized")
+    folder, = faker_district.generate(config, tmp_path).values()
+    return tmp_path, folder
+
+
+def test_generated_output_passes_all_but_email_checks(written):
+    output_dir, _ = written
+    report, = faker_district.validate(output_dir)
+    assert report["tables"]["students"]["rows"] > 0
+    # Student emails are first initial + last name + two digits, so they may collide; nothing else may fail
+    assert all("collides with another address" in check for _, check in checks(report))
+
+
+def test_injected_violations_are_reported(written):
+    output_dir, folder = written
+
+    def break_students(rows):
+        rows[1]["Student_id"] = rows[0]["Student_id"]
+        rows[2]["Grade"] = "13"
+        rows[3]["IEP_status"] = "maybe"
+        rows[4]["DOB"] = "1900-01-01"
+        rows[5]["Email_address"] = rows[6]["Email_address"] = "same@example.org"
+
+    def break_enrollments(rows):
+        rows[0]["Section_id"] = "no-such-section"
+
+    rewrite_csv(os.path.join(folder, "students.csv"), break_students)
+    rewrite_csv(os.path.join(folder, "enrollments.csv"), break_enrollments)
+    found = checks(faker_district.validate(output_dir)[0])
+
+    assert found[("students", "duplicate Student_id")]["count"] == 1
+    assert found[("students", "Grade not a Clever grade")]["examples"] == ["13"]
+    assert found[("students", "IEP_status not Y/N")]["examples"] == ["maybe"]
+    assert found[("students", "DOB outside the birth year of its grade")]["count"] >= 1
+    assert found[("enrollments", "Section_id not in sections.Section_id")]["examples"] == ["no-such-section"]
+    assert "same@example.org" in found[("students", "Email_address collides with another address")]["examples"]